@@ -0,0 +1,260 @@
+from __future__ import annotations
+
+import contextlib
+import fnmatch
+import glob
+import io
+import struct
+from typing import TYPE_CHECKING, Any, BinaryIO, Iterator, List, Optional, Tuple
+
+if TYPE_CHECKING:  # imported on first use; plain files never need it
+    import zipfile
+
+# Separates an archive from a member inside it: ``data.zip::sub/s01.mat``.
+MEMBER_SEP = "::"
+
+ARCHIVE_SUFFIXES = (".zip",)
+
+# Inflated bytes kept behind the read position of a compressed member, so
+# that re-reading a header does not restart decompression.
+BACK_BUFFER = 4 << 20
+
+_SKIP_CHUNK = BACK_BUFFER
+
+_LOCAL_HEADER = struct.Struct("<4s22xHH")
+_LOCAL_MAGIC = b"PK\x03\x04"
+
+_GLOB_CHARS = "*?["
+
+
+def split_member(path: str) -> Tuple[str, Optional[str]]:
+    """``"a.zip::x.mat"`` -> ``("a.zip", "x.mat")``; plain paths -> ``(path, None)``."""
+    if MEMBER_SEP in path:
+        archive, member = path.split(MEMBER_SEP, 1)
+        return archive, member
+    return path, None
+
+
+def is_archive(path: str) -> bool:
+    """An archive itself or a member (pattern) inside one."""
+    archive, member = split_member(path)
+    return member is not None or archive.lower().endswith(ARCHIVE_SUFFIXES)
+
+
+def expand_archive(pattern: str, suffix: str = ".mat") -> List[str]:
+    """
+    Member paths matching ``pattern``. A bare archive selects every
+    ``*<suffix>`` member; the member part may be an ``fnmatch`` pattern, and
+    so may the archive part (expanded with ``glob``).
+    """
+    import zipfile
+
+    archive, member = split_member(pattern)
+    if member is not None and not any(c in member for c in _GLOB_CHARS):
+        if not any(c in archive for c in _GLOB_CHARS):
+            return [pattern]
+
+    if any(c in archive for c in _GLOB_CHARS):
+        archives = sorted(glob.glob(archive, recursive=True))
+    else:
+        archives = [archive]
+
+    out = []
+    for path in archives:
+        try:
+            with zipfile.ZipFile(path) as zf:
+                names = [i.filename for i in zf.infolist() if not i.is_dir()]
+        except (OSError, zipfile.BadZipFile):
+            continue
+        for name in sorted(names):
+            if member is None:
+                if name.lower().endswith(suffix):
+                    out.append(f"{path}{MEMBER_SEP}{name}")
+            elif fnmatch.fnmatchcase(name, member):
+                out.append(f"{path}{MEMBER_SEP}{name}")
+    return out
+
+
+def output_path(path: str, suffix: str) -> str:
+    """Where a per-file result for ``path`` goes; members sit by their archive."""
+    archive, member = split_member(path)
+    if member is None:
+        return f"{path}{suffix}"
+    return f"{archive}{MEMBER_SEP}{member.replace('/', '_')}{suffix}"
+
+
+class _StoredMember(io.RawIOBase):
+    """
+    Window onto an uncompressed member: reads and seeks go straight to the
+    archive, so access is as random (and as cheap) as for a plain file.
+    """
+
+    def __init__(self, f: BinaryIO, start: int, size: int) -> None:
+        self.f = f
+        self.start = start
+        self.size = size
+        self.pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self.pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self.pos
+        elif whence == io.SEEK_END:
+            offset += self.size
+        if offset < 0:
+            raise ValueError("negative seek position")
+        self.pos = offset
+        return offset
+
+    def readinto(self, b: Any) -> int:
+        n = min(len(b), max(0, self.size - self.pos))
+        if n == 0:
+            return 0
+        self.f.seek(self.start + self.pos)
+        got = self.f.readinto(memoryview(b)[:n])
+        self.pos += got
+        return got
+
+    def mmap_target(self) -> Tuple[BinaryIO, int]:
+        """The archive file and the member's offset in it, for ``np.memmap``."""
+        return self.f, self.start
+
+
+class _CompressedMember(io.RawIOBase):
+    """
+    Seekable view of a compressed member with bounded memory.
+
+    Seeks only move the position; reads inflate forward from wherever the
+    decompressor is. At least the last ``BACK_BUFFER`` bytes are kept, so
+    short backward seeks are served from memory; seeking further back reopens
+    the member and inflates up to the target.
+    """
+
+    def __init__(self, zf: zipfile.ZipFile, info: zipfile.ZipInfo) -> None:
+        self.zf = zf
+        self.info = info
+        self.size = info.file_size
+        self.pos = 0
+        self.stream: Any = zf.open(info)
+        self.stream_pos = 0  # bytes inflated so far
+        self.back = bytearray()  # the bytes just before stream_pos
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self.pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self.pos
+        elif whence == io.SEEK_END:
+            offset += self.size
+        if offset < 0:
+            raise ValueError("negative seek position")
+        self.pos = offset
+        return offset
+
+    def close(self) -> None:
+        self.stream.close()
+        super().close()
+
+    def _remember(self, data: bytes) -> None:
+        self.stream_pos += len(data)
+        if len(data) >= BACK_BUFFER:
+            self.back = bytearray(memoryview(data)[-BACK_BUFFER:])
+            return
+        self.back += data
+        # trim in bulk so many small reads do not each shift the buffer
+        if len(self.back) > 2 * BACK_BUFFER:
+            del self.back[: len(self.back) - BACK_BUFFER]
+
+    def _rewind(self) -> None:
+        self.stream.close()
+        self.stream = self.zf.open(self.info)
+        self.stream_pos = 0
+        self.back = bytearray()
+
+    def readinto(self, b: Any) -> int:
+        n = min(len(b), max(0, self.size - self.pos))
+        if n == 0:
+            return 0
+        if self.pos < self.stream_pos - len(self.back):
+            self._rewind()
+        while self.stream_pos < self.pos:
+            data = self.stream.read(min(_SKIP_CHUNK, self.pos - self.stream_pos))
+            if not data:
+                return 0
+            self._remember(data)
+
+        out = memoryview(b)
+        got = 0
+        if self.pos < self.stream_pos:
+            i = len(self.back) - (self.stream_pos - self.pos)
+            cached = self.back[i : i + n]
+            out[: len(cached)] = cached
+            got = len(cached)
+        while got < n:
+            data = self.stream.read(n - got)
+            if not data:
+                break
+            self._remember(data)
+            out[got : got + len(data)] = data
+            got += len(data)
+        self.pos += got
+        return got
+
+
+def _data_offset(f: BinaryIO, info: zipfile.ZipInfo) -> int:
+    f.seek(info.header_offset)
+    magic, name_len, extra_len = _LOCAL_HEADER.unpack(f.read(_LOCAL_HEADER.size))
+    if magic != _LOCAL_MAGIC:
+        raise ValueError(f"bad local header for {info.filename}")
+    return info.header_offset + _LOCAL_HEADER.size + name_len + extra_len
+
+
+@contextlib.contextmanager
+def open_source(path: str) -> Iterator[BinaryIO]:
+    """
+    Open a plain file or an archive member as a seekable binary stream.
+    Nothing is extracted to disk: stored members are windows onto the
+    archive, compressed ones are inflated on demand.
+    """
+    archive, member = split_member(path)
+    if member is None:
+        with open(path, "rb") as f:
+            yield f
+        return
+
+    import zipfile
+
+    try:
+        zf = zipfile.ZipFile(archive)
+    except zipfile.BadZipFile as e:
+        raise ValueError(f"{archive}: {e}") from None
+    with zf:
+        try:
+            info = zf.getinfo(member)
+        except KeyError:
+            raise FileNotFoundError(f"{archive}: no member {member!r}") from None
+        if info.flag_bits & 0x1:
+            raise ValueError(f"{path}: encrypted archive members are not supported")
+
+        if info.compress_type == zipfile.ZIP_STORED:
+            with open(archive, "rb") as raw:
+                stored = _StoredMember(raw, _data_offset(raw, info), info.file_size)
+                yield stored  # type: ignore[misc]
+        else:
+            with _CompressedMember(zf, info) as compressed:
+                yield compressed  # type: ignore[misc]
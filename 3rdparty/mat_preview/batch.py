@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import collections
+import glob
+import os
+import time
+from dataclasses import dataclass
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Deque,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Type,
+)
+
+from archive import expand_archive, is_archive, split_member
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor, Future
+
+GLOB_CHARS = "*?["
+
+
+@dataclass
+class FileReport:
+    path: str
+    seconds: float
+    entries: Optional[Any] = None  # whatever fn returned
+    error: Optional[str] = None
+
+
+def is_single_file(patterns: List[str]) -> bool:
+    """True for the classic one-file invocation, which keeps its old output."""
+    return (
+        len(patterns) == 1
+        and not any(c in patterns[0] for c in GLOB_CHARS)
+        and not os.path.isdir(patterns[0])
+        and not (is_archive(patterns[0]) and split_member(patterns[0])[1] is None)
+    )
+
+
+def expand_paths(patterns: Iterable[str], suffix: str = ".mat") -> List[str]:
+    """
+    Expand files, directories (searched recursively for ``*<suffix>``),
+    glob patterns and archives (``data.zip``, ``data.zip::sub/*.mat``) into
+    a de-duplicated list, keeping the given order.
+    """
+    out: List[str] = []
+    seen = set()
+    for pattern in patterns:
+        if is_archive(pattern):
+            found = expand_archive(pattern, suffix)
+        elif os.path.isdir(pattern):
+            found = sorted(
+                glob.glob(os.path.join(pattern, "**", f"*{suffix}"), recursive=True)
+            )
+        elif any(c in pattern for c in GLOB_CHARS):
+            found = sorted(glob.glob(pattern, recursive=True))
+        else:
+            found = [pattern]
+        for path in found:
+            if path not in seen:
+                seen.add(path)
+                out.append(path)
+    return out
+
+
+def _run_one(fn: Callable[..., Any], path: str, kwargs: dict) -> FileReport:
+    t0 = time.perf_counter()
+    try:
+        entries = fn(path, **kwargs)
+    except Exception as e:
+        return FileReport(
+            path=path,
+            seconds=time.perf_counter() - t0,
+            error=f"{type(e).__name__}: {e}",
+        )
+    return FileReport(path=path, seconds=time.perf_counter() - t0, entries=entries)
+
+
+def run_batch(
+    fn: Callable[..., Any],
+    paths: List[str],
+    jobs: int,
+    threads: bool = False,
+    **kwargs: Any,
+) -> Iterator[FileReport]:
+    """
+    Call ``fn(path, **kwargs)`` for every path and yield reports in input
+    order. With ``jobs > 1`` the calls run on a process pool (a thread pool
+    with ``threads``, for callers whose ``kwargs`` cannot be pickled); at
+    most ``2 * jobs`` files are in flight, so finished results never pile up
+    faster than the caller consumes them.
+    """
+    if jobs <= 1 or len(paths) <= 1:
+        for path in paths:
+            yield _run_one(fn, path, kwargs)
+        return
+
+    # the pools pull in multiprocessing; single-file runs never need them
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+    executor: Type[Executor] = (
+        ThreadPoolExecutor if threads else ProcessPoolExecutor
+    )
+    with executor(max_workers=min(jobs, len(paths))) as pool:
+        pending: Deque[Future] = collections.deque()
+        todo = iter(paths)
+        for path in todo:
+            pending.append(pool.submit(_run_one, fn, path, kwargs))
+            if len(pending) >= 2 * jobs:
+                break
+        while pending:
+            yield pending.popleft().result()
+            path = next(todo, None)
+            if path is not None:
+                pending.append(pool.submit(_run_one, fn, path, kwargs))
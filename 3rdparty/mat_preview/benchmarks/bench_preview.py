@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+End-to-end cost of each preview mode over the fixtures from
+``make_fixtures.py``.
+
+Every (fixture, mode) pair runs ``main.py`` in a fresh process with the
+cache disabled and records wall time, peak RSS and bytes read (``rchar``
+and ``read_bytes`` from ``/proc/self/io``; memory-mapped reads show up in
+neither, and ``read_bytes`` is 0 when the file sits in the page cache).
+Results can be saved with ``--save`` and compared against a previous run
+with ``--baseline``; any metric worse than ``--tolerance`` times the
+baseline makes the run exit non-zero.
+
+    python benchmarks/make_fixtures.py --sizes 64KB,16MB
+    python benchmarks/bench_preview.py --save before.json
+    python benchmarks/bench_preview.py --baseline before.json
+"""
+from __future__ import annotations
+
+import argparse
+import glob
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Tuple
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+MAIN = os.path.join(HERE, "..", "main.py")
+
+MODES: Dict[str, List[str]] = {
+    "list": ["--list"],
+    "head": [],
+    "stride": ["--sample-mode", "stride"],
+    "random": ["--sample-mode", "random"],
+    "stats": ["--stats"],
+    "ndjson": ["--format", "ndjson"],
+}
+
+# Runs main.py in-process and dumps /proc/self/io just before exiting.
+PROBE = """
+import atexit, json, os, runpy, sys
+io_path, main = sys.argv[1], sys.argv[2]
+def dump():
+    io = {}
+    try:
+        with open("/proc/self/io") as f:
+            for line in f:
+                key, value = line.split(":")
+                io[key] = int(value)
+    except OSError:
+        pass
+    with open(io_path, "w") as f:
+        json.dump(io, f)
+atexit.register(dump)
+sys.argv = sys.argv[2:]
+sys.path.insert(0, os.path.dirname(main))
+runpy.run_path(main, run_name="__main__")
+"""
+
+# Absolute slack so millisecond noise on tiny fixtures is not a regression.
+SLACK = {"seconds": 0.05, "peak_rss_mb": 8.0, "read_mb": 1.0}
+
+
+def run_mode(path: str, args: List[str]) -> Dict[str, float]:
+    with tempfile.NamedTemporaryFile(suffix=".json") as io_file:
+        cmd = [sys.executable, "-c", PROBE, io_file.name, MAIN, path, "--no-cache"]
+        start = time.perf_counter()
+        proc = subprocess.Popen(
+            cmd + args, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+        )
+        _, status, usage = os.wait4(proc.pid, 0)
+        seconds = time.perf_counter() - start
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        err = proc.stderr.read().decode(errors="replace") if proc.stderr else ""
+        if proc.returncode:
+            raise RuntimeError(f"{os.path.basename(path)}: {err.strip()}")
+        with open(io_file.name) as f:
+            io = json.load(f) if os.path.getsize(io_file.name) else {}
+    return {
+        "seconds": round(seconds, 4),
+        "peak_rss_mb": round(usage.ru_maxrss / 1024, 1),  # KiB on Linux
+        "read_mb": round(io.get("rchar", 0) / (1 << 20), 2),
+        "disk_read_mb": round(io.get("read_bytes", 0) / (1 << 20), 2),
+    }
+
+
+def compare(
+    results: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]],
+    tolerance: float,
+) -> List[Tuple[str, str, float, float]]:
+    regressions = []
+    for key, row in results.items():
+        old = baseline.get(key)
+        if old is None:
+            continue
+        for metric, slack in SLACK.items():
+            if metric in old and row[metric] > old[metric] * tolerance + slack:
+                regressions.append((key, metric, old[metric], row[metric]))
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--fixtures", default=os.path.join(HERE, "fixtures"))
+    parser.add_argument("--modes", default=",".join(MODES))
+    parser.add_argument("--repeat", type=int, default=3, help="Best of N runs")
+    parser.add_argument("--save", help="Write results to this JSON file")
+    parser.add_argument("--baseline", help="Compare against a saved JSON file")
+    parser.add_argument("--tolerance", type=float, default=1.25)
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(os.path.join(args.fixtures, "*.mat")))
+    if not paths:
+        sys.exit(f"no fixtures in {args.fixtures}; run make_fixtures.py first")
+
+    results: Dict[str, Dict[str, float]] = {}
+    print(f"{'fixture':<32} {'mode':<8} {'seconds':>9} {'rss MB':>8} {'read MB':>9}")
+    for path in paths:
+        name = os.path.basename(path)
+        for mode in args.modes.split(","):
+            runs = [run_mode(path, MODES[mode]) for _ in range(args.repeat)]
+            best = min(runs, key=lambda r: r["seconds"])
+            best["peak_rss_mb"] = min(r["peak_rss_mb"] for r in runs)
+            results[f"{name}:{mode}"] = best
+            print(
+                f"{name:<32} {mode:<8} {best['seconds']:>9.3f} "
+                f"{best['peak_rss_mb']:>8.1f} {best['read_mb']:>9.2f}"
+            )
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        for key, metric, old, new in regressions:
+            print(f"REGRESSION {key} {metric}: {old} -> {new}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
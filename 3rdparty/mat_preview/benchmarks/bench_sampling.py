@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Latency of sampling one HDF5 dataset as its size grows.
+
+Datasets are gzip-chunked and written with ``write_direct_chunk`` from a
+single pre-compressed chunk, so a 10 GB logical dataset costs a few
+hundred MB of disk and a few seconds to build. With hyperslab sampling the
+per-preview latency should stay flat across sizes; the legacy ``ds[()]``
+read is timed alongside for sizes up to ``--full-read-max``.
+
+    python benchmarks/bench_sampling.py --sizes 1MB,100MB,10GB
+"""
+from __future__ import annotations
+
+import argparse
+import math
+import os
+import sys
+import tempfile
+import time
+import zlib
+from typing import List
+
+import h5py
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from sampling import SAMPLE_MODES, sample_dataset  # noqa: E402
+
+CHUNK_ROWS = 1024
+COLS = 128  # 1024 x 128 float64 = 1 MiB per chunk
+
+UNITS = {"KB": 1 << 10, "MB": 1 << 20, "GB": 1 << 30}
+
+
+def parse_size(text: str) -> int:
+    text = text.strip().upper()
+    for suffix, mult in UNITS.items():
+        if text.endswith(suffix):
+            return int(float(text[: -len(suffix)]) * mult)
+    return int(text)
+
+
+def build_dataset(path: str, nbytes: int) -> None:
+    rows = max(CHUNK_ROWS, nbytes // (COLS * 8))
+    rng = np.random.default_rng(0)
+    chunk = rng.standard_normal((CHUNK_ROWS, COLS))
+    payload = zlib.compress(chunk.tobytes(), 1)
+
+    with h5py.File(path, "w") as f:
+        ds = f.create_dataset(
+            "data",
+            shape=(rows, COLS),
+            dtype="f8",
+            chunks=(CHUNK_ROWS, COLS),
+            compression="gzip",
+        )
+        for i in range(math.ceil(rows / CHUNK_ROWS)):
+            ds.id.write_direct_chunk((i * CHUNK_ROWS, 0), payload)
+
+
+def time_call(fn, repeat: int) -> float:
+    best = math.inf
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="1MB,10MB,100MB,1GB,10GB")
+    parser.add_argument("--sample-k", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--full-read-max",
+        default="256MB",
+        help="Largest size for which the legacy full read is also timed",
+    )
+    parser.add_argument("--workdir", help="Where to write datasets (default: tmp)")
+    args = parser.parse_args()
+
+    sizes: List[int] = [parse_size(s) for s in args.sizes.split(",")]
+    full_max = parse_size(args.full_read_max)
+
+    header = ["size"] + [f"{m} (ms)" for m in SAMPLE_MODES] + ["full read (ms)"]
+    print("\t".join(header))
+
+    with tempfile.TemporaryDirectory(dir=args.workdir) as tmp:
+        for nbytes in sizes:
+            path = os.path.join(tmp, f"bench_{nbytes}.h5")
+            build_dataset(path, nbytes)
+            row = [f"{nbytes / (1 << 20):.0f} MB"]
+            with h5py.File(path, "r") as f:
+                ds = f["data"]
+                for mode in SAMPLE_MODES:
+                    t = time_call(
+                        lambda: sample_dataset(ds, args.sample_k, mode), args.repeat
+                    )
+                    row.append(f"{t * 1e3:.2f}")
+                if nbytes <= full_max:
+                    t = time_call(lambda: ds[()], 1)
+                    row.append(f"{t * 1e3:.2f}")
+                else:
+                    row.append("-")
+            os.remove(path)
+            print("\t".join(row), flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Import-time budget for the cold-start paths of the CLI.
+
+``--help`` and ``--list`` on classic (v4/v5/compressed v5) files must not
+import numpy, scipy or h5py. Each scenario runs ``main.py`` under
+``python -X importtime`` and sums the cumulative time of every top-level
+import beyond those a bare ``python -c pass`` already makes. The run
+fails when a forbidden module shows up or the sum exceeds ``--budget-ms``.
+
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --budget-ms 80 --repeat 5
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+from typing import Dict, List, Optional, Set, Tuple
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+MAIN = os.path.join(HERE, "..", "main.py")
+
+FORBIDDEN = ("numpy", "scipy", "h5py")
+
+# Scenario name -> (fixture format or None, main.py arguments).
+SCENARIOS: Dict[str, Tuple[Optional[str], List[str]]] = {
+    "help": (None, ["--help"]),
+    "list-v4": ("v4", ["--list", "--no-cache"]),
+    "list-v5": ("v5", ["--list", "--no-cache"]),
+    "list-v5z": ("v5z", ["--list", "--no-cache"]),
+}
+
+
+def profile(args: List[str]) -> Tuple[Dict[str, int], Set[str]]:
+    """
+    Cumulative microseconds of each top-level import in a fresh process,
+    and the names of all modules it imported.
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    if proc.returncode:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    times: Dict[str, int] = {}
+    modules: Set[str] = set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        modules.add(name.strip())
+        if not name.startswith("  "):  # nested imports are in the parent's sum
+            times[name.strip()] = int(cumulative)
+    return times, modules
+
+
+def make_fixtures(out: str) -> Dict[str, str]:
+    """Small many-variable files, written with the end-to-end fixture code."""
+    sys.path.insert(0, HERE)
+    from make_fixtures import build_layout, write_fixture
+
+    tree = build_layout("many_small", 64 << 10)
+    paths = {}
+    for fmt in ("v4", "v5", "v5z"):
+        paths[fmt] = os.path.join(out, f"startup_{fmt}.mat")
+        write_fixture(paths[fmt], fmt, tree)
+    return paths
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--repeat", type=int, default=3, help="Best of N runs")
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=100.0,
+        help="Maximum import time added over a bare interpreter",
+    )
+    args = parser.parse_args()
+
+    _, baseline = profile(["-c", "pass"])
+    failures = []
+    print(f"{'scenario':<10} {'added ms':>9}  slowest imports")
+    with tempfile.TemporaryDirectory() as tmp:
+        fixtures = make_fixtures(tmp)
+        for name in args.scenarios.split(","):
+            fmt, extra = SCENARIOS[name]
+            cmd = [MAIN, *([fixtures[fmt]] if fmt else []), *extra]
+
+            best: Dict[str, int] = {}
+            for _ in range(args.repeat):
+                times, loaded = profile(cmd)
+                times = {m: t for m, t in times.items() if m not in baseline}
+                if not best or sum(times.values()) < sum(best.values()):
+                    best = times
+
+            bad = sorted(m for m in loaded if m.split(".")[0] in FORBIDDEN)
+            if bad:
+                failures.append(f"{name}: imports {', '.join(bad[:5])}")
+            added = sum(best.values()) / 1000
+            slowest = sorted(best.items(), key=lambda kv: -kv[1])[:4]
+            print(
+                f"{name:<10} {added:>9.1f}  "
+                + ", ".join(f"{m} {t / 1000:.1f}" for m, t in slowest)
+            )
+            if added > args.budget_ms:
+                failures.append(
+                    f"{name}: {added:.1f} ms of imports > {args.budget_ms:g} ms"
+                )
+
+    for failure in failures:
+        print(f"REGRESSION {failure}", file=sys.stderr)
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
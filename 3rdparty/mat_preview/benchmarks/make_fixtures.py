@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Generate synthetic MAT files for benchmarking mat_preview.
+
+Every combination of format, layout and size is written to ``--out`` as
+``<format>_<layout>_<size>.mat``:
+
+- formats: v4, v5 (uncompressed), v5z (compressed), v73 (contiguous HDF5),
+  v73c (chunked + gzip HDF5)
+- layouts: many_small (hundreds of ~KB variables), few_huge (two large
+  arrays), deep_struct (nested structs around one large leaf)
+- sizes: approximate payload, e.g. 64KB, 16MB, 2GB
+
+Values are integer-valued doubles, like trial tables, so compressed
+formats stay quick to write. Every format is written a column block at a
+time (v4 and v5 elements are encoded here rather than by
+``scipy.io.savemat``), so memory stays flat even for multi-GB fixtures.
+
+    python benchmarks/make_fixtures.py --sizes 64KB,16MB --out /tmp/fixtures
+"""
+from __future__ import annotations
+
+import argparse
+import math
+import os
+import struct
+import sys
+import zlib
+from typing import Any, BinaryIO, Callable, Dict, Iterator, Tuple
+
+import h5py
+import numpy as np
+
+FORMATS = ("v4", "v5", "v5z", "v73", "v73c")
+LAYOUTS = ("many_small", "few_huge", "deep_struct")
+
+UNITS = {"KB": 1 << 10, "MB": 1 << 20, "GB": 1 << 30}
+
+SMALL_VAR_BYTES = 4 << 10
+MAX_SMALL_VARS = 500
+STRUCT_DEPTH = 6
+BLOCK_ELEMS = 1 << 18  # per column segment written, and per v73c chunk
+
+# MAT v5 data types and array classes.
+MI_INT8 = 1
+MI_INT32 = 5
+MI_UINT32 = 6
+MI_DOUBLE = 9
+MI_MATRIX = 14
+MI_COMPRESSED = 15
+MX_STRUCT = 2
+MX_DOUBLE = 6
+
+MAT_CLASSES = {
+    "f8": "double",
+    "f4": "single",
+    "i1": "int8",
+    "u1": "uint8",
+    "i2": "int16",
+    "u2": "uint16",
+    "i4": "int32",
+    "u4": "uint32",
+    "i8": "int64",
+    "u8": "uint64",
+}
+
+
+def parse_size(text: str) -> int:
+    text = text.strip().upper()
+    for suffix, mult in UNITS.items():
+        if text.endswith(suffix):
+            return int(float(text[: -len(suffix)]) * mult)
+    return int(text)
+
+
+def size_label(nbytes: int) -> str:
+    for suffix, mult in reversed(UNITS.items()):
+        if nbytes >= mult and nbytes % mult == 0:
+            return f"{nbytes // mult}{suffix}"
+    return f"{nbytes}B"
+
+
+class Array:
+    """Shape of a variable to be filled lazily, ``rows x cols`` doubles."""
+
+    def __init__(self, rows: int, cols: int, seed: int) -> None:
+        self.rows = max(1, rows)
+        self.cols = max(1, cols)
+        self.seed = seed
+
+    @property
+    def size(self) -> int:
+        return self.rows * self.cols
+
+    def blocks(self) -> Iterator[Tuple[int, int, np.ndarray]]:
+        """``(column, first row, values)`` in MATLAB's column-major order."""
+        rng = np.random.default_rng(self.seed)
+        for col in range(self.cols):
+            for start in range(0, self.rows, BLOCK_ELEMS):
+                n = min(BLOCK_ELEMS, self.rows - start)
+                yield col, start, rng.integers(0, 1000, size=n).astype("<f8")
+
+
+def _matrix(nbytes: int, cols: int, seed: int) -> Array:
+    return Array(math.ceil(nbytes / 8 / cols), cols, seed)
+
+
+def build_layout(layout: str, nbytes: int) -> Dict[str, Any]:
+    if layout == "many_small":
+        count = max(1, min(MAX_SMALL_VARS, nbytes // SMALL_VAR_BYTES))
+        each = max(8, nbytes // count)
+        return {f"v{i:04d}": _matrix(each, 8, i) for i in range(count)}
+    if layout == "few_huge":
+        return {
+            "results": _matrix(nbytes // 2, 16, 0),
+            "trials": _matrix(nbytes - nbytes // 2, 16, 1),
+        }
+    if layout == "deep_struct":
+        leaf: Dict[str, Any] = {"data": _matrix(nbytes, 16, 0), "id": Array(1, 1, 1)}
+        for depth in range(STRUCT_DEPTH, 0, -1):
+            leaf = {f"level{depth}": leaf, "meta": Array(1, 4, depth)}
+        return {"subject": leaf}
+    raise ValueError(layout)
+
+
+def _chunks(value: Array) -> Tuple[int, int]:
+    # whole columns while they fit in a block, else segments of one column
+    rows = min(value.rows, BLOCK_ELEMS)
+    return max(1, min(value.cols, BLOCK_ELEMS // rows)), rows
+
+
+def _write_v73_tree(group: Any, tree: Dict[str, Any], chunked: bool) -> None:
+    for name, value in tree.items():
+        if isinstance(value, dict):
+            sub = group.create_group(name)
+            sub.attrs["MATLAB_class"] = np.bytes_("struct")
+            _write_v73_tree(sub, value, chunked)
+            continue
+        # MATLAB is column-major: HDF5 sees the transposed shape
+        ds = group.create_dataset(
+            name,
+            shape=(value.cols, value.rows),
+            dtype="f8",
+            chunks=_chunks(value) if chunked else None,
+            compression="gzip" if chunked else None,
+        )
+        ds.attrs["MATLAB_class"] = np.bytes_(MAT_CLASSES["f8"])
+        for col, start, block in value.blocks():
+            ds[col, start : start + len(block)] = block
+
+
+def write_v73(path: str, tree: Dict[str, Any], chunked: bool) -> None:
+    with h5py.File(path, "w", userblock_size=512) as f:
+        _write_v73_tree(f, tree, chunked)
+    header = (
+        b"MATLAB 7.3 MAT-file, Platform: GLNXA64, Created by: make_fixtures.py "
+        b"HDF5 schema 1.00 ."
+    ).ljust(116, b" ")
+    header += b"\0" * 8 + b"\x00\x02IM"
+    with open(path, "r+b") as f:
+        f.write(header)
+
+
+def write_v4(path: str, tree: Dict[str, Any]) -> None:
+    with open(path, "wb") as f:
+        for name, value in tree.items():
+            if isinstance(value, dict):
+                raise ValueError("v4 has no structs")
+            # MOPT 0: little-endian doubles, full matrix
+            raw = name.encode() + b"\0"
+            f.write(struct.pack("<5i", 0, value.rows, value.cols, 0, len(raw)) + raw)
+            for _, _, block in value.blocks():
+                f.write(block.tobytes())
+
+
+def _tag(mdtype: int, nbytes: int) -> bytes:
+    return struct.pack("<II", mdtype, nbytes)
+
+
+def _element(mdtype: int, data: bytes) -> bytes:
+    return _tag(mdtype, len(data)) + data + b"\0" * (-len(data) % 8)
+
+
+def _v5_header(name: str, mclass: int, dims: Tuple[int, ...]) -> bytes:
+    """Array flags, dimensions and name subelements of an miMATRIX."""
+    return (
+        _element(MI_UINT32, struct.pack("<II", mclass, 0))
+        + _element(MI_INT32, struct.pack(f"<{len(dims)}i", *dims))
+        + _element(MI_INT8, name.encode())
+    )
+
+
+def _v5_field_names(fields: Dict[str, Any]) -> bytes:
+    width = max(len(field) for field in fields) + 1
+    names = b"".join(field.encode().ljust(width, b"\0") for field in fields)
+    # the field name length is a small element: tag and value in 8 bytes
+    return struct.pack("<HHi", MI_INT32, 4, width) + _element(MI_INT8, names)
+
+
+def _v5_nbytes(name: str, value: Any) -> int:
+    """Size of the miMATRIX element for ``value``, tag included."""
+    if isinstance(value, dict):
+        header = _v5_header(name, MX_STRUCT, (1, 1)) + _v5_field_names(value)
+        return 8 + len(header) + sum(_v5_nbytes("", v) for v in value.values())
+    header = _v5_header(name, MX_DOUBLE, (value.rows, value.cols))
+    return 8 + len(header) + 8 + 8 * value.size
+
+
+def _write_v5_matrix(write: Callable[[bytes], Any], name: str, value: Any) -> None:
+    write(_tag(MI_MATRIX, _v5_nbytes(name, value) - 8))
+    if isinstance(value, dict):
+        write(_v5_header(name, MX_STRUCT, (1, 1)) + _v5_field_names(value))
+        for field in value.values():
+            _write_v5_matrix(write, "", field)  # fields are unnamed
+        return
+    write(_v5_header(name, MX_DOUBLE, (value.rows, value.cols)))
+    write(_tag(MI_DOUBLE, 8 * value.size))
+    for _, _, block in value.blocks():
+        write(block.tobytes())
+
+
+def _write_v5_compressed(f: BinaryIO, name: str, value: Any) -> None:
+    # the compressed size is only known at the end: patch the tag afterwards
+    start = f.tell()
+    f.write(_tag(MI_COMPRESSED, 0))
+    z = zlib.compressobj()
+    _write_v5_matrix(lambda data: f.write(z.compress(data)), name, value)
+    f.write(z.flush())
+    end = f.tell()
+    f.seek(start)
+    f.write(_tag(MI_COMPRESSED, end - start - 8))
+    f.seek(end)
+
+
+def write_v5(path: str, tree: Dict[str, Any], compressed: bool) -> None:
+    header = b"MATLAB 5.0 MAT-file, Platform: GLNXA64, Created by: make_fixtures.py"
+    with open(path, "wb") as f:
+        f.write(header.ljust(116, b" ") + b"\0" * 8 + struct.pack("<H", 0x0100) + b"IM")
+        for name, value in tree.items():
+            if compressed:
+                _write_v5_compressed(f, name, value)
+            else:
+                _write_v5_matrix(f.write, name, value)
+
+
+def write_fixture(path: str, fmt: str, tree: Dict[str, Any]) -> None:
+    if fmt in ("v73", "v73c"):
+        write_v73(path, tree, chunked=fmt == "v73c")
+    elif fmt == "v4":
+        write_v4(path, tree)
+    else:
+        write_v5(path, tree, compressed=fmt == "v5z")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--out", default=os.path.join(os.path.dirname(__file__), "fixtures")
+    )
+    parser.add_argument("--sizes", default="64KB,16MB,256MB")
+    parser.add_argument("--formats", default=",".join(FORMATS))
+    parser.add_argument("--layouts", default=",".join(LAYOUTS))
+    parser.add_argument(
+        "--force", action="store_true", help="Rewrite fixtures that already exist"
+    )
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    for nbytes in (parse_size(s) for s in args.sizes.split(",")):
+        for layout in args.layouts.split(","):
+            tree = build_layout(layout, nbytes)
+            for fmt in args.formats.split(","):
+                if fmt == "v4" and layout == "deep_struct":
+                    continue  # v4 has no structs
+                name = f"{fmt}_{layout}_{size_label(nbytes)}.mat"
+                path = os.path.join(args.out, name)
+                if os.path.exists(path) and not args.force:
+                    continue
+                write_fixture(path, fmt, tree)
+                print(path, file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import time
+from typing import TYPE_CHECKING, Iterable, Iterator, Optional
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+class Budget:
+    """
+    How much one preview may read and how long it may take.
+
+    ``max_bytes`` and ``timeout`` apply to each entry, from the last
+    ``start_entry()``; ``file_timeout`` to the whole file. Readers charge
+    what they read and poll between blocks, so nothing is interrupted in
+    the middle of a read and an entry overshoots by at most one block.
+    The default budget is unlimited.
+    """
+
+    def __init__(
+        self,
+        max_bytes: Optional[int] = None,
+        timeout: Optional[float] = None,
+        file_timeout: Optional[float] = None,
+    ) -> None:
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.file_deadline = (
+            None if file_timeout is None else time.monotonic() + file_timeout
+        )
+        # set once any time limit has cut something short; such results
+        # depend on the machine and its load, so they are not cached
+        self.timed_out = False
+        self.start_entry()
+
+    def start_entry(self) -> None:
+        self.used = 0
+        self.reason: Optional[str] = None
+        deadlines = [d for d in (self.file_deadline,) if d is not None]
+        if self.timeout is not None:
+            deadlines.append(time.monotonic() + self.timeout)
+        self.deadline = min(deadlines) if deadlines else None
+
+    def remaining_bytes(self) -> Optional[int]:
+        if self.max_bytes is None:
+            return None
+        return max(self.max_bytes - self.used, 0)
+
+    def affordable(self, nbytes: int) -> bool:
+        return self.max_bytes is None or self.used + nbytes <= self.max_bytes
+
+    def decline(self, nbytes: int) -> None:
+        """Record that a read of ``nbytes`` was skipped for lack of budget."""
+        limit = f"--max-bytes-per-entry {self.max_bytes}"
+        self.reason = f"{nbytes} more bytes exceed {limit}"
+
+    def ok(self) -> bool:
+        """False once the current entry is over its byte or time budget."""
+        if self.reason is not None:
+            return False
+        if self.max_bytes is not None and self.used >= self.max_bytes:
+            self.reason = f"--max-bytes-per-entry {self.max_bytes}"
+        elif self.deadline is not None and time.monotonic() >= self.deadline:
+            self.timed_out = True
+            if self.file_expired():
+                self.reason = "--timeout"
+            else:
+                self.reason = f"--timeout-per-entry {self.timeout:g}"
+        return self.reason is None
+
+    def charge(self, nbytes: int) -> bool:
+        """Record ``nbytes`` read for the current entry; same result as ok()."""
+        self.used += nbytes
+        return self.ok()
+
+    def limit(self, blocks: Iterable[np.ndarray]) -> Iterator[np.ndarray]:
+        """Pass ``blocks`` through until the entry runs out of budget."""
+        for block in blocks:
+            # checked once the next block is there, so a pass that ends
+            # exactly at the limit is not reported as cut short
+            if not self.ok():
+                return
+            yield block
+            self.used += block.nbytes
+
+    def file_expired(self) -> bool:
+        deadline = self.file_deadline
+        return deadline is not None and time.monotonic() >= deadline
+
+    def note(self, what: str) -> str:
+        if not self.used:
+            return f"{what} ({self.reason})"
+        return f"{what} after {self.used} bytes ({self.reason})"
+
+    def sample_note(self, got: int, wanted: int) -> Optional[str]:
+        """
+        Note for a sample of ``got`` out of ``wanted`` elements, None if it
+        is complete. Only a budget that has run out is blamed for the rest.
+        """
+        if got >= wanted:
+            return None
+        if self.reason is None:
+            return f"sample limited to {got} of {wanted} elements"
+        return self.note("sample truncated")
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import json
+import os
+import tempfile
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Optional
+
+from archive import open_source, split_member
+
+# Bump when the cached entry layout changes so stale results are ignored.
+CACHE_VERSION = 8
+
+DEFAULT_MAX_BYTES = 64 << 20
+
+
+def default_cache_dir(environ: Optional[Mapping[str, str]] = None) -> str:
+    """Cache location from ``environ`` (default: this process's environment)."""
+    env = os.environ if environ is None else environ
+    path = env.get("MAT_PREVIEW_CACHE_DIR")
+    if path:
+        return path
+    home = env.get("HOME") or os.path.expanduser("~")
+    base = env.get("XDG_CACHE_HOME") or os.path.join(home, ".cache")
+    return os.path.join(base, "mat_preview")
+
+
+def file_digest(path: str, block_size: int = 1 << 20) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    with open_source(path) as f:
+        while block := f.read(block_size):
+            h.update(block)
+    return h.hexdigest()
+
+
+@dataclass
+class PreviewCache:
+    """
+    On-disk cache of preview results, one JSON file per key.
+
+    A key combines the file identity (absolute path, size, mtime and,
+    with ``content_hash``, a digest of the bytes; for an archive member the
+    size and mtime are the archive's) with the preview options,
+    so any change to the file or the options is a miss. When the directory
+    grows past ``max_bytes`` the least recently used results are evicted.
+    """
+
+    directory: str
+    max_bytes: int = DEFAULT_MAX_BYTES
+    content_hash: bool = False
+
+    def key(self, path: str, options: Dict[str, Any]) -> str:
+        st = os.stat(split_member(path)[0])
+        ident: Dict[str, Any] = {
+            "version": CACHE_VERSION,
+            "path": os.path.abspath(path),
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+            "options": options,
+        }
+        if self.content_hash:
+            ident["digest"] = file_digest(path)
+        raw = json.dumps(ident, sort_keys=True).encode()
+        return hashlib.sha256(raw).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        path = self._path(key)
+        try:
+            with open(path) as f:
+                entries = json.load(f)
+            os.utime(path)  # recency for eviction
+        except (OSError, ValueError):
+            return None
+        return entries
+
+    def put(self, key: str, entries: List[Dict[str, Any]]) -> None:
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        except OSError:
+            return  # a read-only or full cache must never break a preview
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(entries, f)
+            os.replace(tmp, self._path(key))
+        except OSError:
+            return
+        finally:
+            # gone after a successful replace; otherwise a half-written file
+            with contextlib.suppress(OSError):
+                os.unlink(tmp)
+        self.evict()
+
+    def evict(self) -> None:
+        files = []
+        total = 0
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return
+        for name in names:
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            files.append((st.st_mtime_ns, st.st_size, path))
+            total += st.st_size
+
+        files.sort()
+        for _, size, path in files:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
@@ -0,0 +1,316 @@
+from __future__ import annotations
+
+import contextlib
+import math
+from dataclasses import dataclass
+from typing import Any, BinaryIO, Callable, Iterator, Optional, Tuple, Union
+
+import numpy as np
+
+from budget import Budget
+from entry import Entry
+from headers import MCLASS_DTYPES
+from sampling import sample_array, sample_str
+from stats import array_stats, is_numeric
+from v5 import V5Array, open_numeric
+from v73 import CHAR_LIMIT
+
+
+@dataclass
+class ClassicVar:
+    name: str
+    shape: Tuple[int, ...]
+    mclass: str  # MATLAB class, e.g. "double", "struct", "cell"
+    load: Callable[[], Any]
+    # v5 only: lazy memmap/streaming view for plain numeric arrays, or None
+    numeric: Callable[[], Optional[V5Array]] = lambda: None
+    nbytes: int = 0  # size on disk, compressed if the variable is
+
+
+def _open_numeric(f: BinaryIO, offset: int, order: str) -> Optional[V5Array]:
+    # scipy's variable reader continues from the current file position, so
+    # it must be restored for a later load() of the same variable
+    pos = f.tell()
+    try:
+        return open_numeric(f, offset, order)
+    finally:
+        f.seek(pos)
+
+
+def _load(reader: Any, offset: int) -> Any:
+    # re-reading the header makes load() independent of the walk's position
+    reader.mat_stream.seek(offset)
+    hdr, _ = reader.read_var_header()
+    return reader.read_var_array(hdr, process=True)
+
+
+def iter_classic_vars(source: Union[str, BinaryIO]) -> Iterator[ClassicVar]:
+    """
+    Walk the variable headers of a classic (v4/v5/v7) MAT file.
+
+    Only the tag and array header of each variable is decoded while walking;
+    the data is decompressed and materialized only if ``load()`` is called,
+    which works at any time while the file is open (not only before the
+    iterator advances). Stopping iteration early leaves the rest of the file
+    untouched.
+
+    For v5 files ``numeric()`` offers a cheaper alternative to ``load()``
+    for real numeric arrays: a ``V5Array`` that memory-maps uncompressed
+    data and inflates compressed data only as far as needed.
+
+    This drives scipy's reader the same way ``whosmat``/``loadmat`` do
+    internally, but one variable at a time. ``source`` is a path or an
+    already open binary file, which is left open.
+    """
+    from scipy.io.matlab import _mio4, _mio5_params  # type: ignore
+    from scipy.io.matlab._mio import mat_reader_factory  # type: ignore
+
+    if isinstance(source, str):
+        opened: Any = open(source, "rb")
+    else:
+        opened = contextlib.nullcontext(source)
+
+    with opened as f:
+        reader, _ = mat_reader_factory(f, struct_as_record=False, squeeze_me=True)
+        is_v5 = not isinstance(reader, _mio4.MatFile4Reader)
+        if is_v5:
+            mclass_info = _mio5_params.mclass_info
+        else:
+            mclass_info = _mio4.mclass_info
+
+        reader.mat_stream.seek(0)
+        reader.initialize_read()
+        if hasattr(reader, "read_file_header"):
+            reader.read_file_header()
+
+        while not reader.end_of_stream():
+            offset = reader.mat_stream.tell()
+            hdr, next_position = reader.read_var_header()
+            name = "None" if hdr.name is None else hdr.name.decode("latin1")
+            if name == "":
+                # can only be a MATLAB 7 function workspace
+                name = "__function_workspace__"
+            shape = tuple(
+                int(x) for x in reader._matrix_reader.shape_from_header(hdr)
+            )
+            if getattr(hdr, "is_logical", False):
+                mclass = "logical"
+            else:
+                mclass = mclass_info.get(hdr.mclass, "unknown")
+
+            yield ClassicVar(
+                name=name,
+                shape=shape,
+                mclass=mclass,
+                load=lambda offset=offset: _load(reader, offset),
+                numeric=(
+                    (lambda offset=offset: _open_numeric(f, offset, reader.byte_order))
+                    if is_v5
+                    else lambda: None
+                ),
+                nbytes=next_position - offset,
+            )
+            reader.mat_stream.seek(next_position)
+
+
+def classify_value(value: Any, mclass: Optional[str] = None) -> Tuple[str, Any]:
+    """
+    How a value loaded by scipy is shown: ``"other"`` (opaque MATLAB
+    objects), ``"struct"``, ``"elements"`` (cells and struct arrays, as an
+    object array), ``"char"``, ``"sparse"`` or ``"array"``, along with the
+    value itself, rewrapped or recast where squeezing lost its class.
+    """
+    import scipy.sparse  # type: ignore
+    from scipy.io.matlab import (  # type: ignore
+        MatlabFunction,
+        MatlabObject,
+        MatlabOpaque,
+        mat_struct,
+    )
+
+    opaque = (MatlabFunction, MatlabObject, MatlabOpaque)
+    is_object_array = isinstance(value, np.ndarray) and value.dtype == object
+    if isinstance(value, opaque) or mclass in ("object", "function", "opaque"):
+        return "other", value
+    if isinstance(value, mat_struct):
+        return "struct", value
+    if mclass == "cell" and not is_object_array:
+        # squeeze_me unwraps a 1x1 cell to its only element
+        cell = np.empty((1, 1), dtype=object)
+        cell[0, 0] = value
+        return "elements", cell
+    if is_object_array:
+        return "elements", value
+    if isinstance(value, str) or (
+        isinstance(value, np.ndarray) and value.dtype.kind == "U"
+    ):
+        return "char", value
+    if scipy.sparse.issparse(value):
+        return "sparse", value
+    dtype = None
+    if isinstance(value, (bool, int, float)):
+        dtype = MCLASS_DTYPES.get(mclass)
+    elif isinstance(value, complex):
+        dtype = "c8" if mclass == "single" else "c16"
+    return "array", np.asarray(value, dtype)
+
+
+def is_struct_array(value: np.ndarray, mclass: Optional[str] = None) -> bool:
+    """Whether an object array from ``classify_value`` is a struct array."""
+    from scipy.io.matlab import mat_struct  # type: ignore
+
+    # struct arrays come back as object arrays of mat_struct, like cells;
+    # without the header's class, a cell holding only structs looks the same
+    # (and an empty struct array like an empty cell)
+    if mclass is not None:
+        return mclass == "struct"
+    return value.size > 0 and all(isinstance(v, mat_struct) for v in value.flat)
+
+
+class ClassicWalker:
+    """
+    Entries for a variable loaded by scipy (``struct_as_record=False``,
+    ``squeeze_me=True``), named the way ``V73Walker`` names them: struct
+    fields become ``s.a``, struct array elements ``s(i)`` and cell elements
+    ``c{i}``, with linear indices in MATLAB's column-major order.
+
+    The value is decoded in one go, but entries are produced lazily in
+    pre-order and never deeper than ``max_depth`` levels below the
+    variable, so nothing past the last consumed entry is formatted. Shapes
+    are squeezed, as for every other classic entry. Each entry gets a fresh
+    allowance from ``budget`` for its stats.
+    """
+
+    def __init__(
+        self,
+        sample_k: int,
+        sample_mode: str = "head",
+        seed: int = 0,
+        stats: bool = False,
+        max_depth: int = 3,
+        budget: Optional[Budget] = None,
+    ) -> None:
+        self.sample_k = sample_k
+        self.sample_mode = sample_mode
+        self.seed = seed
+        self.stats = stats
+        self.max_depth = max_depth
+        self.budget = budget or Budget()
+
+    def iter_entries(self, var: ClassicVar, value: Any) -> Iterator[Entry]:
+        # only the header still knows a 1x1 cell or a logical scalar
+        # after squeezing
+        yield from self._visit(var.name, value, 0, var.mclass)
+
+    def _visit(
+        self, name: str, value: Any, depth: int, mclass: Optional[str] = None
+    ) -> Iterator[Entry]:
+        self.budget.start_entry()
+        kind, value = classify_value(value, mclass)
+        if kind == "other":
+            cls = mclass or type(value).__name__
+            yield Entry(
+                name=name,
+                kind="other",
+                dtype=cls,
+                shape=(),
+                note=f"MATLAB object of class {cls}; not decoded",
+            )
+        elif kind == "struct":
+            yield from self._struct(name, value, depth)
+        elif kind == "elements":
+            yield from self._elements(name, value, depth, mclass)
+        elif kind == "char":
+            yield self._char(name, value)
+        elif kind == "sparse":
+            yield self._sparse(name, value, mclass)
+        else:
+            yield self._array(name, value, mclass)
+
+    def _struct(self, name: str, value: Any, depth: int) -> Iterator[Entry]:
+        fields = list(value._fieldnames)
+        yield Entry(
+            name=name,
+            kind="struct",
+            dtype="struct",
+            shape=(1, 1),
+            note=f"fields: {', '.join(fields)}",
+        )
+        if depth >= self.max_depth:
+            return
+        for field in fields:
+            yield from self._visit(f"{name}.{field}", getattr(value, field), depth + 1)
+
+    def _elements(
+        self, name: str, value: np.ndarray, depth: int, mclass: Optional[str] = None
+    ) -> Iterator[Entry]:
+        is_struct = is_struct_array(value, mclass)
+        shape = tuple(int(x) for x in value.shape)
+        yield Entry(
+            name=name,
+            kind="struct" if is_struct else "cell",
+            dtype="struct" if is_struct else "cell",
+            shape=shape,
+            note=f"{math.prod(shape)} elements",
+        )
+        if depth >= self.max_depth:
+            return
+        for index, item in enumerate(value.ravel(order="F"), 1):
+            child = f"{name}({index})" if is_struct else f"{name}{{{index}}}"
+            yield from self._visit(child, item, depth + 1)
+
+    def _char(self, name: str, value: Any) -> Entry:
+        if isinstance(value, str):
+            shape: Tuple[int, ...] = (1, len(value))
+            text = value
+        else:
+            shape = tuple(int(x) for x in value.shape)
+            text = "\n".join(value.ravel(order="F")[:CHAR_LIMIT])
+        note = "truncated" if len(text) > CHAR_LIMIT else None
+        return Entry(
+            name=name,
+            kind="dataset",
+            dtype="char",
+            shape=shape,
+            sample=text[:CHAR_LIMIT],
+            note=note,
+        )
+
+    def _sparse(self, name: str, value: Any, mclass: Optional[str] = None) -> Entry:
+        a = sample_array(value.data, self.sample_k, self.sample_mode, self.seed)
+        if mclass == "logical":
+            a = a.astype(bool)
+        return Entry(
+            name=name,
+            kind="dataset",
+            dtype="logical" if mclass == "logical" else str(value.dtype),
+            shape=tuple(int(x) for x in value.shape),
+            sample=sample_str(a, self.sample_k),
+            note=f"sparse; {value.nnz} nonzeros",
+        )
+
+    def _array(self, name: str, value: np.ndarray, mclass: Optional[str]) -> Entry:
+        sample = None
+        note = None
+        summary = None
+        try:
+            a = sample_array(value, self.sample_k, self.sample_mode, self.seed)
+            if mclass == "logical":
+                a = a.astype(bool)
+            sample = sample_str(a, self.sample_k)
+            if self.stats and is_numeric(value.dtype):
+                summary = array_stats(value, self.budget)
+                if summary.get("partial"):
+                    note = self.budget.note("stats stopped")
+        except Exception as e:
+            note = f"sample error: {type(e).__name__}"
+
+        return Entry(
+            name=name,
+            kind="dataset",
+            dtype="logical" if mclass == "logical" else str(value.dtype),
+            shape=tuple(int(x) for x in value.shape),
+            sample=sample,
+            note=note,
+            stats=summary,
+        )
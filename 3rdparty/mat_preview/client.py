@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Thin client for the mat_preview daemon.
+
+Forwards the command line to a running ``mat_preview-daemon`` over a Unix
+socket and relays its output, so a preview costs a socket round trip rather
+than importing numpy, scipy and h5py. Without a daemon the command runs
+in-process, exactly like ``mat_preview``. Only the standard library is
+imported on the fast path.
+
+Wire protocol: one JSON line ``{"argv": [...], "cwd": ..., "env": {...}}``
+per connection; the reply is JSON lines ``{"stdout": text}``,
+``{"stderr": text}`` and a final ``{"exit": status}``.
+"""
+from __future__ import annotations
+
+import json
+import os
+import socket
+import sys
+import tempfile
+from typing import List, Optional
+
+# Variables the daemon needs from the client to behave like a local run.
+FORWARDED_ENV = ("MAT_PREVIEW_CACHE_DIR", "XDG_CACHE_HOME", "HOME")
+
+
+def default_socket_path() -> str:
+    env = os.environ.get("MAT_PREVIEW_SOCKET")
+    if env:
+        return env
+    base = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    return os.path.join(base, f"mat_preview-{os.getuid()}.sock")
+
+
+def request(argv: List[str], path: Optional[str] = None) -> Optional[int]:
+    """
+    Run ``argv`` on the daemon, writing its output to this process's
+    stdout/stderr as it arrives. Returns the exit status, or None if no
+    daemon is listening.
+    """
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path or default_socket_path())
+    except OSError:
+        sock.close()
+        return None
+
+    with sock, sock.makefile("rb") as replies:
+        env = {k: os.environ[k] for k in FORWARDED_ENV if k in os.environ}
+        line = json.dumps({"argv": argv, "cwd": os.getcwd(), "env": env}) + "\n"
+        sock.sendall(line.encode())
+        for raw in replies:
+            frame = json.loads(raw)
+            if "stdout" in frame:
+                sys.stdout.write(frame["stdout"])
+                sys.stdout.flush()
+            elif "stderr" in frame:
+                sys.stderr.write(frame["stderr"])
+            elif "exit" in frame:
+                return int(frame["exit"])
+    sys.stderr.write("mat_preview: daemon closed the connection\n")
+    return 1
+
+
+def main() -> None:
+    try:
+        status = request(sys.argv[1:])
+    except BrokenPipeError:
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        sys.exit(1)
+
+    if status is None:
+        import main as cli
+
+        cli.main()
+        return
+    sys.exit(status)
+
+
+if __name__ == "__main__":
+    main()
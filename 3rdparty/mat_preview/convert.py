@@ -0,0 +1,547 @@
+"""
+``mat_preview convert``: write the numeric contents of MAT files to formats
+that can be memory-mapped or read without copies.
+
+Every numeric (or logical) variable, and every numeric struct field
+flattened to a dotted name such as ``data.block``, becomes a column.
+
+- ``npy`` writes one Fortran-order ``.npy`` file per column, streamed from
+  the file in blocks, so ``np.load(path, mmap_mode="r")`` maps it without
+  a copy and converting never holds a whole array in memory.
+- ``arrow`` (IPC file format) and ``parquet`` write one table per
+  top-level variable; vectors become columns and the columns of a matrix
+  become ``<name>_1``, ``<name>_2``, ... These need pyarrow.
+
+Char arrays, cells, sparse matrices and objects are listed as skipped.
+Each source gets an output directory with a ``manifest.json`` recording
+the source's size and mtime; a later run re-converts only sources whose
+manifest no longer matches.
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import json
+import math
+import os
+import sys
+from dataclasses import dataclass, field
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    IO,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from archive import ARCHIVE_SUFFIXES, open_source, split_member
+from batch import expand_paths, run_batch
+from detect import HDF5_FORMATS, TABULAR_FORMATS, UNKNOWN, detect_format
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# Bump when the output layout changes so existing outputs are rewritten.
+CONVERT_VERSION = 1
+
+FORMATS = ("npy", "arrow", "parquet")
+SUFFIXES = {"npy": ".npy", "arrow": ".arrow", "parquet": ".parquet"}
+
+MANIFEST = "manifest.json"
+
+# Elements copied per block while streaming an array into a .npy file.
+COPY_ELEMS = 1 << 22
+
+
+@dataclass
+class Column:
+    name: str
+    dtype: np.dtype
+    shape: Tuple[int, ...]  # MATLAB order, squeezed as by loadmat
+    # the data in storage (column-major) order, ``n`` elements at a time
+    blocks: Callable[[int], Iterator[np.ndarray]]
+
+
+@dataclass
+class Skipped:
+    name: str
+    reason: str
+    # the whole value, for callers that compare rather than convert
+    load: Optional[Callable[[], Any]] = field(default=None, repr=False)
+
+
+Leaf = Union[Column, Skipped]
+
+
+def _squeeze(shape: Tuple[int, ...]) -> Tuple[int, ...]:
+    return tuple(d for d in shape if d != 1)
+
+
+def _array_column(name: str, value: np.ndarray) -> Column:
+    flat = value.reshape(-1, order="F")
+
+    def blocks(n: int) -> Iterator[np.ndarray]:
+        for start in range(0, flat.size, n):
+            yield flat[start : start + n]
+
+    return Column(name, value.dtype, tuple(value.shape), blocks)
+
+
+def _is_numeric(dtype: np.dtype) -> bool:
+    return dtype.kind in "biufc"
+
+
+def _flatten(name: str, value: Any) -> Iterator[Leaf]:
+    """Leaves of a value loaded by scipy (``struct_as_record=False``)."""
+    import numpy as np
+    from scipy.io.matlab import mat_struct  # type: ignore
+
+    if isinstance(value, mat_struct):
+        for key in value._fieldnames:
+            yield from _flatten(f"{name}.{key}", getattr(value, key))
+        return
+    if isinstance(value, (bool, int, float, complex, np.generic)):
+        value = np.asarray(value)
+    if isinstance(value, str):
+        yield Skipped(name, "char", lambda: value)
+        return
+    if not isinstance(value, np.ndarray):
+        yield Skipped(name, type(value).__name__, lambda: value)
+        return
+    if _is_numeric(value.dtype):
+        yield _array_column(name, value)
+        return
+    if value.dtype == object and value.size and all(
+        isinstance(v, mat_struct) for v in value.flat
+    ):
+        yield from _struct_array(name, value)
+        return
+    reason = "char" if value.dtype.kind == "U" else str(value.dtype)
+    yield Skipped(name, reason, lambda: value)
+
+
+def _struct_array(name: str, value: np.ndarray) -> Iterator[Leaf]:
+    """A field whose value is a numeric scalar in every element is a column."""
+    import numpy as np
+
+    elements = list(value.reshape(-1, order="F"))
+    for key in elements[0]._fieldnames:
+        items = [np.asarray(getattr(e, key, None)) for e in elements]
+        if all(a.ndim == 0 and _is_numeric(a.dtype) for a in items):
+            column = np.array([a[()] for a in items]).reshape(value.shape, order="F")
+            yield _array_column(f"{name}.{key}", column)
+        else:
+            reason = "struct array field is not scalar"
+            yield Skipped(f"{name}.{key}", reason, lambda items=items: items)
+
+
+def _classic_leaves(var: Any) -> List[Leaf]:
+    import numpy as np
+
+    try:
+        lazy = var.numeric()
+    except Exception:
+        lazy = None
+    if lazy is not None:
+        dtype = np.dtype(bool) if var.mclass == "logical" else lazy.dtype
+
+        def blocks(n: int) -> Iterator[Any]:
+            for block in lazy.blocks(n):
+                yield block.astype(dtype, copy=False)
+
+        return [Column(var.name, dtype, lazy.shape, blocks)]
+    if var.mclass in ("char", "cell", "sparse", "object", "function", "opaque"):
+        return [Skipped(var.name, var.mclass, var.load)]
+    return list(_flatten(var.name, var.load()))
+
+
+def _hdf5_leaves(name: str, obj: Any) -> Iterator[Leaf]:
+    import h5py  # type: ignore
+    import numpy as np
+
+    from stats import block_slices, is_numeric
+    from v73 import _is_reference, matlab_class, matlab_shape
+
+    cls = matlab_class(obj)
+    load = lambda: _hdf5_value(obj)  # noqa: E731
+    if isinstance(obj, h5py.Group):
+        if "MATLAB_sparse" in obj.attrs:
+            yield Skipped(name, "sparse", load)
+        elif cls in (None, "struct"):
+            for key in obj:
+                yield from _hdf5_leaves(f"{name}.{key}", obj[key])
+        else:
+            yield Skipped(name, cls, load)
+        return
+    if not isinstance(obj, h5py.Dataset):
+        return
+    if obj.attrs.get("MATLAB_empty", 0):
+        yield Skipped(name, "empty", load)
+    elif _is_reference(obj):
+        yield Skipped(name, cls or "struct array", load)
+    elif cls == "char" or not is_numeric(obj.dtype):
+        yield Skipped(name, cls or str(obj.dtype), load)
+    else:
+        dtype = np.dtype(bool) if cls == "logical" else obj.dtype
+
+        def blocks(n: int, ds: Any = obj, dtype: Any = dtype) -> Iterator[Any]:
+            # C order over the HDF5 shape is MATLAB's column-major order
+            for sel in block_slices(tuple(ds.shape), n):
+                yield np.asarray(ds[sel]).reshape(-1).astype(dtype, copy=False)
+
+        yield Column(name, dtype, _squeeze(matlab_shape(obj)), blocks)
+
+
+def _hdf5_value(obj: Any) -> Any:
+    """The whole value of an HDF5 object, with references followed."""
+    import h5py  # type: ignore
+    import numpy as np
+
+    from v73 import _is_reference
+
+    if isinstance(obj, h5py.Group):
+        return {key: _hdf5_value(obj[key]) for key in obj}
+    data = obj[()]
+    if not _is_reference(obj):
+        return data
+    return [_hdf5_value(obj.file[ref]) if ref else None for ref in np.ravel(data)]
+
+
+@contextlib.contextmanager
+def open_variables(path: str) -> Iterator[Dict[str, Callable[[], List[Leaf]]]]:
+    """
+    Top-level variables of a file (or archive member), in file order, each
+    mapped to a function that lists its leaves. Opening reads headers only;
+    leaves can be listed in any order while the file is open.
+    """
+    with open_source(path) as f:
+        fmt = detect_format(f)
+        if fmt == UNKNOWN or fmt in TABULAR_FORMATS:
+            raise ValueError(f"{path}: not a MAT or HDF5 file")
+        if fmt not in HDF5_FORMATS:
+            from classic import iter_classic_vars
+
+            yield {
+                var.name: lambda var=var: _classic_leaves(var)
+                for var in iter_classic_vars(f)
+                if not var.name.startswith("__")
+            }
+            return
+
+        import h5py  # type: ignore
+
+        from v73 import INTERNAL_GROUPS
+
+        source: Any = f
+        if split_member(path)[1] is None:
+            # plain files go through HDF5's own driver
+            f.close()
+            source = path
+        with h5py.File(source, "r") as h5:
+            yield {
+                name: lambda name=name: list(_hdf5_leaves(name, h5[name]))
+                for name in h5
+                if name not in INTERNAL_GROUPS
+            }
+
+
+def _safe(name: str) -> str:
+    return name.replace(os.sep, "_")
+
+
+def _materialize(col: Column) -> np.ndarray:
+    import numpy as np
+
+    parts = list(col.blocks(COPY_ELEMS))
+    flat = np.concatenate(parts) if parts else np.empty((0,), col.dtype)
+    return flat.reshape(col.shape, order="F")
+
+
+def write_npy(col: Column, path: str) -> None:
+    """Stream ``col`` into a Fortran-order .npy file without loading it."""
+    import numpy as np
+
+    tmp = f"{path}.tmp"
+    if math.prod(col.shape) == 0:
+        np.save(tmp, np.empty(col.shape, col.dtype, order="F"))
+        os.replace(f"{tmp}.npy", path)
+        return
+    out = np.lib.format.open_memmap(
+        tmp, mode="w+", dtype=col.dtype, shape=col.shape, fortran_order=True
+    )
+    flat = out.reshape(-1, order="F")  # a view: the map is Fortran-contiguous
+    pos = 0
+    for block in col.blocks(COPY_ELEMS):
+        flat[pos : pos + block.size] = block
+        pos += block.size
+    out.flush()
+    del flat, out
+    os.replace(tmp, path)
+
+
+def _table_columns(
+    var: str, leaves: List[Leaf]
+) -> Tuple[Dict[str, np.ndarray], List[Skipped]]:
+    """
+    Equal-length 1-d columns for one variable's table. Leaves inside a
+    struct are named relative to it; matrices are split by column.
+    """
+    candidates: List[Tuple[str, np.ndarray]] = []
+    skipped = [leaf for leaf in leaves if isinstance(leaf, Skipped)]
+    for leaf in leaves:
+        if isinstance(leaf, Skipped):
+            continue
+        label = leaf.name[len(var) + 1 :] if leaf.name != var else var
+        if leaf.dtype.kind == "c":
+            skipped.append(Skipped(leaf.name, "complex; use --to npy"))
+        elif len(leaf.shape) > 2:
+            skipped.append(Skipped(leaf.name, "more than 2 dims; use --to npy"))
+        elif len(leaf.shape) == 2:
+            data = _materialize(leaf)
+            for j in range(leaf.shape[1]):
+                candidates.append((f"{label}_{j + 1}", data[:, j]))
+        else:
+            candidates.append((label, _materialize(leaf).reshape(-1)))
+
+    lengths = [len(data) for _, data in candidates]
+    rows = max(set(lengths), key=lengths.count) if lengths else 0
+    columns: Dict[str, np.ndarray] = {}
+    for label, data in candidates:
+        if len(data) == rows:
+            columns[label] = data
+        else:
+            skipped.append(
+                Skipped(f"{var}.{label}", f"{len(data)} rows, table has {rows}")
+            )
+    return columns, skipped
+
+
+def write_table(columns: Dict[str, np.ndarray], path: str, fmt: str) -> None:
+    import pyarrow as pa  # type: ignore
+
+    table = pa.table({name: pa.array(data) for name, data in columns.items()})
+    tmp = f"{path}.tmp"
+    if fmt == "parquet":
+        import pyarrow.parquet as pq  # type: ignore
+
+        pq.write_table(table, tmp)
+    else:
+        with pa.OSFile(tmp, "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+    os.replace(tmp, path)
+
+
+def _fingerprint(path: str, fmt: str) -> Dict[str, Any]:
+    # for an archive member the archive's size and mtime stand in
+    st = os.stat(split_member(path)[0])
+    return {
+        "version": CONVERT_VERSION,
+        "format": fmt,
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+    }
+
+
+def output_dir(path: str, root: str, out_root: str) -> str:
+    """
+    ``<out_root>/<path relative to root, without suffix>``; an archive
+    member lands under the archive's name.
+    """
+    archive, member = split_member(path)
+    rel = os.path.relpath(os.path.abspath(archive), root)
+    if member is not None:
+        for suffix in ARCHIVE_SUFFIXES:
+            if rel.lower().endswith(suffix):
+                rel = rel[: -len(suffix)]
+        rel = os.path.join(rel, *member.split("/"))
+    return os.path.join(out_root, os.path.splitext(rel)[0])
+
+
+def _load_manifest(directory: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(os.path.join(directory, MANIFEST)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_variables(
+    variables: Dict[str, Callable[[], List[Leaf]]], directory: str, fmt: str
+) -> Tuple[List[Dict[str, Any]], List[Skipped]]:
+    outputs: List[Dict[str, Any]] = []
+    skipped: List[Skipped] = []
+    for var, list_leaves in variables.items():
+        leaves = list_leaves()
+        if fmt == "npy":
+            for leaf in leaves:
+                if isinstance(leaf, Skipped):
+                    skipped.append(leaf)
+                    continue
+                name = f"{_safe(leaf.name)}.npy"
+                write_npy(leaf, os.path.join(directory, name))
+                outputs.append(
+                    dict(
+                        name=leaf.name,
+                        file=name,
+                        dtype=str(leaf.dtype),
+                        shape=list(leaf.shape),
+                    )
+                )
+        else:
+            columns, left_out = _table_columns(var, leaves)
+            skipped.extend(left_out)
+            if not columns:
+                continue
+            name = f"{_safe(var)}{SUFFIXES[fmt]}"
+            write_table(columns, os.path.join(directory, name), fmt)
+            outputs.append(dict(name=var, file=name, columns=list(columns)))
+    return outputs, skipped
+
+
+def convert_file(
+    path: str, root: str, out_root: str, fmt: str = "npy", force: bool = False
+) -> Dict[str, Any]:
+    """
+    Convert one file (or archive member) into its output directory and
+    return the manifest. Nothing is read if the existing manifest matches
+    the source and all its outputs are present, unless ``force``.
+    """
+    directory = output_dir(path, root, out_root)
+    fingerprint = _fingerprint(path, fmt)
+    old = _load_manifest(directory)
+    if (
+        not force
+        and old is not None
+        and old.get("fingerprint") == fingerprint
+        and all(
+            os.path.exists(os.path.join(directory, o["file"]))
+            for o in old["outputs"]
+        )
+    ):
+        return {**old, "status": "unchanged"}
+
+    os.makedirs(directory, exist_ok=True)
+    with open_variables(path) as variables:
+        outputs, skipped = _write_variables(variables, directory, fmt)
+
+    # outputs of an earlier conversion that this one did not rewrite
+    written = {o["file"] for o in outputs}
+    for o in (old or {}).get("outputs", []):
+        if o["file"] not in written:
+            with contextlib.suppress(OSError):
+                os.remove(os.path.join(directory, o["file"]))
+
+    manifest = {
+        "source": os.path.abspath(path),
+        "fingerprint": fingerprint,
+        "outputs": outputs,
+        "skipped": [{"name": s.name, "reason": s.reason} for s in skipped],
+    }
+    tmp = os.path.join(directory, f"{MANIFEST}.tmp")
+    with open(tmp, "w") as out:
+        json.dump(manifest, out, indent=2)
+    os.replace(tmp, os.path.join(directory, MANIFEST))
+    return {**manifest, "status": "converted"}
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "paths",
+        nargs="+",
+        metavar="path",
+        help="Files, directories (searched recursively for *.mat), globs or "
+        "archives to convert",
+    )
+    parser.add_argument(
+        "-o",
+        "--output-dir",
+        required=True,
+        help="Root of the converted tree; each source gets a directory "
+        "mirroring its path relative to the inputs",
+    )
+    parser.add_argument(
+        "--to",
+        choices=FORMATS,
+        default="npy",
+        help="npy: one memory-mappable file per column; arrow/parquet: one "
+        "table per variable (needs pyarrow)",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Worker processes (default: CPU count)",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Convert every source, even if its outputs are up to date",
+    )
+
+
+def _common_root(paths: List[str]) -> str:
+    dirs = [os.path.dirname(os.path.abspath(split_member(p)[0])) for p in paths]
+    return os.path.commonpath(dirs)
+
+
+def run(
+    parser: argparse.ArgumentParser,
+    args: argparse.Namespace,
+    stdout: Optional[IO[str]] = None,
+    handles: Any = None,
+    cwd: Optional[str] = None,
+) -> None:
+    if cwd is not None:
+        args.paths = [os.path.join(cwd, p) for p in args.paths]
+        args.output_dir = os.path.join(cwd, args.output_dir)
+
+    if args.to != "npy":
+        try:
+            import pyarrow  # type: ignore  # noqa: F401
+        except ImportError:
+            parser.exit(1, f"mat_preview: --to {args.to} needs pyarrow\n")
+
+    paths = expand_paths(args.paths)
+    if not paths:
+        parser.exit(1, "mat_preview: no .mat files matched\n")
+
+    root = _common_root(paths)
+    out = stdout or sys.stdout
+    report = []
+    failed = 0
+    threads = handles is not None
+    for r in run_batch(
+        convert_file,
+        paths,
+        args.jobs,
+        threads,
+        root=root,
+        out_root=args.output_dir,
+        fmt=args.to,
+        force=args.force,
+    ):
+        item: Dict[str, Any] = {
+            "path": r.path,
+            "seconds": round(r.seconds, 4),
+            "error": r.error,
+        }
+        if r.error is None:
+            manifest: Dict[str, Any] = r.entries
+            item["status"] = manifest["status"]
+            item["output"] = output_dir(r.path, root, args.output_dir)
+            item["outputs"] = [o["file"] for o in manifest["outputs"]]
+            item["skipped"] = manifest["skipped"]
+        else:
+            failed += 1
+        report.append(item)
+
+    out.write(json.dumps(report, indent=2) + "\n")
+    if failed:
+        parser.exit(1, f"mat_preview: {failed} of {len(paths)} files failed\n")
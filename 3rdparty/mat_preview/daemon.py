@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Long-lived preview server for ``mat_preview-client``.
+
+numpy, scipy.io and h5py are imported once at startup, requests are served
+concurrently on threads, HDF5 files stay open in an LRU between requests,
+and results go through the same on-disk preview cache as the CLI.
+
+    mat_preview-daemon &
+    mat_preview-client data/s01.mat --list
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import signal
+import socket
+import socketserver
+import sys
+import threading
+from typing import Any, Dict, List, Optional
+
+import main as cli
+from cache import default_cache_dir
+from client import default_socket_path
+from handles import DEFAULT_MAX_OPEN, HDF5Handles
+
+
+class _Exit(Exception):
+    def __init__(self, status: int) -> None:
+        super().__init__(status)
+        self.status = status
+
+
+class _RequestParser(argparse.ArgumentParser):
+    """Writes usage, help and errors to the request instead of the process."""
+
+    out: Any = None
+    err: Any = None
+
+    def _print_message(self, message: str, file: Any = None) -> None:
+        if message:
+            (self.err if file is sys.stderr else self.out).write(message)
+
+    def exit(self, status: int = 0, message: Optional[str] = None) -> Any:
+        if message:
+            self.err.write(message)
+        raise _Exit(status)
+
+
+class _FrameWriter(io.TextIOBase):
+    """Text stream sending each write as one ``{key: text}`` JSON line."""
+
+    def __init__(self, wfile: Any, key: str, lock: threading.Lock) -> None:
+        self.wfile = wfile
+        self.key = key
+        self.lock = lock
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        if text:
+            frame = json.dumps({self.key: text}) + "\n"
+            with self.lock:
+                self.wfile.write(frame.encode())
+        return len(text)
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    server: PreviewServer
+
+    def handle(self) -> None:
+        try:
+            req = json.loads(self.rfile.readline())
+            argv = [str(a) for a in req["argv"]]
+            cwd = str(req["cwd"])
+            env = {str(k): str(v) for k, v in req.get("env", {}).items()}
+        except (ValueError, KeyError, TypeError, AttributeError):
+            return
+
+        lock = threading.Lock()
+        out = _FrameWriter(self.wfile, "stdout", lock)
+        err = _FrameWriter(self.wfile, "stderr", lock)
+        with contextlib.suppress(BrokenPipeError, ConnectionResetError):
+            status = self.server.execute(argv, cwd, env, out, err)
+            with lock:
+                self.wfile.write((json.dumps({"exit": status}) + "\n").encode())
+
+
+class PreviewServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path: str, max_open: int = DEFAULT_MAX_OPEN) -> None:
+        self.handles = HDF5Handles(max_open)
+        _claim_socket(path)
+        old = os.umask(0o177)  # socket usable by this user only
+        try:
+            super().__init__(path, _Handler)
+        finally:
+            os.umask(old)
+
+    def execute(
+        self, argv: List[str], cwd: str, env: Dict[str, str], out: Any, err: Any
+    ) -> int:
+        command, argv = cli.split_command(argv)
+        parser = cli.build_parser(_RequestParser, command)
+        assert isinstance(parser, _RequestParser)
+        parser.prog = "mat_preview" if command is None else f"mat_preview {command}"
+        parser.out, parser.err = out, err
+        if command is None:
+            # the client's environment decides where its cache lives
+            parser.set_defaults(cache_dir=default_cache_dir(env))
+        try:
+            args = parser.parse_args(argv)
+            cli.run(parser, args, stdout=out, handles=self.handles, cwd=cwd)
+        except _Exit as e:
+            return e.status
+        except (BrokenPipeError, ConnectionResetError):
+            raise
+        except Exception as e:
+            err.write(f"mat_preview: {type(e).__name__}: {e}\n")
+            return 1
+        return 0
+
+    def server_close(self) -> None:
+        super().server_close()
+        self.handles.close()
+        with contextlib.suppress(OSError):
+            os.unlink(self.server_address)  # type: ignore[arg-type]
+
+
+def _claim_socket(path: str) -> None:
+    """Remove a stale socket file, refusing if a daemon still answers on it."""
+    if not os.path.exists(path):
+        return
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except OSError:
+        os.unlink(path)
+    else:
+        raise SystemExit(f"mat_preview-daemon: already running on {path}")
+    finally:
+        probe.close()
+
+
+def _preload() -> None:
+    import h5py  # type: ignore  # noqa: F401
+    import scipy.io.matlab  # type: ignore  # noqa: F401
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--socket",
+        default=default_socket_path(),
+        help="Unix socket to listen on (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--max-open",
+        type=int,
+        default=DEFAULT_MAX_OPEN,
+        help="HDF5 files kept open between requests",
+    )
+    args = parser.parse_args()
+
+    _preload()
+    # SIGTERM shuts down as cleanly as Ctrl-C, removing the socket
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    with PreviewServer(args.socket, args.max_open) as server:
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
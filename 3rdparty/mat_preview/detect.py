@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import os
+from typing import BinaryIO
+
+from archive import open_source
+
+# Format tags returned by detect_format.
+V4 = "v4"
+V5 = "v5"  # also covers v6 and v7, which share the v5 layout
+V73 = "v7.3"
+HDF5 = "hdf5"  # HDF5 without a MAT header
+XLSX = "xlsx"  # any zip container; read as an Excel workbook
+TEXT = "text"  # plain text, read as a whitespace-delimited table
+UNKNOWN = "unknown"
+
+HDF5_FORMATS = (V73, HDF5)
+TABULAR_FORMATS = (XLSX, TEXT)
+
+MAT_HEADER_SIZE = 128
+HDF5_SIGNATURE = b"\x89HDF\r\n\x1a\n"
+ZIP_SIGNATURE = b"PK\x03\x04"
+
+# Control characters that may appear in text: \t \n \v \f \r
+_TEXT_CONTROLS = frozenset(range(9, 14))
+
+# The HDF5 superblock lives at 0 or at a power-of-two offset >= 512 (after a
+# user block); MAT v7.3 files put it at 512.
+_SUPERBLOCK_OFFSETS = (0, 512, 1024, 2048, 4096, 8192)
+
+
+def _has_hdf5_signature(f: BinaryIO, head: bytes) -> bool:
+    if head.startswith(HDF5_SIGNATURE):
+        return True
+    for offset in _SUPERBLOCK_OFFSETS[1:]:
+        f.seek(offset)
+        if f.read(len(HDF5_SIGNATURE)) == HDF5_SIGNATURE:
+            return True
+    return False
+
+
+def _is_text(head: bytes) -> bool:
+    if not head:
+        return False
+    if any(b < 32 and b not in _TEXT_CONTROLS for b in head):
+        return False
+    try:
+        head.decode("utf-8")
+    except UnicodeDecodeError as e:
+        # a multi-byte character cut off at the end of the header is fine
+        return e.start >= len(head) - 3
+    return True
+
+
+def _detect_mat(f: BinaryIO, head: bytes) -> str:
+    if head.startswith(HDF5_SIGNATURE):
+        return HDF5
+    if len(head) < 4:
+        return UNKNOWN
+    if 0 in head[:4]:
+        return V4
+    if len(head) < MAT_HEADER_SIZE:
+        return UNKNOWN
+
+    endian = head[126:128]
+    if endian == b"IM":
+        major = head[125]
+    elif endian == b"MI":
+        major = head[124]
+    else:
+        return HDF5 if _has_hdf5_signature(f, head) else UNKNOWN
+
+    if major == 1:
+        return V5
+    if major == 2:
+        return V73 if _has_hdf5_signature(f, head) else UNKNOWN
+    return UNKNOWN
+
+
+def detect_format(f: BinaryIO) -> str:
+    """
+    Classify an open binary file from its first bytes, without importing
+    h5py or scipy. The file position is restored afterwards.
+
+    Mirrors scipy's ``matfile_version``: a zero byte among the first four
+    means a v4 file, otherwise the version word at offset 124 of the 128-byte
+    header is 0x0100 (v5) or 0x0200 (v7.3). Files that are none of these are
+    tabular data if they are a zip container (xlsx) or plain text.
+    """
+    pos = f.tell()
+    try:
+        f.seek(0)
+        head = f.read(MAT_HEADER_SIZE)
+        fmt = _detect_mat(f, head)
+        if fmt == UNKNOWN:
+            if head.startswith(ZIP_SIGNATURE):
+                return XLSX
+            if _is_text(head):
+                return TEXT
+        return fmt
+    finally:
+        f.seek(pos)
+
+
+def detect_path(path: str | os.PathLike[str]) -> str:
+    """Format of a file or of an ``archive.zip::member`` path."""
+    with open_source(os.fspath(path)) as f:
+        return detect_format(f)
@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+# Kept here rather than in sampling so the CLI parser needs no numpy.
+SAMPLE_MODES = ("head", "stride", "random")
+
+
+@dataclass
+class Entry:
+    name: str
+    # "dataset" | "variable" | "group" | "struct" | "cell" | "other", or
+    # "truncated" for the last entry of a preview cut short by --timeout
+    kind: str
+    dtype: str
+    shape: Tuple[int, ...]
+    sample: Optional[str] = None
+    note: Optional[str] = None
+    stats: Optional[Dict[str, Any]] = None
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import collections
+import contextlib
+import os
+import threading
+from dataclasses import dataclass
+from typing import Any, Iterator, Tuple
+
+DEFAULT_MAX_OPEN = 64
+
+
+@dataclass
+class _Handle:
+    file: Any
+    ident: Tuple[int, int]  # (size, mtime_ns) when opened
+    users: int = 0
+    retired: bool = False
+
+
+class HDF5Handles:
+    """
+    LRU of open read-only h5py files for a long-lived process.
+
+    Reopening an HDF5 file costs a superblock read and a fresh metadata
+    cache, so repeat previews of the same file reuse its handle. A handle is
+    replaced when the file's size or mtime changes, and is closed (on
+    eviction or replacement) only once no caller is still using it; callers
+    in several threads may share one.
+    """
+
+    def __init__(self, max_open: int = DEFAULT_MAX_OPEN) -> None:
+        self.max_open = max_open
+        self._lock = threading.Lock()
+        self._files: collections.OrderedDict[str, _Handle] = (
+            collections.OrderedDict()
+        )
+
+    @contextlib.contextmanager
+    def open(self, path: str) -> Iterator[Any]:
+        import h5py  # type: ignore
+
+        key = os.path.abspath(path)
+        st = os.stat(key)
+        ident = (st.st_size, st.st_mtime_ns)
+        with self._lock:
+            handle = self._files.get(key)
+            if handle is None or handle.ident != ident:
+                if handle is not None:
+                    self._retire(key, handle)
+                handle = _Handle(h5py.File(key, "r"), ident)
+                self._files[key] = handle
+            self._files.move_to_end(key)
+            handle.users += 1
+            self._evict()
+        try:
+            yield handle.file
+        finally:
+            with self._lock:
+                handle.users -= 1
+                if handle.retired and handle.users == 0:
+                    handle.file.close()
+                self._evict()
+
+    def close(self) -> None:
+        with self._lock:
+            for key, handle in list(self._files.items()):
+                self._retire(key, handle)
+
+    def _retire(self, key: str, handle: _Handle) -> None:
+        del self._files[key]
+        handle.retired = True
+        if handle.users == 0:
+            handle.file.close()
+
+    def _evict(self) -> None:
+        if len(self._files) <= self.max_open:
+            return
+        for key, handle in list(self._files.items()):
+            if len(self._files) <= self.max_open:
+                break
+            if handle.users == 0:
+                self._retire(key, handle)
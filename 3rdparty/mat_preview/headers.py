@@ -0,0 +1,650 @@
+from __future__ import annotations
+
+import contextlib
+import math
+import struct
+import sys
+import zlib
+from dataclasses import dataclass
+from typing import Any, BinaryIO, Iterator, List, Optional, Tuple, Union
+
+from archive import open_source
+from detect import V4, V5, detect_format
+
+# Data element types (MAT-file format, table 1-1).
+miMATRIX = 14
+miCOMPRESSED = 15
+
+# scipy's mclass_info for v5 and v4 files.
+V5_CLASSES = {
+    1: "cell",
+    2: "struct",
+    3: "object",
+    4: "char",
+    5: "sparse",
+    6: "double",
+    7: "single",
+    8: "int8",
+    9: "uint8",
+    10: "int16",
+    11: "uint16",
+    12: "int32",
+    13: "uint32",
+    14: "int64",
+    15: "uint64",
+    16: "function",
+    17: "opaque",
+}
+V4_CLASSES = {0: "double", 1: "char", 2: "sparse"}
+
+mxCELL_CLASS = 1
+mxSTRUCT_CLASS = 2
+mxCHAR_CLASS = 4
+mxSPARSE_CLASS = 5
+# mxDOUBLE_CLASS .. mxUINT64_CLASS
+NUMERIC_CLASSES = range(6, 16)
+# loaded by scipy as MatlabObject, MatlabFunction and MatlabOpaque
+_OPAQUE_CLASSES = {3: "MatlabObject", 16: "MatlabFunction", 17: "MatlabOpaque"}
+
+# Numeric data types as numpy type codes (table 1-1 again).
+MI_DTYPES = {
+    1: "i1",
+    2: "u1",
+    3: "i2",
+    4: "u2",
+    5: "i4",
+    6: "u4",
+    7: "f4",
+    9: "f8",
+    12: "i8",
+    13: "u8",
+}
+# The type of each numeric class, which a 1x1 array of it gets back when
+# squeeze_me has turned it into a Python scalar.
+MCLASS_DTYPES = {
+    "double": "f8",
+    "single": "f4",
+    "int8": "i1",
+    "uint8": "u1",
+    "int16": "i2",
+    "uint16": "u2",
+    "int32": "i4",
+    "uint32": "u4",
+    "int64": "i8",
+    "uint64": "u8",
+}
+
+_TYPE_NAMES = {"i": "int", "u": "uint", "f": "float"}
+_NATIVE = "<" if sys.byteorder == "little" else ">"
+
+# v4 precision codes (the P digit of MOPT) as struct formats and numpy codes.
+_V4_TYPES = {0: "d", 1: "f", 2: "i", 3: "h", 4: "H", 5: "B"}
+_V4_CODES = {0: "f8", 1: "f4", 2: "i4", 3: "i2", 4: "u2", 5: "u1"}
+_V4_CHAR = 1
+_V4_SPARSE = 2
+
+# in the flags byte of the array flags word
+_LOGICAL_FLAG = 0x02
+COMPLEX_FLAG = 0x08
+
+# Compressed bytes fed to the decompressor per read.
+_INFLATE_CHUNK = 1 << 16
+
+
+def _pad8(n: int) -> int:
+    return (n + 7) & ~7
+
+
+def _dtype_str(code: str, order: str, is_complex: bool = False) -> str:
+    """``str(np.dtype(order + code))``, or of the complex type scipy makes."""
+    if is_complex:
+        return "complex64" if code == "f4" else "complex128"
+    if order == _NATIVE or code[1] == "1":
+        return f"{_TYPE_NAMES[code[0]]}{8 * int(code[1])}"
+    return order + code
+
+
+def matlab_class(dtype: str) -> str:
+    """
+    The MATLAB class behind an entry's ``dtype``: classic files show numeric
+    data by numpy dtype (``float64``, ``>f8``, ``complex128``), v7.3 files
+    by class (``double``). Class names are returned as they are.
+    """
+    return _DTYPE_CLASSES.get(dtype.lstrip("<>=|"), dtype)
+
+
+def entry_type(mclass: str, dtype: str) -> Tuple[str, str]:
+    """
+    The ``kind`` and ``dtype`` a variable of this class is shown with once
+    decoded: numeric data as its numpy dtype ``dtype``, other classes by name.
+    """
+    if mclass in ("struct", "cell"):
+        return mclass, mclass
+    if mclass in ("object", "function", "opaque", "unknown"):
+        return "other", mclass
+    if mclass in ("char", "logical"):
+        return "dataset", mclass
+    return "dataset", dtype
+
+
+_DTYPE_CLASSES = {
+    **{code: mclass for mclass, code in MCLASS_DTYPES.items()},
+    **{_dtype_str(code, _NATIVE): mclass for mclass, code in MCLASS_DTYPES.items()},
+    "c8": "single",
+    "c16": "double",
+    "complex64": "single",
+    "complex128": "double",
+}
+
+
+class FileSource:
+    """Sequential reads of an uncompressed element, tracking the offset."""
+
+    def __init__(self, f: BinaryIO, offset: int) -> None:
+        self.f = f
+        self.offset = offset
+
+    def read(self, n: int) -> bytes:
+        self.f.seek(self.offset)
+        data = self.f.read(n)
+        self.offset += len(data)
+        return data
+
+    def tell(self) -> int:
+        return self.offset
+
+    def seek(self, pos: int) -> None:
+        self.offset = pos
+
+
+class InflateSource:
+    """
+    Sequential reads of a miCOMPRESSED element. Compressed input is pulled
+    from the file in small pieces and output is produced only up to what
+    has been asked for, so reading the head of a huge variable costs about
+    as much as the head itself.
+    """
+
+    def __init__(self, f: BinaryIO, offset: int, nbytes: int) -> None:
+        self.f = f
+        self.element = (offset, nbytes)
+        self.offset = offset
+        self.remaining = nbytes
+        self.inflater = zlib.decompressobj()
+        self.tail = b""
+        self.produced = 0  # uncompressed bytes returned so far
+
+    def read(self, n: int) -> bytes:
+        out = bytearray()
+        while len(out) < n:
+            if not self.tail:
+                if self.remaining <= 0:
+                    break
+                self.f.seek(self.offset)
+                self.tail = self.f.read(min(_INFLATE_CHUNK, self.remaining))
+                if not self.tail:
+                    break
+                self.offset += len(self.tail)
+                self.remaining -= len(self.tail)
+            out += self.inflater.decompress(self.tail, n - len(out))
+            self.tail = self.inflater.unconsumed_tail
+        self.produced += len(out)
+        return bytes(out)
+
+    def tell(self) -> int:
+        return self.produced
+
+    def seek(self, pos: int) -> None:
+        """Skip ahead to ``pos`` uncompressed bytes; there is no way back."""
+        if pos < self.produced:
+            raise ValueError("cannot seek backwards in compressed data")
+        while self.produced < pos:
+            if not self.read(min(pos - self.produced, _INFLATE_CHUNK << 4)):
+                raise ValueError("truncated MAT element")
+
+
+class BufferSource:
+    """Reads of data already in memory, ``base`` being its source offset."""
+
+    def __init__(self, data: bytes, base: int = 0) -> None:
+        self.data = data
+        self.base = base
+        self.pos = base
+
+    def read(self, n: int) -> bytes:
+        start = self.pos - self.base
+        out = self.data[start : start + n]
+        self.pos += len(out)
+        return out
+
+    def tell(self) -> int:
+        return self.pos
+
+    def seek(self, pos: int) -> None:
+        self.pos = pos
+
+
+def read_tag(src: Any, order: str) -> Tuple[int, int, bytes]:
+    """
+    Read one data element tag; small elements carry their data inline and
+    are returned whole. Regular elements return ``b""`` and leave the
+    source positioned at their data.
+    """
+    raw = src.read(8)
+    if len(raw) < 8:
+        raise ValueError("truncated MAT element")
+    w0, w1 = struct.unpack(order + "II", raw)
+    if w0 >> 16:
+        return w0 & 0xFFFF, w0 >> 16, raw[4 : 4 + (w0 >> 16)]
+    return w0, w1, b""
+
+
+def read_element(src: Any, order: str) -> Tuple[int, bytes]:
+    mdtype, nbytes, small = read_tag(src, order)
+    if small or nbytes == 0:
+        return mdtype, small
+    data = src.read(_pad8(nbytes))
+    return mdtype, data[:nbytes]
+
+
+@dataclass
+class VarHeader:
+    name: str
+    shape: Tuple[int, ...]  # as a full preview shows it, see _shown_shape
+    mclass: str  # MATLAB class, e.g. "double", "struct", "cell"
+    # of the variable's tag (v5) or header (v4), nested entries included
+    offset: int
+    # what a full preview shows, e.g. "dataset"/"float32" or "cell"/"cell"
+    kind: str
+    dtype: str
+    # as a full preview notes structs, cells, sparse arrays and objects
+    note: Optional[str] = None
+
+
+def _squeeze(dims: Tuple[int, ...]) -> Tuple[int, ...]:
+    return tuple(int(d) for d in dims if d != 1)
+
+
+def _shown_shape(
+    dims: Tuple[int, ...], kind: str, char: bool = False, sparse: bool = False
+) -> Tuple[int, ...]:
+    """
+    The shape ``ClassicWalker`` reports for a variable with these header
+    dims: squeezed as ``squeeze_me`` squeezes the loaded value, except that
+    a single string is ``(1, N)`` and a single struct or cell ``(1, 1)``.
+    """
+    if sparse:
+        return tuple(int(d) for d in dims)
+    if kind == "other":
+        return ()
+    if math.prod(dims) == 0:
+        return (0,)
+    if char:
+        # the last dimension runs along each string
+        return _squeeze(dims[:-1]) or (1, int(dims[-1]))
+    shape = _squeeze(dims)
+    if not shape and kind in ("struct", "cell"):
+        return (1, 1)
+    return shape
+
+
+def _at_end(f: BinaryIO, pos: int) -> bool:
+    f.seek(pos)
+    return not f.read(1)
+
+
+def _v4_headers(f: BinaryIO) -> Iterator[VarHeader]:
+    f.seek(0)
+    (mopt,) = struct.unpack("<i", f.read(4))
+    order = "<" if 0 <= mopt <= 5000 else ">"
+
+    pos = 0
+    while not _at_end(f, pos):
+        f.seek(pos)
+        raw = f.read(20)
+        if len(raw) < 20:
+            raise ValueError("truncated MAT v4 header")
+        mopt, mrows, ncols, imagf, namlen = struct.unpack(order + "5i", raw)
+        if not 0 <= mopt <= 5000:
+            raise ValueError("bad MAT v4 header")
+        name = f.read(namlen).strip(b"\x00").decode("latin1")
+        precision, mtype = (mopt % 100) // 10, mopt % 10
+        code = order + _V4_TYPES[precision]
+        itemsize = struct.calcsize(code)
+        data = pos + 20 + namlen
+
+        shape: Tuple[int, ...] = (mrows, ncols)
+        if mtype == _V4_SPARSE:
+            # the last row holds the matrix dimensions
+            shape = ()
+            if mrows >= 1 and ncols >= 1:
+                f.seek(data + itemsize * (mrows - 1))
+                (rows,) = struct.unpack(code, f.read(itemsize))
+                f.seek(data + itemsize * (2 * mrows - 1))
+                (cols,) = struct.unpack(code, f.read(itemsize))
+                shape = (int(rows), int(cols))
+
+        mclass = V4_CLASSES.get(mtype, "unknown")
+        if mtype != _V4_SPARSE and mrows * ncols == 1:
+            dtype = _dtype_str(MCLASS_DTYPES["double"], _NATIVE, imagf == 1)
+        else:
+            dtype = _dtype_str(_V4_CODES[precision], order, imagf == 1)
+        kind, dtype = entry_type(mclass, dtype)
+        shape = _shown_shape(
+            shape, kind, char=mtype == _V4_CHAR, sparse=mtype == _V4_SPARSE
+        )
+        note = None
+        if mtype == _V4_SPARSE:
+            # one row per nonzero, and the row of dimensions
+            note = f"sparse; {max(mrows - 1, 0)} nonzeros"
+        yield VarHeader(name, shape, mclass, pos, kind, dtype, note)
+
+        nbytes = itemsize * mrows * ncols
+        if imagf == 1 and mtype != _V4_SPARSE:
+            nbytes *= 2
+        pos = data + nbytes
+
+
+@dataclass
+class _MatrixHead:
+    """The array header of a v5 ``miMATRIX`` element."""
+
+    code: int  # mx class; 0 for an empty element, which scipy reads as []
+    logical: bool
+    is_complex: bool
+    dims: Tuple[int, ...]
+    name: str
+    end: int  # source position just past the element
+
+    @property
+    def size(self) -> int:
+        return math.prod(self.dims)
+
+    @property
+    def mclass(self) -> str:
+        if self.logical:
+            return "logical"
+        return V5_CLASSES.get(self.code, "unknown") if self.code else "double"
+
+
+class _V5Lister:
+    """
+    Entries for one v5 variable from its headers: what ``ClassicWalker``
+    shows once scipy has loaded it, up to ``max_depth`` levels deep.
+
+    Values nested in structs and cells reach the walker as ``squeeze_me``
+    left them, without their class: 1x1 cells are unwrapped, 1x1 numeric
+    arrays are Python scalars (int64, float64 or complex128, by their
+    storage type), logicals keep their storage type and a cell of 1x1
+    structs reads as a struct array. Field and element headers are parsed
+    in file order; data in between is skipped (inflated, if compressed).
+    """
+
+    def __init__(self, src: Any, order: str, offset: int, max_depth: int) -> None:
+        self.src = src
+        self.order = order
+        self.offset = offset
+        self.max_depth = max_depth
+
+    def head(self) -> _MatrixHead:
+        src, order = self.src, self.order
+        mdtype, nbytes, _ = read_tag(src, order)
+        if mdtype != miMATRIX:
+            raise ValueError(f"expected miMATRIX, got element type {mdtype}")
+        end = src.tell() + nbytes
+        if nbytes == 0:
+            return _MatrixHead(0, False, False, (0, 0), "", end)
+        _, flags = read_element(src, order)
+        (flags_class,) = struct.unpack(order + "I", flags[:4])
+        _, raw_dims = read_element(src, order)
+        dims = struct.unpack(f"{order}{len(raw_dims) // 4}i", raw_dims)
+        _, raw_name = read_element(src, order)
+        return _MatrixHead(
+            code=flags_class & 0xFF,
+            logical=bool((flags_class >> 8) & _LOGICAL_FLAG),
+            is_complex=bool((flags_class >> 8) & COMPLEX_FLAG),
+            dims=tuple(int(d) for d in dims),
+            name=raw_name.decode("latin1"),
+            end=end,
+        )
+
+    def _unwrap(self, head: _MatrixHead) -> _MatrixHead:
+        """The element squeezing leaves of (nested) 1x1 cells."""
+        while head.code == mxCELL_CLASS and head.size == 1:
+            head = self.head()
+        return head
+
+    def _entry(
+        self,
+        name: str,
+        shape: Tuple[int, ...],
+        mclass: str,
+        kind: str,
+        dtype: str,
+        note: Optional[str] = None,
+    ) -> VarHeader:
+        return VarHeader(name, shape, mclass, self.offset, kind, dtype, note)
+
+    def entries(
+        self, head: _MatrixHead, name: str, depth: int = 0, top: bool = True
+    ) -> Iterator[VarHeader]:
+        """
+        Entries for ``head`` and what it holds. The source is left anywhere
+        inside the element; ``_child`` moves past it.
+        """
+        if head.code == mxSTRUCT_CLASS:
+            yield from self._struct(head, name, depth, top)
+        elif head.code == mxCELL_CLASS:
+            yield from self._cell(head, name, depth, top)
+        else:
+            yield self._leaf(head, name, top)
+
+    def _child(self, head: _MatrixHead, name: str, depth: int) -> Iterator[VarHeader]:
+        yield from self.entries(head, name, depth, top=False)
+        self.src.seek(head.end)
+
+    def _struct(
+        self, head: _MatrixHead, name: str, depth: int, top: bool
+    ) -> Iterator[VarHeader]:
+        if head.size != 1:
+            # squeezed to an object array; empty, it is told from a cell
+            # only by the header's class
+            kind = "struct" if top or head.size else "cell"
+            yield from self._elements(head, name, depth, kind, kind == "cell")
+            return
+        fields = self._fields()
+        note = f"fields: {', '.join(fields)}"
+        yield self._entry(name, (1, 1), "struct", "struct", "struct", note)
+        if depth < self.max_depth:
+            for field in fields:
+                yield from self._child(self.head(), f"{name}.{field}", depth + 1)
+
+    def _cell(
+        self, head: _MatrixHead, name: str, depth: int, top: bool
+    ) -> Iterator[VarHeader]:
+        if head.size != 1:
+            src, kind = self.src, "cell"
+            if not top and head.size and self._all_structs(head):
+                kind = "struct"
+            yield from self._elements(head, name, depth, kind, kind == "cell")
+            # back from the look-ahead buffer, if any, to just past the cell
+            self.src = src
+            return
+        inner = self._unwrap(self.head())
+        if not top:
+            yield from self.entries(inner, name, depth, top=False)
+        elif inner.code in _OPAQUE_CLASSES:
+            yield self._opaque(name, "cell")
+        elif inner.code == mxSTRUCT_CLASS and inner.size == 1:
+            yield from self.entries(inner, name, depth, top=False)
+        elif inner.code in (mxSTRUCT_CLASS, mxCELL_CLASS):
+            # an object array, which takes the place of the cell
+            yield from self._elements(inner, name, depth, "cell", True)
+        else:
+            yield self._entry(name, (1, 1), "cell", "cell", "cell", "1 elements")
+            if depth < self.max_depth:
+                yield from self.entries(inner, f"{name}{{1}}", depth + 1, top=False)
+
+    def _elements(
+        self, head: _MatrixHead, name: str, depth: int, kind: str, braces: bool
+    ) -> Iterator[VarHeader]:
+        """A struct or cell array (``head``) shown as ``kind`` elements."""
+        shape = _shown_shape(head.dims, kind)
+        note = f"{head.size} elements"
+        yield self._entry(name, shape, head.mclass, kind, kind, note)
+        if depth >= self.max_depth:
+            return
+        names = (
+            f"{name}{{{i}}}" if braces else f"{name}({i})"
+            for i in range(1, head.size + 1)
+        )
+        if head.code == mxCELL_CLASS:
+            for child in names:
+                outer = self.head()
+                yield from self.entries(self._unwrap(outer), child, depth + 1, False)
+                self.src.seek(outer.end)
+            return
+        fields = self._fields()
+        note = f"fields: {', '.join(fields)}"
+        for child in names:
+            yield self._entry(child, (1, 1), "struct", "struct", "struct", note)
+            if depth + 1 >= self.max_depth:
+                continue
+            for field in fields:
+                yield from self._child(self.head(), f"{child}.{field}", depth + 2)
+
+    def _all_structs(self, head: _MatrixHead) -> bool:
+        """
+        Whether every element of the cell ``head`` is a 1x1 struct once
+        squeezed. Leaves the source where it was; a compressed cell is read
+        into memory for this, as there is no seeking back in it, and the
+        caller restores the source once past the cell.
+        """
+        if isinstance(self.src, InflateSource):
+            start = self.src.tell()
+            self.src = BufferSource(self.src.read(head.end - start), start)
+        start = self.src.tell()
+        try:
+            for _ in range(head.size):
+                outer = self.head()
+                inner = self._unwrap(outer)
+                if inner.code != mxSTRUCT_CLASS or inner.size != 1:
+                    return False
+                self.src.seek(outer.end)
+            return True
+        finally:
+            self.src.seek(start)
+
+    def _fields(self) -> List[str]:
+        src, order = self.src, self.order
+        _, raw_len = read_element(src, order)
+        (width,) = struct.unpack(order + "i", raw_len[:4])
+        _, raw = read_element(src, order)
+        names = [raw[i : i + width] for i in range(0, len(raw), width)] if width else []
+        return [n.split(b"\x00", 1)[0].decode("latin1") for n in names]
+
+    def _opaque(self, name: str, cls: str) -> VarHeader:
+        note = f"MATLAB object of class {cls}; not decoded"
+        return self._entry(name, (), cls, "other", cls, note)
+
+    def _leaf(self, head: _MatrixHead, name: str, top: bool) -> VarHeader:
+        src, order = self.src, self.order
+        code, mclass = head.code, head.mclass
+        if code in _OPAQUE_CLASSES:
+            return self._opaque(name, mclass if top else _OPAQUE_CLASSES[code])
+        if code == mxCHAR_CLASS:
+            shape = _shown_shape(head.dims, "dataset", char=True)
+            return self._entry(name, shape, mclass, "dataset", "char")
+        if code == mxSPARSE_CLASS:
+            nnz = self._sparse_nnz()
+            mdtype, _, _ = read_tag(src, order)
+            dtype = _dtype_str(MI_DTYPES.get(mdtype, "f8"), _NATIVE, head.is_complex)
+            if top:
+                _, dtype = entry_type(mclass, dtype)
+            shape = _shown_shape(head.dims, "dataset", sparse=True)
+            note = f"sparse; {nnz} nonzeros"
+            return self._entry(name, shape, mclass, "dataset", dtype, note)
+        if code == 0:
+            return self._entry(name, (0,), mclass, "dataset", "float64")
+        if code not in NUMERIC_CLASSES:
+            kind, dtype = entry_type(mclass, mclass)
+            return self._entry(name, _shown_shape(head.dims, kind), mclass, kind, dtype)
+
+        mdtype, _, _ = read_tag(src, order)
+        stored = MI_DTYPES.get(mdtype, MCLASS_DTYPES[V5_CLASSES[code]])
+        if head.size != 1:
+            # anything larger keeps the type the data is stored as
+            dtype = _dtype_str(stored, order, head.is_complex)
+        elif top and not head.logical:
+            # squeezed to a Python scalar and recast to the class type
+            dtype = _dtype_str(MCLASS_DTYPES[mclass], _NATIVE, head.is_complex)
+        elif head.is_complex:
+            dtype = "complex128"
+        else:
+            dtype = "float64" if stored[0] == "f" else "int64"
+        kind, dtype = entry_type(mclass, dtype) if top else ("dataset", dtype)
+        return self._entry(name, _shown_shape(head.dims, kind), mclass, kind, dtype)
+
+    def _sparse_nnz(self) -> int:
+        """Skip the row indices; the last column index is the nonzero count."""
+        src, order = self.src, self.order
+        _, nbytes, small = read_tag(src, order)  # ir
+        if not small:
+            src.seek(src.tell() + _pad8(nbytes))
+        _, nbytes, small = read_tag(src, order)  # jc
+        if small:
+            return struct.unpack(order + "i", small[-4:])[0]
+        start = src.tell()
+        src.seek(start + nbytes - 4)
+        (nnz,) = struct.unpack(order + "i", src.read(4))
+        src.seek(start + _pad8(nbytes))
+        return nnz
+
+
+def _v5_headers(f: BinaryIO, max_depth: int = 0) -> Iterator[VarHeader]:
+    f.seek(126)
+    order = "<" if f.read(2) == b"IM" else ">"
+
+    pos = 128
+    while not _at_end(f, pos):
+        src: Any = FileSource(f, pos)
+        mdtype, nbytes, _ = read_tag(src, order)
+        next_pos = pos + 8 + nbytes
+        if mdtype == miCOMPRESSED:
+            src = InflateSource(f, pos + 8, nbytes)
+        else:
+            src.seek(pos)
+        lister = _V5Lister(src, order, pos, max_depth)
+        head = lister.head()
+        # an empty name can only be a MATLAB 7 function workspace
+        yield from lister.entries(head, head.name or "__function_workspace__")
+        pos = next_pos
+
+
+def iter_headers(
+    source: Union[str, BinaryIO], max_depth: int = 0
+) -> Iterator[VarHeader]:
+    """
+    Names, classes and shapes of the variables in a classic (v4/v5/v7) MAT
+    file, parsed with the standard library alone, with the fields and
+    elements of structs and cells down to ``max_depth`` levels.
+
+    Gives the same answers as the scipy-driven ``iter_classic_vars`` but
+    never imports numpy or scipy, and reads only the tag and array header of
+    each variable and of what it holds (compressed variables are inflated
+    just that far), so listing a file costs little more than starting
+    Python.
+    """
+    if isinstance(source, str):
+        opened: Any = open_source(source)
+    else:
+        opened = contextlib.nullcontext(source)
+
+    with opened as f:
+        fmt = detect_format(f)
+        if fmt == V4:
+            yield from _v4_headers(f)
+        elif fmt == V5:
+            yield from _v5_headers(f, max_depth)
+        else:
+            raise ValueError(f"not a classic MAT file ({fmt})")
@@ -2,186 +2,725 @@
 from __future__ import annotations
 
 import argparse
+import contextlib
+import importlib
+import itertools
 import json
+import os
 import sys
-from dataclasses import dataclass, asdict
-from typing import Any, Dict, List, Optional, Tuple
-
-import numpy as np
-
-
-@dataclass
-class Entry:
-    name: str
-    kind: str  # "dataset" | "variable" | "group" | "other"
-    dtype: str
-    shape: Tuple[int, ...]
-    sample: Optional[str] = None
-    note: Optional[str] = None
+from dataclasses import asdict
+from typing import (
+    Any,
+    BinaryIO,
+    Dict,
+    IO,
+    Iterator,
+    List,
+    Optional,
+    TYPE_CHECKING,
+    Tuple,
+    Type,
+    Union,
+)
+
+from archive import open_source, output_path, split_member
+from budget import Budget
+from batch import expand_paths, is_single_file, run_batch
+from cache import DEFAULT_MAX_BYTES, PreviewCache, default_cache_dir
+from detect import (
+    HDF5_FORMATS,
+    TEXT,
+    UNKNOWN,
+    V73,
+    XLSX,
+    detect_format,
+    detect_path,
+)
+from entry import SAMPLE_MODES, Entry
+from handles import HDF5Handles
+from headers import iter_headers
+
+# numpy, scipy and h5py (and the modules built on them) are imported only
+# where data is read, so --help, --list on classic files and format
+# detection start without them; benchmarks/bench_startup.py keeps it so.
+if TYPE_CHECKING:
+    from v5 import V5Array
+
+# Subcommand -> module providing add_arguments() and run(); any other first
+# argument is a path to preview (write ./convert for a file of that name).
+COMMANDS = {"convert": "convert", "diff": "diff", "schema": "schema"}
 
 
 def is_hdf5_mat(path: str) -> bool:
     """
-    Heuristic:
-    - If h5py can open it, it's HDF5 (MAT v7.3 is HDF5).
+    MAT v7.3 is HDF5; decided from the file header without importing h5py.
     """
-    try:
-        import h5py  # type: ignore
-    except Exception:
-        return False
-
-    try:
-        with h5py.File(path, "r"):
-            return True
-    except Exception:
-        return False
-
+    return detect_path(path) in HDF5_FORMATS
 
-def _np_sample_str(arr: np.ndarray, k: int) -> str:
-    if arr.ndim == 0:
-        return np.array2string(arr, separator=", ")
-    with np.printoptions(edgeitems=k, threshold=k, linewidth=120, suppress=True):
-        flat = arr.ravel()
-        s = flat[:k]
-        return np.array2string(s, separator=", ")
 
-
-def preview_hdf5(path: str, max_entries: int, sample_k: int) -> List[Entry]:
+def _walk_hdf5(
+    group: Any, prefix: str = "", seen: Optional[set] = None
+) -> Iterator[Tuple[str, Any]]:
+    """
+    Pre-order walk in the same order as ``visititems``, but as a generator so
+    callers can stop early. Objects reachable through several hard links are
+    visited once.
+    """
     import h5py  # type: ignore
 
-    out: List[Entry] = []
-
-    def add_entry(name: str, obj: Any) -> None:
-        nonlocal out
-        if len(out) >= max_entries:
-            return
+    if seen is None:
+        seen = set()
+    for name in group:
+        obj = group.get(name)
+        if obj is None:  # dangling soft/external link
+            continue
+        addr = h5py.h5o.get_info(obj.id).addr
+        if addr in seen:
+            continue
+        seen.add(addr)
+        path = f"{prefix}{name}"
+        yield path, obj
+        if isinstance(obj, h5py.Group):
+            yield from _walk_hdf5(obj, f"{path}/", seen)
+
+
+def iter_hdf5(
+    path: Union[str, BinaryIO],
+    sample_k: int,
+    sample_mode: str = "head",
+    seed: int = 0,
+    list_only: bool = False,
+    stats: bool = False,
+    max_depth: int = 3,
+    matlab: Optional[bool] = None,
+    handles: Optional[HDF5Handles] = None,
+    budget: Optional[Budget] = None,
+) -> Iterator[Entry]:
+    """
+    MAT v7.3 files (``matlab``, detected from the header when None) are shown
+    with MATLAB semantics by ``V73Walker``; other HDF5 files as a raw tree.
+    ``path`` may also be an open binary file, e.g. an archive member. With
+    ``handles``, files are taken from (and left open in) that pool.
+    ``budget`` bounds what each entry reads.
+    """
+    import h5py  # type: ignore
 
-        if isinstance(obj, h5py.Dataset):
-            dtype = str(obj.dtype)
-            shape = tuple(int(x) for x in obj.shape)
+    from sampling import sample_dataset, sample_str
+    from stats import dataset_stats, is_numeric
+    from v73 import V73Walker
 
-            sample = None
-            note = None
-            try:
-                arr = obj[()]
-                a = np.asarray(arr)
+    if matlab is None:
+        fmt = detect_path(path) if isinstance(path, str) else detect_format(path)
+        matlab = fmt == V73
 
-                if a.dtype == object:
-                    note = "object dtype; sample omitted"
-                else:
-                    sample = _np_sample_str(a, sample_k)
-            except Exception as e:
-                note = f"sample error: {type(e).__name__}"
+    opened: Any
+    if handles is not None and isinstance(path, str):
+        opened = handles.open(path)
+    else:
+        opened = h5py.File(path, "r")
+    budget = budget or Budget()
+    with opened as f:
+        if matlab:
+            walker = V73Walker(
+                f, sample_k, sample_mode, seed, list_only, stats, max_depth, budget
+            )
+            yield from walker.iter_entries()
+            return
 
-            out.append(
-                Entry(
+        for name, obj in _walk_hdf5(f):
+            budget.start_entry()
+            if isinstance(obj, h5py.Dataset):
+                dtype = str(obj.dtype)
+                shape = tuple(int(x) for x in obj.shape)
+
+                sample = None
+                note = None
+                summary = None
+                try:
+                    if list_only:
+                        pass
+                    elif obj.dtype == object:
+                        note = "object dtype; sample omitted"
+                    else:
+                        a = sample_dataset(obj, sample_k, sample_mode, seed, budget)
+                        sample = sample_str(a, sample_k)
+                        note = budget.sample_note(a.size, min(sample_k, obj.size))
+                        cut = note is not None and budget.reason is not None
+                        if stats and is_numeric(obj.dtype) and not cut:
+                            summary = dataset_stats(obj, budget)
+                            if summary.get("partial"):
+                                note = budget.note("stats stopped")
+                except Exception as e:
+                    note = f"sample error: {type(e).__name__}"
+
+                yield Entry(
                     name=name,
                     kind="dataset",
                     dtype=dtype,
                     shape=shape,
                     sample=sample,
                     note=note,
+                    stats=summary,
                 )
-            )
-        elif isinstance(obj, h5py.Group):
-            out.append(
-                Entry(
+            elif isinstance(obj, h5py.Group):
+                yield Entry(
                     name=name,
                     kind="group",
                     dtype="",
                     shape=(),
                     note=f"{len(obj)} members",
                 )
-            )
 
-    with h5py.File(path, "r") as f:
-        f.visititems(add_entry)
-
-    return out
 
+def preview_hdf5(
+    path: str,
+    max_entries: int,
+    sample_k: int,
+    sample_mode: str = "head",
+    seed: int = 0,
+    list_only: bool = False,
+    stats: bool = False,
+    max_depth: int = 3,
+) -> List[Entry]:
+    entries = iter_hdf5(
+        path, sample_k, sample_mode, seed, list_only, stats, max_depth
+    )
+    return list(itertools.islice(entries, max_entries))
+
+
+def iter_classic(
+    source: Union[str, BinaryIO],
+    sample_k: int,
+    sample_mode: str = "head",
+    seed: int = 0,
+    list_only: bool = False,
+    stats: bool = False,
+    max_depth: int = 3,
+    budget: Optional[Budget] = None,
+) -> Iterator[Entry]:
+    """
+    Variables are visited lazily: each one is decoded only when its entry is
+    requested, and the file is not read past the last requested entry.
+    Plain numeric v5 arrays are not decoded at all; samples and stats are
+    read through a memory map (or a partial inflate when compressed).
+    Listing only parses headers, without numpy or scipy. Structs and cells
+    are expanded up to ``max_depth`` levels, by ``ClassicWalker`` or, when
+    listing, from the headers of their fields and elements.
+
+    Other variables are decoded by scipy in one go, which cannot be cut
+    short; under a ``budget`` they are skipped instead when their size on
+    disk is already more than an entry may read.
+    """
+    if list_only:
+        for hdr in iter_headers(source, max_depth):
+            if not hdr.name.startswith("__"):
+                yield Entry(
+                    name=hdr.name,
+                    kind=hdr.kind,
+                    dtype=hdr.dtype,
+                    shape=hdr.shape,
+                    note=hdr.note,
+                )
+        return
 
-def preview_classic(path: str, max_entries: int, sample_k: int) -> List[Entry]:
-    from scipy.io import loadmat  # type: ignore
+    from classic import ClassicWalker, iter_classic_vars
 
-    data = loadmat(path, struct_as_record=False, squeeze_me=True)
-    out: List[Entry] = []
+    budget = budget or Budget()
+    walker = ClassicWalker(sample_k, sample_mode, seed, stats, max_depth, budget)
+    for var in iter_classic_vars(source):
+        if var.name.startswith("__"):
+            continue
+        budget.start_entry()
+
+        try:
+            lazy = var.numeric()
+        except Exception:
+            lazy = None
+        if lazy is not None:
+            yield _v5_entry(
+                var.name,
+                lazy,
+                sample_k,
+                sample_mode,
+                seed,
+                stats,
+                budget,
+                logical=var.mclass == "logical",
+            )
+            continue
 
-    for name, value in list(data.items())[:max_entries]:
-        if name.startswith("__"):
+        if not budget.affordable(var.nbytes):
+            budget.decline(var.nbytes)
+            yield Entry(
+                name=var.name,
+                kind="variable",
+                dtype=var.mclass,
+                shape=var.shape,
+                note=budget.note("not decoded"),
+            )
+            continue
+        try:
+            value = var.load()
+        except Exception as e:
+            yield Entry(
+                name=var.name,
+                kind="variable",
+                dtype=var.mclass,
+                shape=var.shape,
+                note=f"read error: {type(e).__name__}",
+            )
             continue
 
-        if isinstance(value, np.ndarray):
-            dtype = str(value.dtype)
-            shape = tuple(int(x) for x in value.shape)
+        yield from walker.iter_entries(var, value)
+
+
+def preview_classic(
+    path: Union[str, BinaryIO],
+    max_entries: int,
+    sample_k: int,
+    sample_mode: str = "head",
+    seed: int = 0,
+    list_only: bool = False,
+    stats: bool = False,
+    max_depth: int = 3,
+) -> List[Entry]:
+    entries = iter_classic(
+        path, sample_k, sample_mode, seed, list_only, stats, max_depth
+    )
+    return list(itertools.islice(entries, max_entries))
+
+
+def _v5_entry(
+    name: str,
+    arr: V5Array,
+    sample_k: int,
+    sample_mode: str,
+    seed: int,
+    stats: bool = False,
+    budget: Optional[Budget] = None,
+    logical: bool = False,
+) -> Entry:
+    from sampling import sample_str
+
+    budget = budget or Budget()
+    sample = None
+    note = None
+    summary = None
+    try:
+        a = arr.sample(sample_k, sample_mode, seed, budget)
+        if logical:
+            a = a.astype(bool)
+        sample = sample_str(a, sample_k)
+        note = budget.sample_note(a.size, min(sample_k, arr.size))
+        cut = note is not None and budget.reason is not None
+        if stats and not cut:
+            summary = arr.stats(budget)
+            if summary.get("partial"):
+                note = budget.note("stats stopped")
+    except Exception as e:
+        note = f"sample error: {type(e).__name__}"
+
+    return Entry(
+        name=name,
+        kind="dataset",
+        dtype="logical" if logical else str(arr.dtype),
+        shape=arr.shape,
+        sample=sample,
+        note=note,
+        stats=summary,
+    )
 
-            sample = None
-            note = None
-            try:
-                if value.dtype == object:
-                    note = "object dtype; sample omitted"
-                else:
-                    sample = _np_sample_str(value, sample_k)
-            except Exception as e:
-                note = f"sample error: {type(e).__name__}"
 
-            out.append(
-                Entry(
-                    name=name,
-                    kind="dataset",
-                    dtype=dtype,
-                    shape=shape,
-                    sample=sample,
-                    note=note,
-                )
+def iter_file(
+    path: str,
+    max_entries: int,
+    sample_k: int,
+    sample_mode: str = "head",
+    seed: int = 0,
+    list_only: bool = False,
+    stats: bool = False,
+    max_depth: int = 3,
+    cache: Optional[PreviewCache] = None,
+    handles: Optional[HDF5Handles] = None,
+    max_bytes_per_entry: Optional[int] = None,
+    timeout_per_entry: Optional[float] = None,
+    timeout: Optional[float] = None,
+) -> Iterator[Entry]:
+    """
+    Open ``path`` (a file or an ``archive.zip::member``) once, pick the
+    reader from its header and yield entries as they are produced. h5py is
+    only imported for HDF5 files and scipy only for classic ones. With a
+    ``cache``, a repeat preview of an unchanged file is served from disk
+    without opening it at all; results are only stored once the walk has run
+    to completion. ``handles`` keeps HDF5 files open between calls.
+
+    ``max_bytes_per_entry`` and ``timeout_per_entry`` bound what the readers
+    do for one entry: samples come back shorter and stats partial, with a
+    note saying so. When the whole walk exceeds ``timeout`` it ends early
+    with a final ``"truncated"`` entry; such results are not cached, as
+    they depend on how fast the machine happened to be.
+    """
+    key = None
+    if cache is not None:
+        options = dict(
+            max_entries=max_entries,
+            sample_k=sample_k,
+            sample_mode=sample_mode,
+            seed=seed,
+            list_only=list_only,
+            stats=stats,
+            max_depth=max_depth,
+            max_bytes_per_entry=max_bytes_per_entry,
+            timeout_per_entry=timeout_per_entry,
+            timeout=timeout,
+        )
+        key = cache.key(path, options)
+        hit = cache.get(key)
+        if hit is not None:
+            for d in hit:
+                yield Entry(**{**d, "shape": tuple(d["shape"])})
+            return
+
+    budget = Budget(max_bytes_per_entry, timeout_per_entry, timeout)
+    done: List[Entry] = []
+    with open_source(path) as f:
+        fmt = detect_format(f)
+        if fmt == UNKNOWN:
+            raise ValueError(f"{path}: not a MAT, HDF5, xlsx or text file")
+        if fmt == XLSX:
+            from tabular import iter_xlsx
+
+            entries = iter_xlsx(f, sample_k, list_only, max_depth)
+        elif fmt == TEXT:
+            from tabular import iter_text, table_name
+
+            entries = iter_text(f, table_name(path), sample_k, list_only, max_depth)
+        elif fmt in HDF5_FORMATS:
+            # plain files go through HDF5's own driver, members as file objects
+            source: Union[str, BinaryIO] = f
+            if split_member(path)[1] is None:
+                f.close()
+                source = path
+            entries = iter_hdf5(
+                source,
+                sample_k,
+                sample_mode,
+                seed,
+                list_only,
+                stats,
+                max_depth,
+                matlab=fmt == V73,
+                handles=handles,
+                budget=budget,
             )
         else:
-            sample = None
-            note = None
-            try:
-                sample = str(value)
-            except Exception as e:
-                note = f"sample error: {type(e).__name__}"
-
-            out.append(
-                Entry(
-                    name=name,
-                    kind="variable",
-                    dtype=type(value).__name__,
-                    shape=(),
-                    sample=sample,
-                    note=note,
-                )
+            entries = iter_classic(
+                f, sample_k, sample_mode, seed, list_only, stats, max_depth, budget
             )
 
-    return out
+        for count, entry in enumerate(itertools.islice(entries, max_entries), 1):
+            if key is not None:
+                done.append(entry)
+            yield entry
+            if budget.file_expired():
+                budget.timed_out = True
+                yield Entry(
+                    name="",
+                    kind="truncated",
+                    dtype="",
+                    shape=(),
+                    note=f"--timeout {timeout:g} reached after {count} entries",
+                )
+                break
+
+    if cache is not None and key is not None and not budget.timed_out:
+        cache.put(key, [asdict(e) for e in done])
+
+
+def preview_file(
+    path: str,
+    max_entries: int,
+    sample_k: int,
+    sample_mode: str = "head",
+    seed: int = 0,
+    list_only: bool = False,
+    stats: bool = False,
+    max_depth: int = 3,
+    cache: Optional[PreviewCache] = None,
+    handles: Optional[HDF5Handles] = None,
+    max_bytes_per_entry: Optional[int] = None,
+    timeout_per_entry: Optional[float] = None,
+    timeout: Optional[float] = None,
+) -> List[Entry]:
+    return list(
+        iter_file(
+            path,
+            max_entries,
+            sample_k,
+            sample_mode,
+            seed,
+            list_only,
+            stats,
+            max_depth,
+            cache,
+            handles,
+            max_bytes_per_entry,
+            timeout_per_entry,
+            timeout,
+        )
+    )
 
 
-def main() -> None:
-    parser = argparse.ArgumentParser(description="Preview .mat files")
-    parser.add_argument("path", help="Path to .mat file")
+def split_command(argv: List[str]) -> Tuple[Optional[str], List[str]]:
+    """The subcommand named by ``argv`` (if any) and its own arguments."""
+    if argv and argv[0] in COMMANDS:
+        return argv[0], argv[1:]
+    return None, argv
+
+
+def build_parser(
+    parser_class: Type[argparse.ArgumentParser] = argparse.ArgumentParser,
+    command: Optional[str] = None,
+) -> argparse.ArgumentParser:
+    if command is not None:
+        module = importlib.import_module(COMMANDS[command])
+        parser = parser_class(
+            prog=f"{os.path.basename(sys.argv[0])} {command}",
+            description=module.__doc__.strip().splitlines()[0],
+        )
+        module.add_arguments(parser)
+        parser.set_defaults(command=command)
+        return parser
+
+    parser = parser_class(
+        description="Preview .mat files",
+        epilog=f"subcommands: {', '.join(COMMANDS)} (see <subcommand> --help)",
+    )
+    parser.add_argument(
+        "paths",
+        nargs="+",
+        metavar="path",
+        help="Path to .mat file or archive.zip::member.mat; several files, "
+        "directories, globs or a whole archive switch to batch mode",
+    )
     parser.add_argument(
         "-o", "--output", type=str, help="Output to file (default: stdout)"
     )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Worker processes for batch mode (default: CPU count)",
+    )
+    parser.add_argument(
+        "--per-file",
+        action="store_true",
+        help="Batch mode: write <file>.preview.json next to each file and "
+        "report only timings and errors",
+    )
     parser.add_argument(
         "--max-entries", type=int, default=50, help="Maximum entries to show"
     )
     parser.add_argument(
         "--sample-k", type=int, default=5, help="Sample size for arrays"
     )
-    args = parser.parse_args()
+    parser.add_argument(
+        "--sample-mode",
+        choices=SAMPLE_MODES,
+        default="head",
+        help="Which elements to sample: first k, evenly strided, or random",
+    )
+    parser.add_argument(
+        "--seed", type=int, default=0, help="Seed for --sample-mode random"
+    )
+    parser.add_argument(
+        "--list",
+        action="store_true",
+        help="Only list names, types and shapes; do not read any data",
+    )
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="Add min/max/mean/std, NaN/Inf counts, unique-count estimate and "
+        "integer-likeness for numeric arrays (one streaming pass per array)",
+    )
+    parser.add_argument(
+        "--max-depth",
+        type=int,
+        default=3,
+        help="How many levels of MATLAB structs and cells to expand",
+    )
+    parser.add_argument(
+        "--max-bytes-per-entry",
+        type=int,
+        help="Stop reading an entry's data after about this many bytes; its "
+        "sample is truncated and its stats partial, with a note",
+    )
+    parser.add_argument(
+        "--timeout-per-entry",
+        type=float,
+        metavar="SECONDS",
+        help="Likewise stop reading an entry's data after this long",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        metavar="SECONDS",
+        help="Stop a file's preview after this long; the entries so far are "
+        "still written, ending with a \"truncated\" entry",
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true", help="Do not read or write the cache"
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=default_cache_dir(),
+        help="Preview cache directory (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--cache-max-bytes",
+        type=int,
+        default=DEFAULT_MAX_BYTES,
+        help="Evict least recently used results beyond this size",
+    )
+    parser.add_argument(
+        "--cache-hash",
+        action="store_true",
+        help="Also key the cache on a hash of the file contents",
+    )
+    parser.add_argument(
+        "--format",
+        choices=("json", "ndjson"),
+        default="json",
+        help="ndjson streams one object per line as soon as it is produced",
+    )
+    return parser
 
-    if is_hdf5_mat(args.path):
-        entries = preview_hdf5(args.path, args.max_entries, args.sample_k)
-    else:
-        entries = preview_classic(args.path, args.max_entries, args.sample_k)
 
-    output = json.dumps([asdict(e) for e in entries], indent=2)
+def main() -> None:
+    command, argv = split_command(sys.argv[1:])
+    parser = build_parser(command=command)
+    args = parser.parse_args(argv)
+
+    try:
+        run(parser, args)
+    except BrokenPipeError:
+        # Downstream closed early (e.g. `| head`); silence the final flush.
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        sys.exit(1)
+
+
+def run(
+    parser: argparse.ArgumentParser,
+    args: argparse.Namespace,
+    stdout: Optional[IO[str]] = None,
+    handles: Optional[HDF5Handles] = None,
+    cwd: Optional[str] = None,
+) -> None:
+    """
+    Execute a parsed command line. The daemon passes its own ``stdout``,
+    its pool of open HDF5 ``handles`` and the client's ``cwd``, against
+    which relative paths are resolved; batch work then runs on threads
+    rather than processes so the handles are shared.
+    """
+    command = getattr(args, "command", None)
+    if command is not None:
+        module = importlib.import_module(COMMANDS[command])
+        module.run(parser, args, stdout=stdout, handles=handles, cwd=cwd)
+        return
+
+    relative = False
+    if cwd is not None:
+        relative = not any(os.path.isabs(p) for p in args.paths)
+        args.paths = [os.path.join(cwd, p) for p in args.paths]
+        if args.output:
+            args.output = os.path.join(cwd, args.output)
+        args.cache_dir = os.path.join(cwd, args.cache_dir)
+
+    def display(path: str) -> str:
+        # report relative paths the way a local run would
+        return os.path.relpath(path, cwd) if relative else path
+
+    options = dict(
+        max_entries=args.max_entries,
+        sample_k=args.sample_k,
+        sample_mode=args.sample_mode,
+        seed=args.seed,
+        list_only=args.list,
+        stats=args.stats,
+        max_depth=args.max_depth,
+        max_bytes_per_entry=args.max_bytes_per_entry,
+        timeout_per_entry=args.timeout_per_entry,
+        timeout=args.timeout,
+        cache=None
+        if args.no_cache
+        else PreviewCache(args.cache_dir, args.cache_max_bytes, args.cache_hash),
+        handles=handles,
+    )
+
+    ndjson = args.format == "ndjson"
 
-    if args.output:
-        with open(args.output, "w") as f:
-            f.write(output)
+    if is_single_file(args.paths):
+        entries = iter_file(args.paths[0], **options)
+        try:
+            with _open_output(args.output, stdout) as out:
+                if ndjson:
+                    for e in entries:
+                        out.write(json.dumps(asdict(e)) + "\n")
+                        out.flush()
+                else:
+                    out.write(json.dumps([asdict(e) for e in entries], indent=2))
+                    out.write("\n")
+        except (OSError, ValueError) as e:
+            if isinstance(e, BrokenPipeError):
+                raise
+            parser.exit(1, f"mat_preview: {e}\n")
+        return
+
+    paths = expand_paths(args.paths)
+    if not paths:
+        parser.exit(1, "mat_preview: no .mat files matched\n")
+
+    report = []
+    threads = handles is not None
+    with _open_output(args.output, stdout) as out:
+        for r in run_batch(preview_file, paths, args.jobs, threads, **options):
+            item: Dict[str, Any] = {
+                "path": display(r.path),
+                "seconds": round(r.seconds, 4),
+                "error": r.error,
+            }
+            entries_json = [asdict(e) for e in r.entries or []]
+            if args.per_file:
+                if r.error is None:
+                    output = output_path(r.path, ".preview.json")
+                    item["output"] = display(output)
+                    with open(output, "w") as f:
+                        f.write(json.dumps(entries_json, indent=2))
+            else:
+                item["entries"] = entries_json
+
+            if ndjson:
+                out.write(json.dumps(item) + "\n")
+                out.flush()
+            else:
+                report.append(item)
+
+        if not ndjson:
+            out.write(json.dumps(report, indent=2) + "\n")
+
+
+@contextlib.contextmanager
+def _open_output(
+    path: Optional[str], stdout: Optional[IO[str]] = None
+) -> Iterator[IO[str]]:
+    if path:
+        with open(path, "w") as f:
+            yield f
     else:
-        print(output)
+        yield stdout or sys.stdout
 
 
 if __name__ == "__main__":
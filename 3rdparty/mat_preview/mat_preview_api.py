@@ -0,0 +1,592 @@
+"""
+Python API: ``open_mat(path)`` opens a MAT file, a plain HDF5 file or an
+``archive.zip::member`` as a lazy tree of nodes, read through the same
+partial-read engines as the command line::
+
+    with open_mat("data/Exp1/s01.mat") as f:
+        rt = f["data"]["RT"]
+        rt.shape, rt.dtype       # as in the preview entry "data.RT"
+        rt.sample(10)            # 10 elements, without reading the rest
+        rt.stats(max_bytes=1 << 30)
+        rt.read((slice(0, 100), 0))
+
+The file stays open until ``close()`` (or the end of the ``with`` block),
+so repeated reads do not reopen or re-parse it. Nodes are created when
+they are first reached: a v7.3 cell is only dereferenced element by
+element, and a classic variable is only decoded when it is indexed, and
+only if it is not a plain numeric array, which is memory-mapped or
+partially inflated instead.
+"""
+from __future__ import annotations
+
+import contextlib
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from archive import open_source, split_member
+from detect import HDF5_FORMATS, TABULAR_FORMATS, UNKNOWN, V73, detect_format
+
+if TYPE_CHECKING:
+    import numpy as np
+
+    from classic import ClassicVar
+    from v5 import V5Array
+
+Key = Union[str, int]
+
+
+def _budget(max_bytes: Optional[int], timeout: Optional[float]) -> Any:
+    from budget import Budget
+
+    return Budget(max_bytes, timeout)
+
+
+def _everything(sel: Any) -> bool:
+    return isinstance(sel, tuple) and not sel
+
+
+class Node:
+    """
+    One variable, struct field or cell element.
+
+    ``name``, ``kind``, ``dtype`` and ``shape`` are those of the preview
+    entry for the same object. Containers (structs, cells, struct arrays
+    and HDF5 groups) are indexed by field name or by 0-based linear index
+    in MATLAB's column-major order, so ``c[0]`` is ``c{1}``. Arrays are read
+    with ``sample``, ``stats`` and ``read``; ``read`` takes numpy indices
+    in the order of ``shape``.
+    """
+
+    kind = "dataset"
+
+    def __init__(self, name: str, dtype: str, shape: Tuple[int, ...]) -> None:
+        self.name = name
+        self.dtype = dtype
+        self.shape = shape
+
+    def keys(self) -> Sequence[Key]:
+        """Field names, or ``range(n)`` for the elements of a cell."""
+        return ()
+
+    def _child(self, key: Key) -> Node:
+        raise KeyError(key)
+
+    def __getitem__(self, key: Key) -> Node:
+        if key not in self.keys():
+            raise KeyError(f"{self.name}: no {key!r}")
+        return self._child(key)
+
+    def __contains__(self, key: Key) -> bool:
+        return key in self.keys()
+
+    def __iter__(self) -> Iterator[Node]:
+        for key in self.keys():
+            yield self._child(key)
+
+    def __len__(self) -> int:
+        return len(self.keys())
+
+    def __repr__(self) -> str:
+        return f"<{self.kind} {self.name} {self.dtype} {self.shape}>"
+
+    def sample(self, k: int = 5, mode: str = "head", seed: int = 0) -> Any:
+        """
+        At most ``k`` elements in storage order (``head``), evenly spaced
+        (``stride``) or a seeded random subset (``random``), as a flat array.
+        """
+        raise TypeError(f"{self.name}: a {self.kind} has no data to sample")
+
+    def stats(
+        self, max_bytes: Optional[int] = None, timeout: Optional[float] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Summary statistics of a numeric array, None for anything else. The
+        pass stops after ``max_bytes`` or ``timeout`` seconds, with
+        ``partial`` set in the result.
+        """
+        return None
+
+    def read(self, sel: Any = ()) -> Any:
+        """The selected part of the data; everything by default."""
+        raise TypeError(f"{self.name}: a {self.kind} has no data to read")
+
+
+class _Opaque(Node):
+    kind = "other"
+
+
+# -- classic (v4/v5/v7) -------------------------------------------------------
+
+
+class _V5Node(Node):
+    """A plain numeric v5 variable, never decoded as a whole by scipy."""
+
+    def __init__(self, name: str, arr: V5Array, mclass: Optional[str]) -> None:
+        self.logical = mclass == "logical"
+        dtype = "logical" if self.logical else str(arr.dtype)
+        super().__init__(name, dtype, arr.shape)
+        self.arr = arr
+
+    def sample(self, k: int = 5, mode: str = "head", seed: int = 0) -> np.ndarray:
+        a = self.arr.sample(k, mode, seed)
+        return a.astype(bool) if self.logical else a
+
+    def stats(
+        self, max_bytes: Optional[int] = None, timeout: Optional[float] = None
+    ) -> Optional[Dict[str, Any]]:
+        return self.arr.stats(_budget(max_bytes, timeout))
+
+    def read(self, sel: Any = ()) -> np.ndarray:
+        a = self.arr.read(sel)
+        return a.astype(bool) if self.logical else a
+
+
+class _ArrayNode(Node):
+    def __init__(self, name: str, value: np.ndarray, mclass: Optional[str]) -> None:
+        logical = mclass == "logical"
+        dtype = "logical" if logical else str(value.dtype)
+        super().__init__(name, dtype, tuple(int(x) for x in value.shape))
+        self.value = value.astype(bool) if logical else value
+
+    def sample(self, k: int = 5, mode: str = "head", seed: int = 0) -> np.ndarray:
+        from sampling import sample_array
+
+        return sample_array(self.value, k, mode, seed)
+
+    def stats(
+        self, max_bytes: Optional[int] = None, timeout: Optional[float] = None
+    ) -> Optional[Dict[str, Any]]:
+        from stats import array_stats, is_numeric
+
+        if not is_numeric(self.value.dtype):
+            return None
+        return array_stats(self.value, _budget(max_bytes, timeout))
+
+    def read(self, sel: Any = ()) -> np.ndarray:
+        return self.value[sel]
+
+
+class _CharNode(Node):
+    """A char array; ``read`` gives a string, or one string per row."""
+
+    def __init__(self, name: str, value: Any) -> None:
+        if isinstance(value, str):
+            shape: Tuple[int, ...] = (1, len(value))
+        else:
+            shape = tuple(int(x) for x in value.shape)
+        super().__init__(name, "char", shape)
+        self.value = value
+
+    def sample(self, k: int = 5, mode: str = "head", seed: int = 0) -> str:
+        value = self.value
+        text = value if isinstance(value, str) else "\n".join(value.ravel(order="F"))
+        return text[:k]
+
+    def read(self, sel: Any = ()) -> Any:
+        return self.value if _everything(sel) else self.value[sel]
+
+
+class _SparseNode(Node):
+    """A sparse matrix; samples come from its nonzeros."""
+
+    def __init__(self, name: str, value: Any) -> None:
+        super().__init__(name, str(value.dtype), tuple(int(x) for x in value.shape))
+        self.value = value
+
+    def sample(self, k: int = 5, mode: str = "head", seed: int = 0) -> np.ndarray:
+        from sampling import sample_array
+
+        return sample_array(self.value.data, k, mode, seed)
+
+    def read(self, sel: Any = ()) -> Any:
+        return self.value if _everything(sel) else self.value[sel]
+
+
+class _StructNode(Node):
+    kind = "struct"
+
+    def __init__(self, name: str, value: Any) -> None:
+        super().__init__(name, "struct", (1, 1))
+        self.value = value
+
+    def keys(self) -> Sequence[Key]:
+        return list(self.value._fieldnames)
+
+    def _child(self, key: Key) -> Node:
+        return _value_node(f"{self.name}.{key}", getattr(self.value, str(key)))
+
+
+class _ElementsNode(Node):
+    """A cell or struct array, indexed in column-major order."""
+
+    def __init__(self, name: str, value: np.ndarray, is_struct: bool) -> None:
+        self.kind = "struct" if is_struct else "cell"
+        super().__init__(name, self.kind, tuple(int(x) for x in value.shape))
+        self.items = value.ravel(order="F")
+
+    def keys(self) -> Sequence[Key]:
+        return range(self.items.size)
+
+    def _child(self, key: Key) -> Node:
+        i = int(key) + 1
+        name = f"{self.name}({i})" if self.kind == "struct" else f"{self.name}{{{i}}}"
+        return _value_node(name, self.items[int(key)])
+
+
+def _value_node(name: str, value: Any, mclass: Optional[str] = None) -> Node:
+    """Node for a value loaded by scipy, shown as ``ClassicWalker`` shows it."""
+    from classic import classify_value, is_struct_array
+
+    kind, value = classify_value(value, mclass)
+    if kind == "other":
+        return _Opaque(name, mclass or type(value).__name__, ())
+    if kind == "struct":
+        return _StructNode(name, value)
+    if kind == "elements":
+        return _ElementsNode(name, value, is_struct_array(value, mclass))
+    if kind == "char":
+        return _CharNode(name, value)
+    if kind == "sparse":
+        return _SparseNode(name, value)
+    return _ArrayNode(name, value, mclass)
+
+
+def _classic_node(var: ClassicVar) -> Node:
+    if var.mclass in ("object", "function", "opaque"):
+        return _Opaque(var.name, var.mclass, ())
+    try:
+        arr = var.numeric()
+    except Exception:
+        arr = None
+    if arr is not None:
+        return _V5Node(var.name, arr, var.mclass)
+    # only the header still knows a 1x1 cell or a logical scalar
+    return _value_node(var.name, var.load(), var.mclass)
+
+
+# -- HDF5 and MAT v7.3 --------------------------------------------------------
+
+
+def _hdf5_sel(sel: Any, ndim: int) -> Tuple[Any, ...]:
+    """Indices in MATLAB dimension order -> the same ones in HDF5 order."""
+    if not isinstance(sel, tuple):
+        sel = (sel,)
+    if Ellipsis in sel:
+        at = sel.index(Ellipsis)
+        fill = (slice(None),) * (ndim - len(sel) + 1)
+        sel = sel[:at] + fill + sel[at + 1 :]
+    return (sel + (slice(None),) * (ndim - len(sel)))[::-1]
+
+
+class _H5Array(Node):
+    """
+    An HDF5 dataset. With MATLAB semantics its shape and indices are in
+    MATLAB order (``read`` returns the transpose of what HDF5 stores) and
+    logical arrays read as booleans.
+    """
+
+    def __init__(self, name: str, ds: Any, cls: Optional[str], matlab: bool) -> None:
+        from v73 import matlab_shape
+
+        shape = matlab_shape(ds) if matlab else tuple(int(x) for x in ds.shape)
+        super().__init__(name, cls or str(ds.dtype), shape)
+        self.ds = ds
+        self.cls = cls
+        self.matlab = matlab
+
+    def sample(self, k: int = 5, mode: str = "head", seed: int = 0) -> np.ndarray:
+        from sampling import sample_dataset
+
+        a = sample_dataset(self.ds, k, mode, seed)
+        return a.astype(bool) if self.cls == "logical" else a
+
+    def stats(
+        self, max_bytes: Optional[int] = None, timeout: Optional[float] = None
+    ) -> Optional[Dict[str, Any]]:
+        from stats import dataset_stats, is_numeric
+
+        if not is_numeric(self.ds.dtype):
+            return None
+        return dataset_stats(self.ds, _budget(max_bytes, timeout))
+
+    def read(self, sel: Any = ()) -> np.ndarray:
+        import numpy as np
+
+        if not self.matlab:
+            return np.asarray(self.ds[sel])
+        a = np.asarray(self.ds[_hdf5_sel(sel, self.ds.ndim)]).T
+        return a.astype(bool) if self.cls == "logical" else a
+
+
+class _H5Char(_H5Array):
+    """A v7.3 char array; ``read`` gives a string, or one string per row."""
+
+    def sample(self, k: int = 5, mode: str = "head", seed: int = 0) -> Any:
+        from sampling import sample_dataset
+
+        return "".join(map(chr, sample_dataset(self.ds, k, "head")))
+
+    def stats(
+        self, max_bytes: Optional[int] = None, timeout: Optional[float] = None
+    ) -> Optional[Dict[str, Any]]:
+        return None
+
+    def read(self, sel: Any = ()) -> Any:
+        import numpy as np
+
+        grid = np.asarray(self.ds[()]).T
+        rows = ["".join(map(chr, row)) for row in grid.reshape(grid.shape[0], -1)]
+        value: Any = rows[0] if len(rows) == 1 else np.array(rows)
+        return value if _everything(sel) else value[sel]
+
+
+class _H5Sparse(Node):
+    """A v7.3 sparse matrix; ``read`` builds a ``scipy.sparse`` matrix."""
+
+    def __init__(self, name: str, group: Any, cls: Optional[str]) -> None:
+        import numpy as np
+
+        rows = int(np.asarray(group.attrs["MATLAB_sparse"]).ravel()[0])
+        cols = int(group["jc"].shape[0]) - 1 if "jc" in group else 0
+        super().__init__(name, cls or "double", (rows, cols))
+        self.group = group
+
+    def sample(self, k: int = 5, mode: str = "head", seed: int = 0) -> np.ndarray:
+        import numpy as np
+
+        from sampling import sample_dataset
+
+        if "data" not in self.group:
+            return np.empty((0,))
+        return sample_dataset(self.group["data"], k, mode, seed)
+
+    def read(self, sel: Any = ()) -> Any:
+        import numpy as np
+        import scipy.sparse  # type: ignore
+
+        group = self.group
+        if "data" in group:
+            data, ir = group["data"][()], group["ir"][()]
+        else:
+            data, ir = np.empty((0,)), np.empty((0,), dtype=np.int64)
+        jc = group["jc"][()] if "jc" in group else np.zeros(1, dtype=np.int64)
+        m = scipy.sparse.csc_matrix((data, ir, jc), shape=self.shape)
+        return m if _everything(sel) else m[sel]
+
+
+class _H5Group(Node):
+    """A v7.3 struct (fields ``s.a``), or a plain HDF5 group (``g/a``)."""
+
+    def __init__(self, name: str, group: Any, f: Any, matlab: bool) -> None:
+        self.kind = "struct" if matlab else "group"
+        super().__init__(name, "struct" if matlab else "", (1, 1) if matlab else ())
+        self.group = group
+        self.f = f
+        self.matlab = matlab
+
+    def keys(self) -> Sequence[Key]:
+        return [key for key in self.group if self.group.get(key) is not None]
+
+    def _child(self, key: Key) -> Node:
+        sep = "." if self.matlab else "/"
+        name = f"{self.name}{sep}{key}"
+        return _hdf5_node(name, self.group[str(key)], self.f, self.matlab)
+
+
+class _H5Refs(Node):
+    """A v7.3 cell (or struct-array field), dereferenced element by element."""
+
+    def __init__(self, name: str, ds: Any, cls: Optional[str], f: Any) -> None:
+        from v73 import matlab_shape
+
+        # a reference array without the cell class is a struct-array field
+        self.kind = "cell" if cls == "cell" else "struct"
+        super().__init__(name, cls or "struct", matlab_shape(ds))
+        self.ds = ds
+        self.f = f
+
+    def keys(self) -> Sequence[Key]:
+        return range(self.ds.size)
+
+    def _element(self, index: int, ref: Any) -> Node:
+        import numpy as np
+
+        i = index + 1
+        name = f"{self.name}{{{i}}}" if self.kind == "cell" else f"{self.name}({i})"
+        if not ref:
+            return _ArrayNode(name, np.empty((0, 0)), None)
+        return _hdf5_node(name, self.f[ref], self.f, True)
+
+    def _child(self, key: Key) -> Node:
+        import numpy as np
+
+        ref = self.ds[np.unravel_index(int(key), self.ds.shape)]
+        return self._element(int(key), ref)
+
+    def __iter__(self) -> Iterator[Node]:
+        import numpy as np
+
+        from stats import block_slices
+        from v73 import REF_BLOCK
+
+        # C order of the HDF5 data is MATLAB's column-major order
+        index = 0
+        for sel in block_slices(tuple(self.ds.shape), REF_BLOCK):
+            for ref in np.asarray(self.ds[sel]).ravel():
+                yield self._element(index, ref)
+                index += 1
+
+
+def _hdf5_node(name: str, obj: Any, f: Any, matlab: bool) -> Node:
+    """Node for an HDF5 object, dispatched the way ``V73Walker`` shows it."""
+    import h5py  # type: ignore
+    import numpy as np
+
+    from stats import is_numeric
+    from v73 import matlab_class, matlab_shape
+
+    if not matlab:
+        if isinstance(obj, h5py.Group):
+            return _H5Group(name, obj, f, False)
+        return _H5Array(name, obj, None, False)
+
+    cls = matlab_class(obj)
+    if isinstance(obj, h5py.Group):
+        if "MATLAB_sparse" in obj.attrs:
+            return _H5Sparse(name, obj, cls)
+        if cls in (None, "struct"):
+            return _H5Group(name, obj, f, True)
+        return _Opaque(name, cls, ())
+    if obj.attrs.get("MATLAB_empty", 0):
+        dims = tuple(int(x) for x in np.asarray(obj[()]).ravel())
+        node = _ArrayNode(name, np.empty(dims), None)
+        node.dtype = cls or str(obj.dtype)
+        return node
+    if h5py.check_dtype(ref=obj.dtype) is not None:
+        return _H5Refs(name, obj, cls, f)
+    if cls == "char":
+        return _H5Char(name, obj, cls, True)
+    if cls in (None, "logical") or is_numeric(obj.dtype):
+        return _H5Array(name, obj, cls, True)
+    return _Opaque(name, cls, matlab_shape(obj))
+
+
+# -- files --------------------------------------------------------------------
+
+
+class MatFile:
+    """
+    An open file: a mapping from top-level variable names to nodes. Listing
+    names reads headers only; a node is built when its name is indexed.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._stack = contextlib.ExitStack()
+        self._nodes: Dict[str, Node] = {}
+        try:
+            self._open()
+        except BaseException:
+            self._stack.close()
+            raise
+
+    def _open(self) -> None:
+        f = self._stack.enter_context(open_source(self.path))
+        self.format = detect_format(f)
+        if self.format == UNKNOWN or self.format in TABULAR_FORMATS:
+            raise ValueError(f"{self.path}: not a MAT or HDF5 file")
+        if self.format in HDF5_FORMATS:
+            import h5py  # type: ignore
+
+            from v73 import INTERNAL_GROUPS
+
+            # plain files go through HDF5's own driver, members as file objects
+            source: Any = f
+            if split_member(self.path)[1] is None:
+                f.close()
+                source = self.path
+            self._h5 = self._stack.enter_context(h5py.File(source, "r"))
+            self._matlab = self.format == V73
+            names = [n for n in self._h5 if self._h5.get(n) is not None]
+            if self._matlab:
+                names = [n for n in names if n not in INTERNAL_GROUPS]
+            self._names = names
+        else:
+            from classic import iter_classic_vars
+
+            self._vars = {
+                var.name: var
+                for var in iter_classic_vars(f)
+                if not var.name.startswith("__")
+            }
+            self._names = list(self._vars)
+
+    def keys(self) -> List[str]:
+        return list(self._names)
+
+    def __getitem__(self, name: str) -> Node:
+        node = self._nodes.get(name)
+        if node is None:
+            if name not in self._names:
+                raise KeyError(f"{self.path}: no variable {name!r}")
+            if self.format in HDF5_FORMATS:
+                node = _hdf5_node(name, self._h5[name], self._h5, self._matlab)
+            else:
+                node = _classic_node(self._vars[name])
+            self._nodes[name] = node
+        return node
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._names
+
+    def __iter__(self) -> Iterator[Node]:
+        for name in self._names:
+            yield self[name]
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __repr__(self) -> str:
+        return f"<MatFile {self.path} ({self.format}, {len(self)} variables)>"
+
+    def walk(self, max_depth: int = 3) -> Iterator[Node]:
+        """
+        Every node in pre-order, as the preview lists entries, at most
+        ``max_depth`` levels below each variable.
+        """
+
+        def visit(node: Node, depth: int) -> Iterator[Node]:
+            yield node
+            if depth < max_depth:
+                for child in node:
+                    yield from visit(child, depth + 1)
+
+        for node in self:
+            yield from visit(node, 0)
+
+    def close(self) -> None:
+        self._nodes.clear()
+        self._stack.close()
+
+    def __enter__(self) -> MatFile:
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+def open_mat(path: str) -> MatFile:
+    """
+    Open ``path`` (a file or an ``archive.zip::member``) for lazy reads.
+    Format detection, partial reads and naming are those of the preview.
+    """
+    return MatFile(path)
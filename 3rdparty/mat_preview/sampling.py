@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import math
+from typing import TYPE_CHECKING, Any, List, Optional, Tuple
+
+import numpy as np
+
+from entry import SAMPLE_MODES  # noqa: F401
+
+if TYPE_CHECKING:
+    from budget import Budget
+
+def _prefix_selection(shape: Tuple[int, ...], k: int) -> Tuple[slice, ...]:
+    """
+    Smallest hyperslab (anchored at the origin) that contains the first ``k``
+    elements of ``shape`` in C order.
+    """
+    sel: List[Any] = [slice(None)] * len(shape)
+    inner = 1
+    for axis in range(len(shape) - 1, -1, -1):
+        if inner * shape[axis] >= k:
+            sel[axis] = slice(0, math.ceil(k / inner))
+            for lead in range(axis):
+                sel[lead] = slice(0, 1)
+            break
+        inner *= shape[axis]
+    return tuple(sel)
+
+
+def _spread(n: int, k: int, mode: str, rng: np.random.Generator) -> np.ndarray:
+    """Pick ``min(n, k)`` sorted indices from ``range(n)``."""
+    k = min(n, k)
+    if mode == "random":
+        return np.sort(rng.choice(n, size=k, replace=False))
+    return np.unique(np.linspace(0, n - 1, num=k).round().astype(np.int64))
+
+
+def sample_str(arr: np.ndarray, k: int) -> str:
+    if arr.ndim == 0:
+        return np.array2string(arr, separator=", ")
+    with np.printoptions(edgeitems=k, threshold=k, linewidth=120, suppress=True):
+        flat = arr.ravel()
+        s = flat[:k]
+        return np.array2string(s, separator=", ")
+
+
+def sample_positions(
+    size: int, k: int, mode: str = "head", seed: int = 0
+) -> np.ndarray:
+    """
+    Flat positions ``sample_array`` picks from ``size`` elements, counted in
+    column-major (MATLAB) order like the storage of MAT files.
+    """
+    if mode == "head" or size <= k:
+        return np.arange(min(size, max(k, 0)))
+    return _spread(size, k, mode, np.random.default_rng(seed))
+
+
+def sample_array(
+    arr: np.ndarray, k: int, mode: str = "head", seed: int = 0
+) -> np.ndarray:
+    """
+    Flat sample of an in-memory array in column-major (MATLAB) order, as
+    HDF5 datasets and v5 arrays are sampled. Goes through ``.T.flat`` so
+    Fortran-ordered or memory-mapped arrays are not copied as a whole.
+    """
+    arr = np.asarray(arr)
+    return arr.T.flat[sample_positions(arr.size, k, mode, seed)]
+
+
+def _decode_cost(ds: Any) -> int:
+    """Bytes HDF5 decodes per chunk read: the whole chunk if it is filtered."""
+    if not ds.chunks or ds.id.get_create_plist().get_nfilters() == 0:
+        return 0
+    return math.prod(ds.chunks) * ds.dtype.itemsize
+
+
+def _read_chunked(
+    ds: Any, pos: np.ndarray, budget: Optional[Budget]
+) -> np.ndarray:
+    """
+    Elements of a chunked dataset at the sorted C-order positions ``pos``,
+    read one chunk at a time: from each chunk only the box around the
+    positions inside it, in the order the positions first reach it. When
+    ``budget`` runs out the result is cut after the last position read
+    with all those before it, so it is always a prefix of the full sample.
+    """
+    shape = tuple(int(x) for x in ds.shape)
+    chunks = tuple(int(c) for c in ds.chunks)
+    cost = 0 if budget is None else _decode_cost(ds)
+    coords = np.unravel_index(pos, shape)
+    grid = tuple(math.ceil(d / c) for d, c in zip(shape, chunks))
+    owner = np.ravel_multi_index(
+        tuple(c // n for c, n in zip(coords, chunks)), grid
+    )
+    by_chunk = np.argsort(owner, kind="stable")
+    _, starts = np.unique(owner[by_chunk], return_index=True)
+    groups = np.split(by_chunk, starts[1:])
+    out = np.empty(pos.size, dtype=ds.dtype)
+    done = np.zeros(pos.size, dtype=bool)
+    # positions are sorted, so a group's first member is where it is reached
+    for members in sorted(groups, key=lambda m: int(m[0])):
+        if budget is not None and not budget.affordable(cost):
+            budget.decline(cost)
+            break
+        local = tuple(c[members] for c in coords)
+        box = tuple(slice(int(c.min()), int(c.max()) + 1) for c in local)
+        block = np.asarray(ds[box])
+        out[members] = block[tuple(c - b.start for c, b in zip(local, box))]
+        done[members] = True
+        if budget is not None and not budget.charge(max(cost, block.nbytes)):
+            break
+    missing = np.flatnonzero(~done)
+    return out[: missing[0]] if missing.size else out
+
+
+def sample_dataset(
+    ds: Any,
+    k: int,
+    mode: str = "head",
+    seed: int = 0,
+    budget: Optional[Budget] = None,
+) -> np.ndarray:
+    """
+    Flat sample of at most ``k`` elements from an h5py dataset: the ones at
+    ``sample_positions`` in storage (C) order, which for a MATLAB dataset is
+    column-major order.
+
+    Only the elements sampled are read, with a hyperslab per chunk they fall
+    in (the head of a contiguous dataset in one hyperslab), so the cost
+    depends on ``k`` and the chunk size rather than on the size of the
+    dataset. With a ``budget``, filtered chunks are only decoded while it
+    lasts, so the sample may come back shorter (or empty).
+    """
+    shape = tuple(int(x) for x in ds.shape)
+    if not shape:
+        return np.asarray(ds[()]).reshape(1)
+    size = math.prod(shape)
+    if size == 0 or k <= 0:
+        return np.empty((0,), dtype=ds.dtype)
+
+    pos = sample_positions(size, k, mode, seed)
+    if ds.chunks:
+        return _read_chunked(ds, pos, budget)
+    if int(pos[-1]) == pos.size - 1:  # a prefix: the head, or everything
+        a = np.asarray(ds[_prefix_selection(shape, pos.size)]).ravel()[: pos.size]
+    else:
+        points = np.unravel_index(pos, shape)
+        a = np.asarray(
+            [ds[tuple(int(p[i]) for p in points)] for i in range(len(points[0]))]
+        )
+    if budget is not None:
+        budget.charge(a.nbytes)
+    return a
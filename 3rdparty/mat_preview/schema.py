@@ -0,0 +1,329 @@
+"""
+``mat_preview schema``: one consolidated schema for a set of MAT files that
+should share a layout, such as one file per subject.
+
+Files are scanned in parallel. Each scan lists the variables from headers
+and, unless ``--no-domains``, streams the numeric leaves (struct fields
+included) to collect per-column value domains: min, max, NaN count and
+the distinct values when there are few of them. The scans are merged
+into unions of classes, dtypes and shapes per variable, and every file
+that deviates from the majority (a missing or extra variable, another
+class or dtype, other trailing dimensions) is listed as an outlier. The
+leading dimension, usually trials, may vary freely.
+"""
+from __future__ import annotations
+
+import argparse
+import collections
+import json
+import math
+import os
+import sys
+import time
+from typing import TYPE_CHECKING, Any, Dict, IO, Iterator, List, Optional, Tuple
+
+from batch import expand_paths, run_batch
+from convert import Column, Skipped, open_variables
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# Distinct values kept per column; beyond this only min/max are reported.
+DEFAULT_MAX_DISTINCT = 32
+
+# Elements read per block while collecting domains.
+DOMAIN_BLOCK = 1 << 20
+
+
+def _json_number(x: Any) -> Any:
+    x = x.item() if hasattr(x, "item") else x
+    if isinstance(x, float) and not math.isfinite(x):
+        return str(x)
+    return x
+
+
+class _Domain:
+    """Running min/max/NaN count and capped distinct set of one column."""
+
+    def __init__(self, max_distinct: int) -> None:
+        self.max_distinct = max_distinct
+        self.count = 0
+        self.nan = 0
+        self.min: Any = None
+        self.max: Any = None
+        self.distinct: Optional[set] = set()
+
+    def update(self, values: np.ndarray) -> None:
+        import numpy as np
+
+        if values.size == 0:
+            return
+        self.count += values.size
+        if values.dtype.kind in "fc":
+            nan = np.isnan(values)
+            self.nan += int(nan.sum())
+            values = values[~nan]
+            if values.size == 0:
+                return
+        if values.dtype.kind == "c":
+            self.distinct = None  # complex values have no order
+            return
+        lo, hi = values.min(), values.max()
+        self.min = lo if self.min is None else min(self.min, lo)
+        self.max = hi if self.max is None else max(self.max, hi)
+        if self.distinct is not None:
+            self.distinct.update(np.unique(values).tolist())
+            if len(self.distinct) > self.max_distinct:
+                self.distinct = None
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "nan": self.nan,
+            "min": _json_number(self.min),
+            "max": _json_number(self.max),
+            "distinct": None
+            if self.distinct is None
+            else [_json_number(v) for v in sorted(self.distinct)],
+        }
+
+
+def _column_domains(
+    col: Column, max_distinct: int
+) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Domains of a leaf by column: a matrix gives ``<name>_1``, ``<name>_2``,
+    ... (as ``convert`` names table columns), anything else one column.
+    """
+    if len(col.shape) == 2:
+        rows, ncols = col.shape
+    else:
+        rows, ncols = math.prod(col.shape), 1
+    domains = [_Domain(max_distinct) for _ in range(ncols)]
+    pos = 0
+    for block in col.blocks(DOMAIN_BLOCK):
+        start = 0
+        while start < block.size:
+            j = pos // rows if rows else 0
+            take = min(block.size - start, rows - pos % rows)
+            domains[j].update(block[start : start + take])
+            start += take
+            pos += take
+    for j, domain in enumerate(domains):
+        label = col.name if ncols == 1 else f"{col.name}_{j + 1}"
+        yield label, domain.to_json()
+
+
+def scan_file(
+    path: str, domains: bool = True, max_distinct: int = DEFAULT_MAX_DISTINCT
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Variables of one file: name -> {class, shape} from the headers, plus
+    {dtype, shape, columns} for every numeric leaf when ``domains``.
+    """
+    from headers import matlab_class
+    from main import iter_file
+
+    found: Dict[str, Dict[str, Any]] = {}
+    for e in iter_file(path, sys.maxsize, 0, list_only=True, max_depth=0):
+        found[e.name] = {"class": matlab_class(e.dtype), "shape": list(e.shape)}
+    if not domains:
+        return found
+
+    with open_variables(path) as variables:
+        for list_leaves in variables.values():
+            for leaf in list_leaves():
+                info = found.setdefault(leaf.name, {})
+                if isinstance(leaf, Skipped):
+                    info.setdefault("class", leaf.reason)
+                    continue
+                info["dtype"] = str(leaf.dtype.newbyteorder("="))
+                info.setdefault("shape", list(leaf.shape))
+                info["columns"] = dict(_column_domains(leaf, max_distinct))
+    return found
+
+
+def _signature(shape: List[int]) -> Tuple[int, ...]:
+    """Trailing dimensions of a squeezed shape; the leading one may vary."""
+    squeezed = [d for d in shape if d != 1]
+    return (len(squeezed), *squeezed[1:])
+
+
+def _format_signature(sig: Tuple[int, ...]) -> str:
+    ndim, trailing = sig[0], sig[1:]
+    if ndim == 0:
+        return "()"
+    return "(" + ", ".join(["n", *map(str, trailing)]) + ")"
+
+
+def _merge_domain(acc: Dict[str, Any], dom: Dict[str, Any], max_distinct: int) -> None:
+    acc["files"] += 1
+    acc["count"] += dom["count"]
+    acc["nan"] += dom["nan"]
+    for key, pick in (("min", min), ("max", max)):
+        if dom[key] is None or isinstance(dom[key], str):
+            continue
+        acc[key] = dom[key] if acc[key] is None else pick(acc[key], dom[key])
+    if acc["distinct"] is not None:
+        if dom["distinct"] is None:
+            acc["distinct"] = None
+        else:
+            union = set(acc["distinct"]) | set(dom["distinct"])
+            acc["distinct"] = sorted(union) if len(union) <= max_distinct else None
+
+
+def merge_scans(
+    scans: Dict[str, Dict[str, Dict[str, Any]]],
+    max_distinct: int = DEFAULT_MAX_DISTINCT,
+) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """Consolidated schema and the files that deviate from the majority."""
+    n = len(scans)
+    variables: Dict[str, Dict[str, Any]] = {}
+    for found in scans.values():
+        for name, info in found.items():
+            var = variables.setdefault(
+                name,
+                {
+                    "files": 0,
+                    "classes": collections.Counter(),
+                    "dtypes": collections.Counter(),
+                    "signatures": collections.Counter(),
+                    "leading": [],
+                    "columns": {},
+                },
+            )
+            var["files"] += 1
+            if "class" in info:
+                var["classes"][info["class"]] += 1
+            if "dtype" in info:
+                var["dtypes"][info["dtype"]] += 1
+            if "shape" in info:
+                var["signatures"][_signature(info["shape"])] += 1
+                squeezed = [d for d in info["shape"] if d != 1]
+                if squeezed:
+                    var["leading"].append(squeezed[0])
+            for label, dom in info.get("columns", {}).items():
+                acc = var["columns"].setdefault(
+                    label,
+                    dict(files=0, count=0, nan=0, min=None, max=None, distinct=[]),
+                )
+                _merge_domain(acc, dom, max_distinct)
+
+    outliers = []
+    for path, found in scans.items():
+        issues = []
+        for name, var in variables.items():
+            common = var["files"] * 2 > n
+            info = found.get(name)
+            if info is None:
+                if common:
+                    issues.append(f"missing {name}")
+                continue
+            if not common:
+                issues.append(f"extra {name}")
+                continue
+            for key, counter in (("class", "classes"), ("dtype", "dtypes")):
+                usual = var[counter].most_common(1)
+                if key in info and usual and info[key] != usual[0][0]:
+                    issues.append(f"{name}: {key} {info[key]}, usually {usual[0][0]}")
+            usual = var["signatures"].most_common(1)
+            if "shape" in info and usual and _signature(info["shape"]) != usual[0][0]:
+                issues.append(f"{name}: shape {tuple(info['shape'])}")
+        if issues:
+            outliers.append({"path": path, "issues": issues})
+
+    schema = {}
+    for name, var in variables.items():
+        leading = var["leading"]
+        schema[name] = {
+            "files": var["files"],
+            "classes": dict(var["classes"]),
+            "dtypes": dict(var["dtypes"]),
+            "shapes": {
+                _format_signature(sig): c for sig, c in var["signatures"].most_common()
+            },
+            "leading_dim": [min(leading), max(leading)] if leading else None,
+            "columns": var["columns"],
+        }
+        for key in ("classes", "dtypes", "columns"):
+            if not schema[name][key]:
+                del schema[name][key]
+    return schema, outliers
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "paths",
+        nargs="+",
+        metavar="path",
+        help="Directories (searched recursively for *.mat), files, globs or "
+        "archives that should share one layout",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Worker processes (default: CPU count)",
+    )
+    parser.add_argument(
+        "--no-domains",
+        action="store_true",
+        help="Headers only: skip struct fields and per-column value domains",
+    )
+    parser.add_argument(
+        "--max-distinct",
+        type=int,
+        default=DEFAULT_MAX_DISTINCT,
+        help="List a column's distinct values up to this many",
+    )
+    parser.add_argument(
+        "-o", "--output", type=str, help="Output to file (default: stdout)"
+    )
+
+
+def run(
+    parser: argparse.ArgumentParser,
+    args: argparse.Namespace,
+    stdout: Optional[IO[str]] = None,
+    handles: Any = None,
+    cwd: Optional[str] = None,
+) -> None:
+    from main import _open_output
+
+    if cwd is not None:
+        args.paths = [os.path.join(cwd, p) for p in args.paths]
+        if args.output:
+            args.output = os.path.join(cwd, args.output)
+
+    paths = expand_paths(args.paths)
+    if not paths:
+        parser.exit(1, "mat_preview: no .mat files matched\n")
+
+    t0 = time.perf_counter()
+    scans: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    errors = []
+    threads = handles is not None
+    for r in run_batch(
+        scan_file,
+        paths,
+        args.jobs,
+        threads,
+        domains=not args.no_domains,
+        max_distinct=args.max_distinct,
+    ):
+        if r.error is None:
+            scans[r.path] = r.entries
+        else:
+            errors.append({"path": r.path, "error": r.error})
+
+    variables, outliers = merge_scans(scans, args.max_distinct)
+    report = {
+        "files": len(paths),
+        "seconds": round(time.perf_counter() - t0, 3),
+        "variables": variables,
+        "outliers": outliers,
+        "errors": errors,
+    }
+    with _open_output(args.output, stdout) as out:
+        out.write(json.dumps(report, indent=2) + "\n")
@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import math
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, Optional, Tuple
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from budget import Budget
+
+# Elements per block when an array has no chunk layout of its own.
+BLOCK_ELEMS = 1 << 20
+
+# Sketch size of the unique-count estimator; counts below it are exact.
+KMV_SIZE = 1024
+
+_U64 = float(1 << 64)
+
+
+def _hash64(values: np.ndarray) -> np.ndarray:
+    """splitmix64 finalizer over the raw bits of each element."""
+    bits = values.view(f"u{values.dtype.itemsize}").astype(np.uint64)
+    bits = (bits ^ (bits >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    bits = (bits ^ (bits >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return bits ^ (bits >> np.uint64(31))
+
+
+def _sorted_unique(values: np.ndarray) -> np.ndarray:
+    # sort-based; np.unique can be far slower on large uint64 inputs
+    values = np.sort(values)
+    if values.size:
+        values = values[np.concatenate(([True], values[1:] != values[:-1]))]
+    return values
+
+
+class StreamingStats:
+    """
+    Single-pass summary of a numeric array fed block by block.
+
+    Memory is bounded by one block plus a ``KMV_SIZE`` sketch: mean and
+    variance are merged per block (Chan et al.), and the number of distinct
+    values is estimated from the k minimum hash values.
+    """
+
+    def __init__(self) -> None:
+        self.count = 0  # finite values
+        self.nan_count = 0
+        self.inf_count = 0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.integer_like = True
+        self._hashes = np.empty((0,), dtype=np.uint64)
+
+    def update(self, block: np.ndarray) -> None:
+        block = np.asarray(block).ravel()
+        if block.size == 0:
+            return
+        if block.dtype.kind == "b":
+            block = block.view(np.uint8)
+
+        if block.dtype.kind == "f":
+            nan = np.isnan(block)
+            inf = np.isinf(block)
+            self.nan_count += int(nan.sum())
+            self.inf_count += int(inf.sum())
+            block = block[~(nan | inf)]
+            if block.size == 0:
+                return
+            if self.integer_like:
+                self.integer_like = bool(np.all(block == np.floor(block)))
+            # fold -0.0 into 0.0 so both hash to the same value
+            block = block + 0.0
+
+        values = block.astype(np.float64, copy=False)
+        n = values.size
+        bmin, bmax = float(values.min()), float(values.max())
+        self.min = bmin if self.min is None else min(self.min, bmin)
+        self.max = bmax if self.max is None else max(self.max, bmax)
+
+        bmean = float(values.mean())
+        bm2 = float(((values - bmean) ** 2).sum())
+        total = self.count + n
+        delta = bmean - self.mean
+        self.mean += delta * n / total
+        self._m2 += bm2 + delta * delta * self.count * n / total
+        self.count = total
+
+        h = _hash64(block)
+        if len(self._hashes) == KMV_SIZE:
+            h = h[h < self._hashes[-1]]
+        if h.size:
+            h = np.concatenate([self._hashes, h])
+            self._hashes = _sorted_unique(h)[:KMV_SIZE]
+
+    def unique_estimate(self) -> int:
+        if len(self._hashes) < KMV_SIZE:
+            return len(self._hashes)
+        return int(round((KMV_SIZE - 1) * _U64 / (float(self._hashes[-1]) + 1)))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "min": self.min,
+            "max": self.max,
+            "mean": self.mean if self.count else None,
+            "std": math.sqrt(self._m2 / self.count) if self.count else None,
+            "nan_count": self.nan_count,
+            "inf_count": self.inf_count,
+            "unique_estimate": self.unique_estimate(),
+            "integer_like": self.integer_like if self.count else None,
+        }
+
+
+def is_numeric(dtype: np.dtype) -> bool:
+    return dtype.kind in "biuf"
+
+
+def block_slices(
+    shape: Tuple[int, ...], max_elems: int
+) -> Iterator[Tuple[slice, ...]]:
+    """Hyperslabs of at most ``max_elems`` elements covering ``shape``."""
+    if not shape:
+        yield ()
+        return
+    inner = math.prod(shape[1:])
+    if inner <= max_elems or len(shape) == 1:
+        step = max(1, max_elems // max(inner, 1))
+        for start in range(0, shape[0], step):
+            yield (slice(start, min(start + step, shape[0])),)
+    else:
+        for i in range(shape[0]):
+            for rest in block_slices(shape[1:], max_elems):
+                yield (slice(i, i + 1),) + rest
+
+
+def dataset_stats(ds: Any, budget: Optional[Budget] = None) -> Dict[str, Any]:
+    """Stats for an h5py dataset, read one chunk (or one block) at a time."""
+    if ds.chunks:
+        slices: Iterator[Tuple[slice, ...]] = ds.iter_chunks()
+    else:
+        slices = block_slices(tuple(ds.shape), BLOCK_ELEMS)
+    return blocks_stats((ds[sel] for sel in slices), budget)
+
+
+def blocks_stats(
+    blocks: Iterable[np.ndarray], budget: Optional[Budget] = None
+) -> Dict[str, Any]:
+    """
+    Stats folded block by block. With a ``budget`` the fold stops when the
+    entry runs out of it, and the result covers only the blocks read so
+    far: ``partial`` is then true and ``count`` says how many finite values
+    were seen.
+    """
+    acc = StreamingStats()
+    if budget is not None:
+        blocks = budget.limit(blocks)
+    for block in blocks:
+        acc.update(block)
+    summary = acc.to_dict()
+    if budget is not None and budget.reason is not None:
+        summary["partial"] = True
+        summary["count"] = acc.count
+    return summary
+
+
+def array_stats(arr: np.ndarray, budget: Optional[Budget] = None) -> Dict[str, Any]:
+    """
+    Stats for an in-memory (or memory-mapped) array, folded over hyperslabs
+    of the array itself so that only one block at a time is ever copied.
+    """
+    if arr.ndim > 1 and abs(arr.strides[0]) < abs(arr.strides[-1]):
+        # column-major (as MATLAB data is): slice along the slowest axis
+        arr = arr.T
+    return blocks_stats(
+        (arr[sel] for sel in block_slices(arr.shape, BLOCK_ELEMS)), budget
+    )
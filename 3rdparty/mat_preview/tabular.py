@@ -0,0 +1,350 @@
+"""
+Head-of-file previews for the tabular data that sits next to MAT files:
+Excel workbooks and whitespace-delimited text logs.
+
+Both are read as streams and only as far as the preview needs, with the
+standard library alone. A workbook is a zip of XML parts: the sheet list
+comes from ``xl/workbook.xml``, and each sheet is parsed incrementally and
+abandoned after its first rows, so neither the rest of the sheet nor the
+other parts are decompressed. Shared strings are resolved the same way, only
+up to the highest index the previewed rows use.
+"""
+from __future__ import annotations
+
+import io
+import os
+import posixpath
+import re
+from typing import TYPE_CHECKING, Any, BinaryIO, Iterator, List, Optional, Tuple
+
+from archive import split_member
+from entry import Entry
+
+if TYPE_CHECKING:
+    import zipfile
+
+_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_PKG_REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+_CELL_REF = re.compile(r"([A-Z]+)(\d+)")
+
+# Lines searched for a header before a text file is taken to have none.
+HEADER_SCAN = 100
+
+Cell = Any  # int | float | bool | str | None
+
+
+def _column_index(letters: str) -> int:
+    """``"A"`` -> 0, ``"AB"`` -> 27."""
+    n = 0
+    for c in letters:
+        n = n * 26 + ord(c) - ord("A") + 1
+    return n - 1
+
+
+def _column_letters(index: int) -> str:
+    letters = ""
+    index += 1
+    while index:
+        index, rem = divmod(index - 1, 26)
+        letters = chr(ord("A") + rem) + letters
+    return letters
+
+
+def _number(text: str) -> Cell:
+    """``int`` or ``float`` if ``text`` is one, else ``text`` itself."""
+    try:
+        return int(text)
+    except ValueError:
+        pass
+    try:
+        return float(text)
+    except ValueError:
+        return text
+
+
+def _dtype(values: List[Cell]) -> str:
+    """Type of a column, judged from the previewed values alone."""
+    kinds = {type(v) for v in values if v is not None and v != ""}
+    if not kinds:
+        return "empty"
+    if kinds <= {bool}:
+        return "bool"
+    if kinds <= {int}:
+        return "int"
+    if kinds <= {int, float}:
+        return "float"
+    if kinds <= {str}:
+        return "str"
+    return "mixed"
+
+
+def _format(values: List[Cell]) -> str:
+    items = (repr(v) if isinstance(v, str) else str(v) for v in values)
+    return "[" + ", ".join(items) + "]"
+
+
+def _table_entries(
+    name: str,
+    header: List[str],
+    rows: List[List[Cell]],
+    n_rows: Optional[int],
+    n_cols: int,
+    sample_k: int,
+    list_only: bool,
+    max_depth: int,
+    note: Optional[str] = None,
+) -> Iterator[Entry]:
+    """
+    A table entry (the header plus the first rows, tab-separated) followed
+    by one entry per column, named ``<table>.<header>``. ``n_rows`` counts
+    data rows below the header, None if unknown.
+    """
+    columns = ", ".join(header)
+    lines = ["\t".join(header)]
+    for row in rows[:sample_k]:
+        lines.append("\t".join("" if v is None else str(v) for v in row))
+    yield Entry(
+        name=name,
+        kind="table",
+        dtype="table",
+        shape=(n_rows, n_cols) if n_rows is not None else (),
+        sample=None if list_only else "\n".join(lines),
+        note=f"columns: {columns}" + (f"; {note}" if note else ""),
+    )
+    if max_depth < 1:
+        return
+    for j, label in enumerate(header):
+        values = [row[j] if j < len(row) else None for row in rows[:sample_k]]
+        yield Entry(
+            name=f"{name}.{label}",
+            kind="column",
+            dtype=_dtype(values),
+            shape=(n_rows,) if n_rows is not None else (),
+            sample=None if list_only else _format(values),
+        )
+
+
+# -- xlsx ---------------------------------------------------------------------
+
+
+class _SharedStrings:
+    """``xl/sharedStrings.xml``, parsed only as far as the largest index asked."""
+
+    def __init__(self, zf: zipfile.ZipFile) -> None:
+        self.strings: List[str] = []
+        self._events: Optional[Iterator[Tuple[str, Any]]] = None
+        if "xl/sharedStrings.xml" in zf.namelist():
+            import xml.etree.ElementTree as ET
+
+            self._events = ET.iterparse(zf.open("xl/sharedStrings.xml"))
+
+    def get(self, index: int) -> str:
+        while index >= len(self.strings) and self._events is not None:
+            try:
+                _, elem = next(self._events)
+            except StopIteration:
+                self._events = None
+                break
+            if elem.tag == f"{_NS}si":
+                # rich text splits a string into runs, each with its own <t>
+                runs = (t.text or "" for t in elem.iter(f"{_NS}t"))
+                self.strings.append("".join(runs))
+                elem.clear()
+        return self.strings[index] if index < len(self.strings) else ""
+
+
+def _sheet_paths(zf: zipfile.ZipFile) -> List[Tuple[str, str]]:
+    """(sheet name, zip member) in workbook order."""
+    import xml.etree.ElementTree as ET
+
+    rels = ET.fromstring(zf.read("xl/_rels/workbook.xml.rels"))
+    targets = {}
+    for rel in rels.iter(f"{_PKG_REL_NS}Relationship"):
+        target = rel.get("Target", "")
+        if target.startswith("/"):
+            target = target[1:]
+        else:
+            target = posixpath.normpath(posixpath.join("xl", target))
+        targets[rel.get("Id")] = target
+
+    workbook = ET.fromstring(zf.read("xl/workbook.xml"))
+    return [
+        (sheet.get("name", ""), targets.get(sheet.get(f"{_REL_NS}id"), ""))
+        for sheet in workbook.iter(f"{_NS}sheet")
+    ]
+
+
+def _cell_value(cell: Any, shared: _SharedStrings) -> Cell:
+    kind = cell.get("t", "n")
+    if kind == "inlineStr":
+        return "".join(t.text or "" for t in cell.iter(f"{_NS}t"))
+    v = cell.find(f"{_NS}v")
+    if v is None or v.text is None:
+        return None
+    if kind == "s":
+        return shared.get(int(v.text))
+    if kind == "b":
+        return v.text == "1"
+    if kind in ("str", "e"):
+        return v.text
+    return _number(v.text)
+
+
+def _sheet_head(
+    zf: zipfile.ZipFile, member: str, n: int, shared: _SharedStrings
+) -> Tuple[Optional[Tuple[int, int]], List[List[Cell]]]:
+    """
+    Declared size (rows, columns) of a sheet, if it has a ``<dimension>``,
+    and its first ``n`` non-empty rows. Parsing stops right after them.
+    """
+    import xml.etree.ElementTree as ET
+
+    size = None
+    rows: List[List[Cell]] = []
+    with zf.open(member) as f:
+        for _, elem in ET.iterparse(f):
+            if elem.tag == f"{_NS}dimension":
+                refs = [_CELL_REF.match(r) for r in elem.get("ref", "").split(":")]
+                if len(refs) == 2 and all(refs):
+                    (c0, r0), (c1, r1) = (m.groups() for m in refs)  # type: ignore
+                    size = (
+                        int(r1) - int(r0) + 1,
+                        _column_index(c1) - _column_index(c0) + 1,
+                    )
+            elif elem.tag == f"{_NS}row":
+                row: List[Cell] = []
+                for cell in elem.iter(f"{_NS}c"):
+                    ref = _CELL_REF.match(cell.get("r", ""))
+                    col = _column_index(ref.group(1)) if ref else len(row)
+                    row.extend([None] * (col - len(row)))
+                    row.append(_cell_value(cell, shared))
+                elem.clear()
+                if any(v is not None and v != "" for v in row):
+                    rows.append(row)
+                    if len(rows) >= n:
+                        break
+    return size, rows
+
+
+def iter_xlsx(
+    source: BinaryIO,
+    sample_k: int,
+    list_only: bool = False,
+    max_depth: int = 3,
+) -> Iterator[Entry]:
+    """
+    One table per sheet: the first non-empty row is the header, and the
+    next ``sample_k`` rows are shown. Shapes come from the sheet's declared
+    dimension (header row excluded). Sheets are read when their entries are
+    requested, not before.
+    """
+    import zipfile
+
+    with zipfile.ZipFile(source) as zf:
+        shared = _SharedStrings(zf)
+        for sheet, member in _sheet_paths(zf):
+            if member not in zf.namelist():
+                yield Entry(
+                    name=sheet,
+                    kind="other",
+                    dtype="sheet",
+                    shape=(),
+                    note="chart or dialog sheet; not read",
+                )
+                continue
+            size, rows = _sheet_head(zf, member, sample_k + 1, shared)
+            if not rows:
+                yield Entry(name=sheet, kind="table", dtype="table", shape=(0, 0))
+                continue
+            width = max(len(r) for r in rows)
+            if size is not None:
+                width = max(width, size[1])
+            header = [
+                str(v) if v not in (None, "") else _column_letters(j)
+                for j, v in enumerate(rows[0] + [None] * (width - len(rows[0])))
+            ]
+            n_rows = size[0] - 1 if size is not None else None
+            yield from _table_entries(
+                sheet, header, rows[1:], n_rows, width, sample_k, list_only, max_depth
+            )
+
+
+# -- whitespace-delimited text -------------------------------------------------
+
+
+def _is_number(token: str) -> bool:
+    return not isinstance(_number(token), str)
+
+
+def _find_header(lines: List[List[str]]) -> Tuple[int, Optional[int]]:
+    """
+    (index of the first data line, index of the header line or None).
+
+    Like the ``Trial`` line scan of the experiment loaders, the header is
+    the first line of words only that is directly followed by a line
+    starting with a number. Anything above it is preamble.
+    """
+    for i, tokens in enumerate(lines[:-1]):
+        following = lines[i + 1]
+        if (
+            tokens
+            and not any(_is_number(t) for t in tokens)
+            and following
+            and _is_number(following[0])
+        ):
+            return i + 1, i
+    for i, tokens in enumerate(lines):
+        if tokens and _is_number(tokens[0]):
+            return i, None
+    return len(lines), None
+
+
+def iter_text(
+    source: BinaryIO,
+    name: str,
+    sample_k: int,
+    list_only: bool = False,
+    max_depth: int = 3,
+) -> Iterator[Entry]:
+    """
+    One table named ``name`` for a whitespace-delimited text file, with its
+    header detected among the first ``HEADER_SCAN`` lines. Only the first
+    ``sample_k`` data rows are parsed; the rest are merely counted.
+    """
+    text = io.TextIOWrapper(source, encoding="utf-8", errors="replace")
+    try:
+        scanned: List[List[str]] = []
+        for line in text:
+            scanned.append(line.split())
+            if len(scanned) >= HEADER_SCAN:
+                break
+        start, header_at = _find_header(scanned)
+        data = [tokens for tokens in scanned[start:] if tokens]
+        n_rows = len(data) + sum(1 for line in text if line.strip())
+    finally:
+        text.detach()
+
+    rows = [[_number(t) for t in tokens] for tokens in data[:sample_k]]
+    width = max((len(r) for r in rows), default=0)
+    if header_at is not None:
+        header = scanned[header_at]
+        width = max(width, len(header))
+        header = header + [str(j + 1) for j in range(len(header), width)]
+    else:
+        header = [str(j + 1) for j in range(width)]
+    note = None
+    above = scanned[: start if header_at is None else header_at]
+    preamble = sum(1 for tokens in above if tokens)
+    if preamble:
+        note = f"{preamble} preamble lines skipped"
+    yield from _table_entries(
+        name, header, rows, n_rows, width, sample_k, list_only, max_depth, note
+    )
+
+
+def table_name(path: str) -> str:
+    """Name of the single table of a text file: its base name sans extension."""
+    archive, member = split_member(path)
+    return os.path.splitext(os.path.basename(member or archive))[0]
@@ -0,0 +1,292 @@
+"""
+The partial readers against full loads of the same file.
+
+Fixtures come from ``benchmarks/make_fixtures.py`` in every format. Classic
+files are checked against ``scipy.io.loadmat``, v7.3 files against h5py;
+samples must be the elements ``sample_positions`` names in MATLAB's
+column-major order, whatever the format and however the data is stored.
+
+    python -m unittest discover -s test
+"""
+from __future__ import annotations
+
+import os
+import sys
+import tempfile
+import unittest
+from typing import Any, Dict, Iterator, Tuple
+from unittest import mock
+
+import h5py
+import numpy as np
+import scipy.io as sio
+import scipy.sparse as sp
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [ROOT, os.path.join(ROOT, "benchmarks")]
+
+import v5  # noqa: E402
+from mat_preview_api import open_mat  # noqa: E402
+from budget import Budget  # noqa: E402
+from classic import iter_classic_vars  # noqa: E402
+from main import iter_file  # noqa: E402
+from make_fixtures import build_layout, write_fixture  # noqa: E402
+from sampling import sample_array, sample_dataset, sample_positions  # noqa: E402
+
+# Big enough for several inflate steps once INFLATE_STEP is patched down.
+FIXTURE_BYTES = 256 << 10
+SMALL_STEP = 4 << 10
+
+SAMPLES = [
+    (k, mode, seed)
+    for k in (1, 7, 1000)
+    for mode in ("head", "stride", "random")
+    for seed in (0, 3)
+]
+
+
+def _leaves_classic(value: Any, name: str) -> Iterator[Tuple[str, np.ndarray]]:
+    if hasattr(value, "_fieldnames"):
+        for field in value._fieldnames:
+            yield from _leaves_classic(getattr(value, field), f"{name}.{field}")
+    else:
+        yield name, np.asarray(value)
+
+
+def _leaves_h5(obj: Any, name: str) -> Iterator[Tuple[str, np.ndarray]]:
+    if isinstance(obj, h5py.Group):
+        for key in obj:
+            yield from _leaves_h5(obj[key], f"{name}.{key}")
+    else:
+        yield name, obj[()].T  # HDF5 holds the transpose of the MATLAB array
+
+
+def reference(path: str, fmt: str) -> Dict[str, np.ndarray]:
+    """Every array leaf of the file, fully loaded, by its preview name."""
+    if fmt.startswith("v73"):
+        with h5py.File(path, "r") as f:
+            return {n: a for key in f for n, a in _leaves_h5(f[key], key)}
+    mat = sio.loadmat(path, squeeze_me=True, struct_as_record=False)
+    return {
+        n: a
+        for key, value in mat.items()
+        if not key.startswith("__")
+        for n, a in _leaves_classic(value, key)
+    }
+
+
+def expected_sample(ref: np.ndarray, k: int, mode: str, seed: int) -> np.ndarray:
+    return ref.ravel(order="F")[sample_positions(ref.size, k, mode, seed)]
+
+
+class ReaderTest(unittest.TestCase):
+    FORMATS = ("v4", "v5", "v5z", "v73", "v73c")
+    LAYOUTS = ("many_small", "few_huge", "deep_struct")
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls._tmp = tempfile.TemporaryDirectory()
+        cls.paths: Dict[Tuple[str, str], str] = {}
+        for layout in cls.LAYOUTS:
+            tree = build_layout(layout, FIXTURE_BYTES)
+            for fmt in cls.FORMATS:
+                if fmt == "v4" and layout == "deep_struct":
+                    continue  # v4 has no structs
+                path = os.path.join(cls._tmp.name, f"{fmt}_{layout}.mat")
+                write_fixture(path, fmt, tree)
+                cls.paths[fmt, layout] = path
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls._tmp.cleanup()
+
+    def check_v5_arrays(self, path: str) -> None:
+        ref = reference(path, "v5")
+        seen = 0
+        with open(path, "rb") as f:
+            for var in iter_classic_vars(f):
+                arr = var.numeric()
+                if arr is None:
+                    continue
+                seen += 1
+                want = ref[var.name]
+                np.testing.assert_array_equal(arr.read(), want)
+                for k, mode, seed in SAMPLES:
+                    got = arr.sample(k, mode, seed)
+                    expected = expected_sample(want, k, mode, seed)
+                    np.testing.assert_array_equal(got, expected, (var.name, k, mode))
+                    # the same elements sample_array picks from the loaded array
+                    expected = sample_array(want, k, mode, seed)
+                    np.testing.assert_array_equal(got, expected, (var.name, k, mode))
+                # a budget cuts the sample short, never changes what is in it
+                full = arr.sample(1000, "random", 1)
+                cut = arr.sample(1000, "random", 1, Budget(max_bytes=800))
+                if arr.compressed:
+                    self.assertLess(cut.size, full.size)
+                np.testing.assert_array_equal(cut, full[: cut.size])
+        self.assertGreater(seen, 0, path)
+
+    def check_node(self, node: Any, want: np.ndarray) -> None:
+        np.testing.assert_array_equal(
+            np.squeeze(node.read()), np.squeeze(want), node.name
+        )
+        for k, mode, seed in SAMPLES:
+            np.testing.assert_array_equal(
+                node.sample(k, mode, seed),
+                expected_sample(want, k, mode, seed),
+                (node.name, k, mode),
+            )
+
+    def test_v5_array_matches_loadmat(self) -> None:
+        # deep_struct has no top-level numeric array
+        for layout in ("many_small", "few_huge"):
+            for fmt in ("v5", "v5z"):
+                with self.subTest(fmt=fmt, layout=layout):
+                    self.check_v5_arrays(self.paths[fmt, layout])
+
+    def test_v5_array_across_inflate_steps(self) -> None:
+        with mock.patch.object(v5, "INFLATE_STEP", SMALL_STEP):
+            self.check_v5_arrays(self.paths["v5z", "few_huge"])
+
+    def test_hdf5_chunk_layouts(self) -> None:
+        # k elements whatever the chunks, from the positions the v5 reader uses
+        want = np.arange(300 * 70, dtype=float).reshape(300, 70)
+        path = os.path.join(self._tmp.name, "chunks.h5")
+        layouts = [None, (1, 1), (7, 3), (300, 1), (1, 70), (64, 64)]
+        with h5py.File(path, "w") as f:
+            for i, chunks in enumerate(layouts):
+                opts = {} if chunks is None else {"compression": "gzip"}
+                f.create_dataset(f"d{i}", data=want, chunks=chunks, **opts)
+        with h5py.File(path, "r") as f:
+            for i, chunks in enumerate(layouts):
+                ds = f[f"d{i}"]
+                for k, mode, seed in SAMPLES:
+                    with self.subTest(chunks=chunks, k=k, mode=mode, seed=seed):
+                        full = sample_dataset(ds, k, mode, seed)
+                        pos = sample_positions(want.size, k, mode, seed)
+                        np.testing.assert_array_equal(full, want.ravel()[pos])
+                        cut = sample_dataset(ds, k, mode, seed, Budget(max_bytes=800))
+                        np.testing.assert_array_equal(cut, full[: cut.size])
+
+    def test_node_reuse(self) -> None:
+        # every call on a node reads the same data, whatever came before it
+        for fmt in ("v5", "v5z", "v73c"):
+            with self.subTest(fmt=fmt):
+                path = self.paths[fmt, "few_huge"]
+                ref = reference(path, fmt)
+                with open_mat(path) as mat:
+                    node = mat[mat.keys()[0]]
+                    want = ref[node.name]
+                    full = node.stats()
+                    self.assertEqual(full["max"], want.max())
+                    cut = node.stats(max_bytes=1000)
+                    if fmt != "v73c":  # HDF5 stops after a whole chunk
+                        self.assertTrue(cut["partial"])
+                        self.assertLessEqual(cut["count"], 1000 // want.itemsize)
+                    self.assertEqual(node.stats(), full)
+                    np.testing.assert_array_equal(
+                        node.sample(3), expected_sample(want, 3, "head", 0)
+                    )
+                    self.assertEqual(node.stats(), full)
+                    np.testing.assert_array_equal(
+                        node.sample(10), expected_sample(want, 10, "head", 0)
+                    )
+                    np.testing.assert_array_equal(
+                        np.squeeze(node.read()), np.squeeze(want)
+                    )
+                    self.assertEqual(node.stats(), full)
+                    np.testing.assert_array_equal(
+                        node.sample(7, "random", 2),
+                        expected_sample(want, 7, "random", 2),
+                    )
+
+    def test_read_selection(self) -> None:
+        sels = [
+            (),
+            0,
+            -1,
+            slice(0, 5),
+            (slice(None), 0),
+            (0, slice(None)),
+            (slice(2, None, 3), slice(-4, None)),
+            (Ellipsis, 1),
+            (slice(3, 3), 0),
+            np.array([2, 0]),
+        ]
+        with mock.patch.object(v5, "INFLATE_STEP", SMALL_STEP):
+            for fmt in ("v5", "v5z"):
+                path = self.paths[fmt, "few_huge"]
+                ref = reference(path, fmt)
+                with open_mat(path) as mat:
+                    for name in mat.keys():
+                        want = ref[name]
+                        for sel in sels:
+                            with self.subTest(fmt=fmt, name=name, sel=sel):
+                                # a fresh node each time, so nothing is cached
+                                with open_mat(path) as fresh:
+                                    got = fresh[name].read(sel)
+                                np.testing.assert_array_equal(got, want[sel])
+                                self.assertEqual(got.shape, want[sel].shape)
+                        with self.assertRaises(IndexError):
+                            mat[name].read(want.shape[0])
+
+    def test_logical(self) -> None:
+        path = os.path.join(self._tmp.name, "logical.mat")
+        mask = np.arange(60).reshape(6, 10) % 3 == 0
+        for compress in (False, True):
+            with self.subTest(compress=compress):
+                sio.savemat(path, {"mask": mask}, do_compression=compress)
+                with open_mat(path) as mat:
+                    node = mat["mask"]
+                    self.assertEqual(node.dtype, "logical")
+                    sample = node.sample(4, "stride")
+                    self.assertEqual(sample.dtype, bool)
+                    np.testing.assert_array_equal(
+                        sample, expected_sample(mask, 4, "stride", 0)
+                    )
+                    np.testing.assert_array_equal(node.read((0, slice(None))), mask[0])
+
+    def test_list_matches_full_preview(self) -> None:
+        # everything but the samples, from the headers alone
+        paths = dict(self.paths)
+        s = {"a": 1.0, "b": np.arange(4, dtype=np.int16), "c": "hi"}
+        cells = np.empty((1, 5), dtype=object)
+        cells[0, :] = [s, 2, np.array([True, False]), sp.eye(2, format="csc"), s]
+        pair = np.empty((1, 2), dtype=object)
+        pair[0, :] = [s, s]
+        kinds = {"s": s, "cells": cells, "nest": {"pair": pair, "t": True}}
+        for compress in (False, True):
+            path = os.path.join(self._tmp.name, f"kinds{int(compress)}.mat")
+            sio.savemat(path, kinds, do_compression=compress)
+            paths["v5z" if compress else "v5", "kinds"] = path
+        for (fmt, layout), path in sorted(paths.items()):
+            for depth in (0, 1, 10):
+                with self.subTest(fmt=fmt, layout=layout, depth=depth):
+                    listed, full = (
+                        [
+                            (e.name, e.kind, e.dtype, tuple(e.shape))
+                            for e in iter_file(
+                                path, 10**6, 3, list_only=only, max_depth=depth
+                            )
+                        ]
+                        for only in (True, False)
+                    )
+                    self.assertEqual(listed, full)
+
+    def test_open_mat_matches_full_load(self) -> None:
+        for (fmt, layout), path in sorted(self.paths.items()):
+            with self.subTest(fmt=fmt, layout=layout):
+                ref = reference(path, fmt)
+                with open_mat(path) as mat:
+                    nodes = {
+                        node.name: node
+                        for node in mat.walk(max_depth=10)
+                        if node.kind == "dataset"
+                    }
+                    self.assertEqual(sorted(nodes), sorted(ref))
+                    for name, want in ref.items():
+                        self.check_node(nodes[name], want)
+
+
+if __name__ == "__main__":
+    unittest.main()
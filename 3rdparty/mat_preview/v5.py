@@ -0,0 +1,304 @@
+from __future__ import annotations
+
+import math
+import struct
+from typing import TYPE_CHECKING, Any, BinaryIO, Dict, Iterator, Optional, Tuple
+
+import numpy as np
+
+from headers import (
+    COMPLEX_FLAG,
+    MI_DTYPES,
+    NUMERIC_CLASSES,
+    FileSource,
+    InflateSource,
+    miCOMPRESSED,
+    miMATRIX,
+    read_element,
+    read_tag,
+)
+from sampling import sample_positions
+
+if TYPE_CHECKING:
+    from budget import Budget
+
+# Bytes inflated at a time (and between budget checks) from compressed data.
+INFLATE_STEP = 16 << 20
+
+
+class V5Array:
+    """
+    Lazy view of a real, non-sparse numeric ``miMATRIX`` element.
+
+    Data is never loaded as a whole: uncompressed elements are memory-mapped
+    in place, compressed ones are inflated only as far as a request needs.
+    ``dtype`` is the storage type, which is what ``loadmat`` returns, and
+    ``shape`` is squeezed the same way ``squeeze_me=True`` does.
+    """
+
+    def __init__(
+        self,
+        f: BinaryIO,
+        src: Any,
+        order: str,
+        dims: Tuple[int, ...],
+        dtype: np.dtype,
+        compressed: bool,
+    ) -> None:
+        self.f = f
+        self.src = src
+        self.order = order
+        self.dims = dims
+        self.dtype = dtype
+        self.compressed = compressed
+        self.shape = tuple(d for d in dims if d != 1)
+        self.size = math.prod(dims)
+        self.data_offset = None if compressed else src.offset
+        # (element offset, element bytes, inflated bytes before the data)
+        self._inflate_at = (*src.element, src.produced) if compressed else None
+        self._produced: Optional[np.ndarray] = None
+
+    def memmap(self) -> np.memmap:
+        """Zero-copy view in MATLAB (column-major) layout; uncompressed only."""
+        if self.compressed:
+            raise ValueError("compressed variables cannot be memory-mapped")
+        f, offset = self.f, self.data_offset
+        if hasattr(f, "mmap_target"):  # stored archive member
+            f, base = f.mmap_target()
+            offset += base
+        return np.memmap(
+            f,
+            dtype=self.dtype,
+            mode="r",
+            offset=offset,
+            shape=self.dims,
+            order="F",
+        )
+
+    def _flat_map(self) -> Optional[np.ndarray]:
+        """Storage-order memmap, or None if the source has no real file."""
+        if self.compressed:
+            return None
+        try:
+            return self.memmap().reshape(-1, order="F")
+        except (OSError, ValueError, AttributeError):
+            return None  # e.g. a compressed archive member
+
+    def _storage(self, n: int, budget: Optional[Budget] = None) -> np.ndarray:
+        """
+        First ``n`` elements in storage (column-major) order, or fewer if
+        ``budget`` runs out while compressed data is inflated.
+        """
+        n = min(n, self.size)
+        if budget is not None and budget.remaining_bytes() is not None:
+            n = min(n, budget.remaining_bytes() // self.dtype.itemsize)
+        if not self.compressed:
+            flat = self._flat_map()
+            if flat is not None:
+                return np.asarray(flat[:n])
+            src = FileSource(self.f, self.data_offset)
+            raw = src.read(n * self.dtype.itemsize)
+            if budget is not None:
+                budget.charge(len(raw))
+            return np.frombuffer(raw, self.dtype)
+
+        have = 0 if self._produced is None else self._produced.size
+        parts = [] if self._produced is None else [self._produced]
+        step = INFLATE_STEP // self.dtype.itemsize
+        while have < n:
+            raw = self.src.read(min(n - have, step) * self.dtype.itemsize)
+            more = np.frombuffer(raw, self.dtype)
+            if more.size == 0:
+                break
+            parts.append(more)
+            have += more.size
+            if budget is not None and not budget.charge(more.nbytes):
+                break
+        if not parts:
+            return np.empty((0,), dtype=self.dtype)
+        self._produced = parts[0] if len(parts) == 1 else np.concatenate(parts)
+        return self._produced[:n]
+
+    def _stream(self) -> Any:
+        """A fresh sequential source positioned at the first element."""
+        if not self.compressed:
+            return FileSource(self.f, self.data_offset)
+        offset, nbytes, skip = self._inflate_at
+        src = InflateSource(self.f, offset, nbytes)
+        src.read(skip)
+        return src
+
+    def _gather(self, pos: np.ndarray, budget: Optional[Budget]) -> np.ndarray:
+        """
+        Elements at the sorted storage positions ``pos``, read in steps of
+        ``INFLATE_STEP`` up to the last of them. Only the picked elements
+        are kept, so memory stays bounded however far the data is read.
+        """
+        src = self._stream()
+        itemsize = self.dtype.itemsize
+        step = INFLATE_STEP // itemsize
+        parts = []
+        start = done = 0
+        while done < pos.size:
+            n = min(step, int(pos[-1]) + 1 - start)
+            if budget is not None and budget.remaining_bytes() is not None:
+                n = min(n, max(1, budget.remaining_bytes() // itemsize))
+            raw = src.read(n * itemsize)
+            block = np.frombuffer(raw[: len(raw) - len(raw) % itemsize], self.dtype)
+            if block.size == 0:
+                break
+            stop = int(np.searchsorted(pos, start + block.size))
+            parts.append(block[pos[done:stop] - start])
+            done = stop
+            start += block.size
+            if budget is not None and not budget.charge(block.nbytes):
+                break
+        if not parts:
+            return np.empty((0,), dtype=self.dtype)
+        return np.concatenate(parts)
+
+    def sample(
+        self,
+        k: int,
+        mode: str = "head",
+        seed: int = 0,
+        budget: Optional[Budget] = None,
+    ) -> np.ndarray:
+        """
+        Elements at ``sample_positions`` in storage order, which is MATLAB's
+        column-major order and what ``sample_array`` picks from the loaded
+        array. A head sample reads only its first ``k`` elements; spread
+        samples of compressed data are inflated in bounded steps that keep
+        only the picked elements. With a ``budget``, positions beyond what
+        it allows are dropped from the sample.
+        """
+        pos = sample_positions(self.size, k, mode, seed)
+        if pos.size == 0:
+            return np.empty((0,), dtype=self.dtype)
+        flat = self._flat_map()
+        if flat is not None:
+            if budget is not None:
+                budget.charge(pos.size * self.dtype.itemsize)
+            return np.asarray(flat[pos])
+        if int(pos[-1]) == pos.size - 1:  # a prefix: the head, or everything
+            return self._storage(pos.size, budget)
+        return self._gather(pos, budget)
+
+    def read(self, sel: Any = ()) -> np.ndarray:
+        """
+        The array in its squeezed shape, column-major, indexed by ``sel``:
+        a read-only memory map when uncompressed. Compressed data is
+        inflated only up to the last element that integer and slice indices
+        pick, keeping just those; the whole array (or any other index) is
+        inflated once and kept in memory.
+        """
+        flat = self._flat_map()
+        if flat is not None:
+            return flat.reshape(self.shape, order="F")[sel]
+        whole = self._produced is not None and self._produced.size == self.size
+        everything = isinstance(sel, tuple) and not sel
+        pos = None if whole or everything else _selected_positions(self.shape, sel)
+        if pos is None:
+            return self._storage(self.size).reshape(self.shape, order="F")[sel]
+        if pos.size == 0:
+            return np.empty(pos.shape, dtype=self.dtype)
+        picked, where = np.unique(pos, return_inverse=True)
+        return self._gather(picked, None)[where].reshape(pos.shape)
+
+    def stats(self, budget: Optional[Budget] = None) -> Dict[str, Any]:
+        """
+        ``blocks_stats`` over the whole array, in blocks no larger than the
+        budget's bytes so that a small budget stops the pass on time.
+        """
+        from stats import BLOCK_ELEMS, blocks_stats
+
+        block = BLOCK_ELEMS
+        if budget is not None and budget.max_bytes is not None:
+            block = max(1, min(block, budget.max_bytes // self.dtype.itemsize))
+        return blocks_stats(self.blocks(block), budget)
+
+    def blocks(self, block_elems: int) -> Iterator[np.ndarray]:
+        """
+        The whole array in storage order, ``block_elems`` at a time. Plain
+        reads rather than the memory map, so a full pass does not leave the
+        whole array resident. Every pass reads from its own stream, so the
+        array can be sampled, read and passed over again in any order.
+        """
+        src = self._stream()
+        remaining = self.size * self.dtype.itemsize
+        while remaining > 0:
+            raw = src.read(min(block_elems * self.dtype.itemsize, remaining))
+            if not raw:
+                break
+            remaining -= len(raw)
+            yield np.frombuffer(raw, self.dtype)
+
+def _selected_positions(shape: Tuple[int, ...], sel: Any) -> Optional[np.ndarray]:
+    """
+    Column-major positions of the elements ``a[sel]`` picks from an array
+    of ``shape``, laid out as the result, or None for indices other than
+    integers, slices and one ``...``.
+    """
+    if not isinstance(sel, tuple):
+        sel = (sel,)
+    dots = [i for i, s in enumerate(sel) if s is Ellipsis]
+    if len(dots) > 1:
+        return None
+    if dots:
+        at = dots[0]
+        fill = (slice(None),) * (len(shape) - len(sel) + 1)
+        sel = sel[:at] + fill + sel[at + 1 :]
+    if len(sel) > len(shape):
+        return None
+    pos = np.zeros((), dtype=np.int64)
+    stride = 1
+    for s, n in zip(sel + (slice(None),) * (len(shape) - len(sel)), shape):
+        if isinstance(s, slice):
+            pos = pos[..., None] + np.arange(n, dtype=np.int64)[s] * stride
+        elif isinstance(s, (int, np.integer)) and not isinstance(s, bool):
+            if not -n <= s < n:
+                raise IndexError(f"index {s} is out of bounds for size {n}")
+            pos = pos + (int(s) % n) * stride
+        else:
+            return None
+        stride *= n
+    return pos
+
+
+def open_numeric(f: BinaryIO, offset: int, order: str) -> Optional[V5Array]:
+    """
+    Parse the ``miMATRIX`` header of the top-level element at ``offset``.
+    Returns None for anything but real, non-sparse numeric (or logical)
+    arrays with more than one element; those are left to scipy.
+    """
+    f.seek(offset)
+    mdtype, nbytes, _ = read_tag(FileSource(f, offset), order)
+    if mdtype == miCOMPRESSED:
+        src: Any = InflateSource(f, offset + 8, nbytes)
+        mdtype, nbytes, _ = read_tag(src, order)
+        compressed = True
+    else:
+        src = FileSource(f, offset + 8)
+        compressed = False
+    if mdtype != miMATRIX or nbytes == 0:
+        return None
+
+    _, flags = read_element(src, order)
+    flags_class = struct.unpack(order + "I", flags[:4])[0]
+    mclass = flags_class & 0xFF
+    if mclass not in NUMERIC_CLASSES or (flags_class >> 8) & COMPLEX_FLAG:
+        return None
+
+    _, raw_dims = read_element(src, order)
+    dims = tuple(int(d) for d in np.frombuffer(raw_dims, order + "i4"))
+    if math.prod(dims) <= 1:
+        return None
+    read_element(src, order)  # array name
+
+    mdtype, nbytes, small = read_tag(src, order)
+    if small or mdtype not in MI_DTYPES:
+        return None
+    dtype = np.dtype(order + MI_DTYPES[mdtype])
+    if nbytes != math.prod(dims) * dtype.itemsize:
+        return None
+    return V5Array(f, src, order, dims, dtype, compressed)
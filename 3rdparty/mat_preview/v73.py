@@ -0,0 +1,228 @@
+from __future__ import annotations
+
+import math
+from typing import Any, Iterator, Optional, Tuple
+
+import numpy as np
+
+from budget import Budget
+from entry import Entry
+from sampling import sample_dataset, sample_str
+from stats import block_slices, dataset_stats, is_numeric
+
+# Groups MATLAB uses for its own bookkeeping rather than user variables.
+INTERNAL_GROUPS = ("#refs#", "#subsystem#")
+
+# Longest char array decoded into a sample string.
+CHAR_LIMIT = 1024
+
+# References dereferenced per read while expanding a cell array.
+REF_BLOCK = 1024
+
+
+def matlab_class(obj: Any) -> Optional[str]:
+    cls = obj.attrs.get("MATLAB_class")
+    if cls is None:
+        return None
+    return cls.decode() if isinstance(cls, bytes) else str(cls)
+
+
+def matlab_shape(obj: Any) -> Tuple[int, ...]:
+    """MATLAB dims: HDF5 stores column-major arrays with the shape reversed."""
+    return tuple(int(x) for x in reversed(obj.shape))
+
+
+def _is_reference(obj: Any) -> bool:
+    import h5py  # type: ignore
+
+    return h5py.check_dtype(ref=obj.dtype) is not None
+
+
+def _decode_char(ds: Any) -> Tuple[str, Optional[str]]:
+    shape = matlab_shape(ds)
+    rows = shape[0] if len(shape) == 2 else 1
+    if ds.size > CHAR_LIMIT and rows != 1:
+        return "", "char matrix too large to decode"
+    codes = sample_dataset(ds, CHAR_LIMIT, "head").astype(np.uint32)
+    if rows == 1:
+        text = "".join(map(chr, codes))
+    else:
+        # C-order flat of the HDF5 data is MATLAB's column-major order
+        grid = codes.reshape(shape[::-1]).T
+        text = "\n".join("".join(map(chr, row)) for row in grid)
+    note = "truncated" if ds.size > CHAR_LIMIT else None
+    return text, note
+
+
+class V73Walker:
+    """
+    Maps a MAT v7.3 (HDF5) file back to MATLAB semantics.
+
+    ``MATLAB_class`` decides how each object is shown: char arrays become
+    text, logicals booleans, groups structs with ``a.b`` paths, and cell
+    arrays are expanded into ``c{i}`` entries by dereferencing their object
+    references into ``#refs#``. Entries are produced lazily in pre-order, so
+    references are only followed for entries that are actually consumed and
+    never deeper than ``max_depth`` levels below a top-level variable.
+    Each entry gets a fresh allowance from ``budget`` for what it reads.
+    """
+
+    def __init__(
+        self,
+        f: Any,
+        sample_k: int,
+        sample_mode: str = "head",
+        seed: int = 0,
+        list_only: bool = False,
+        stats: bool = False,
+        max_depth: int = 3,
+        budget: Optional[Budget] = None,
+    ) -> None:
+        self.f = f
+        self.sample_k = sample_k
+        self.sample_mode = sample_mode
+        self.seed = seed
+        self.list_only = list_only
+        self.stats = stats
+        self.max_depth = max_depth
+        self.budget = budget or Budget()
+
+    def iter_entries(self) -> Iterator[Entry]:
+        for name in self.f:
+            if name in INTERNAL_GROUPS:
+                continue
+            yield from self._visit(name, self.f[name], 0)
+
+    def _visit(self, name: str, obj: Any, depth: int) -> Iterator[Entry]:
+        import h5py  # type: ignore
+
+        self.budget.start_entry()
+        cls = matlab_class(obj)
+        if isinstance(obj, h5py.Group):
+            if "MATLAB_sparse" in obj.attrs:
+                yield self._sparse(name, obj, cls)
+            elif cls in (None, "struct"):
+                yield from self._struct(name, obj, depth)
+            else:
+                yield Entry(
+                    name=name,
+                    kind="other",
+                    dtype=cls,
+                    shape=(),
+                    note=f"MATLAB object of class {cls}; not decoded",
+                )
+            return
+
+        if not isinstance(obj, h5py.Dataset):
+            return
+        if obj.attrs.get("MATLAB_empty", 0):
+            dims = tuple(int(x) for x in np.asarray(obj[()]).ravel())
+            yield Entry(
+                name=name, kind="dataset", dtype=cls or str(obj.dtype), shape=dims
+            )
+        elif _is_reference(obj):
+            yield from self._references(name, obj, cls, depth)
+        elif cls in (None, "char", "logical") or is_numeric(obj.dtype):
+            yield self._array(name, obj, cls)
+        else:
+            yield Entry(
+                name=name,
+                kind="other",
+                dtype=cls,
+                shape=matlab_shape(obj),
+                note=f"MATLAB object of class {cls}; not decoded",
+            )
+
+    def _array(self, name: str, ds: Any, cls: Optional[str]) -> Entry:
+        sample = None
+        note = None
+        summary = None
+        try:
+            if self.list_only:
+                pass
+            elif cls == "char":
+                sample, note = _decode_char(ds)
+            else:
+                budget = self.budget
+                a = sample_dataset(
+                    ds, self.sample_k, self.sample_mode, self.seed, budget
+                )
+                if cls == "logical":
+                    a = a.astype(bool)
+                sample = sample_str(a, self.sample_k)
+                note = budget.sample_note(a.size, min(self.sample_k, ds.size))
+                cut = note is not None and budget.reason is not None
+                if self.stats and is_numeric(ds.dtype) and not cut:
+                    summary = dataset_stats(ds, budget)
+                    if summary.get("partial"):
+                        note = budget.note("stats stopped")
+        except Exception as e:
+            note = f"sample error: {type(e).__name__}"
+
+        return Entry(
+            name=name,
+            kind="dataset",
+            dtype=cls or str(ds.dtype),
+            shape=matlab_shape(ds),
+            sample=sample,
+            note=note,
+            stats=summary,
+        )
+
+    def _sparse(self, name: str, group: Any, cls: Optional[str]) -> Entry:
+        rows = int(np.asarray(group.attrs["MATLAB_sparse"]).ravel()[0])
+        cols = int(group["jc"].shape[0]) - 1 if "jc" in group else 0
+        nnz = int(group["data"].shape[0]) if "data" in group else 0
+        sample = None
+        if nnz and not self.list_only:
+            a = sample_dataset(
+                group["data"], self.sample_k, self.sample_mode, self.seed, self.budget
+            )
+            sample = sample_str(a, self.sample_k)
+        return Entry(
+            name=name,
+            kind="dataset",
+            dtype=cls or "double",
+            shape=(rows, cols),
+            sample=sample,
+            note=f"sparse; {nnz} nonzeros",
+        )
+
+    def _struct(self, name: str, group: Any, depth: int) -> Iterator[Entry]:
+        fields = list(group)
+        yield Entry(
+            name=name,
+            kind="struct",
+            dtype="struct",
+            shape=(1, 1),
+            note=f"fields: {', '.join(fields)}",
+        )
+        if depth >= self.max_depth:
+            return
+        for field in fields:
+            yield from self._visit(f"{name}.{field}", group[field], depth + 1)
+
+    def _references(
+        self, name: str, ds: Any, cls: Optional[str], depth: int
+    ) -> Iterator[Entry]:
+        shape = matlab_shape(ds)
+        # a reference array without the cell class is a struct-array field
+        is_cell = cls == "cell"
+        yield Entry(
+            name=name,
+            kind="cell" if is_cell else "struct",
+            dtype=cls or "struct",
+            shape=shape,
+            note=f"{math.prod(shape)} elements",
+        )
+        if depth >= self.max_depth:
+            return
+
+        index = 0
+        for sel in block_slices(tuple(ds.shape), REF_BLOCK):
+            for ref in np.asarray(ds[sel]).ravel():
+                index += 1
+                if not ref:
+                    continue
+                child = f"{name}{{{index}}}" if is_cell else f"{name}({index})"
+                yield from self._visit(child, self.f[ref], depth + 1)
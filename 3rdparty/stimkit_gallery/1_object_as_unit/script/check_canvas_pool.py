@@ -0,0 +1,117 @@
+"""
+Leak check for pooled canvases.
+
+Renders a fixed set of scenes from the real trial data over and over through
+one CanvasPool and samples the resident memory of the process. After a
+warm-up, memory, the number of open canvases and the number of artists left
+on a returned canvas must all stay flat; otherwise the script exits non-zero.
+Frames are written to a temporary directory; output/ is not touched.
+
+  uv run python script/check_canvas_pool.py                  # 100k renders
+  uv run python script/check_canvas_pool.py --renders 5000 --format png
+"""
+import argparse
+import gc
+import os
+import resource
+import sys
+import tempfile
+from itertools import islice
+from pathlib import Path
+
+from loguru import logger
+from tqdm import tqdm
+
+from reproduce_stimuli import (
+    CONFIG_PATH,
+    canvas_artists,
+    iter_scene_jobs,
+    iter_trial_jobs,
+    load_config,
+    make_canvas_cfg,
+    make_pool,
+    make_renderers,
+    render_scene,
+)
+
+
+def rss_mb() -> float:
+    """Current resident set size, or the peak where /proc is not available."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Check that pooled canvases keep memory flat.")
+    parser.add_argument("--renders", type=int, default=100_000, help="Frames to render (default: 100000)")
+    parser.add_argument("--scenes", type=int, default=50, help="Distinct scenes cycled through (default: 50)")
+    parser.add_argument("--warmup", type=int, default=1_000, help="Frames rendered before the baseline is taken")
+    parser.add_argument("--samples", type=int, default=20, help="Memory samples taken after the warm-up")
+    parser.add_argument("--tolerance-mb", type=float, default=20.0, help="Allowed growth over the baseline")
+    parser.add_argument("--format", default=None, help="Output format (default: render.output_format)")
+    args = parser.parse_args()
+
+    app_cfg = load_config(CONFIG_PATH)
+    app_cfg.render.pool_canvases = True
+    if args.format:
+        app_cfg.render.output_format = args.format
+    pool = make_pool(app_cfg)
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            renderers = make_renderers(app_cfg, pool)
+            scenes = []
+            for exp_name, (_, trial_columns) in renderers.items():
+                jobs = iter_trial_jobs(exp_name, trial_columns, app_cfg, output_dir=Path(tmp))
+                scenes.extend(islice(iter_scene_jobs(jobs, app_cfg), args.scenes // len(renderers) + 1))
+            if not scenes:
+                logger.error("No trial data found to render")
+                return 2
+
+            # Every pass overwrites the same files, so disk use stays flat too
+            scenes = [
+                scene._replace(output_path=Path(tmp) / f"{i}.{app_cfg.render.output_format}")
+                for i, scene in enumerate(scenes[:args.scenes])
+            ]
+            canvas_cfg = make_canvas_cfg(app_cfg)
+            baseline_mb = last_mb = None
+            baseline_artists = None
+            every = max(1, (args.renders - args.warmup) // args.samples)
+            failures = []
+            for i in tqdm(range(args.renders), desc="Rendering"):
+                scene = scenes[i % len(scenes)]
+                render_scene(renderers[scene.exp_name][0], scene)
+                done = i + 1
+                if done < args.warmup or (done - args.warmup) % every and done != args.renders:
+                    continue
+                gc.collect()
+                with pool.canvas(canvas_cfg) as canvas:
+                    artists = len(canvas_artists(canvas))
+                mb = last_mb = rss_mb()
+                if baseline_mb is None:
+                    baseline_mb, baseline_artists = mb, artists
+                logger.info(f"{done:>8} renders: {mb:8.1f} MB ({mb - baseline_mb:+.1f}), "
+                            f"{pool.size()} canvas(es), {artists} artists")
+                if artists != baseline_artists:
+                    failures.append(f"{artists - baseline_artists:+d} artists left on the canvas after {done} renders")
+                if pool.size() != 1:
+                    failures.append(f"{pool.size()} canvases open after {done} renders")
+    finally:
+        pool.close()
+
+    growth = last_mb - baseline_mb if baseline_mb is not None else 0.0
+    if growth > args.tolerance_mb:
+        failures.append(f"memory grew by {growth:.1f} MB (tolerance {args.tolerance_mb} MB)")
+    for failure in dict.fromkeys(failures):
+        logger.error(failure)
+    if not failures:
+        logger.info(f"OK: {args.renders} renders, memory within {args.tolerance_mb} MB of the baseline")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
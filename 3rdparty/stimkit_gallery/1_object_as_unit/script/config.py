@@ -61,6 +61,13 @@ class RenderConfig(StrictModel):
     phases: list[Phase]
     seed: int
     output_format: str
+    dedupe_scenes: bool = Field(default=True, description="Render identical frames once and hardlink the copies")
+    pool_canvases: bool = Field(default=True, description="Reuse one open canvas per CanvasConfig, clearing its artists between frames")
+
+
+class MultiprocessingConfig(StrictModel):
+    processes: int | None = Field(default=None, description="Worker processes; None or 0 = all CPU cores")
+    enabled: bool = True
 
 
 class DataConfig(StrictModel):
@@ -135,6 +142,7 @@ class ExperimentsConfig(StrictModel):
 class StimuliAppConfig(StrictModel):
     canvas: CanvasConfig
     render: RenderConfig
+    multiprocessing: MultiprocessingConfig = MultiprocessingConfig()
     data: DataConfig
     display: DisplayConfig
     search: SearchConfig
@@ -154,3 +162,4 @@ class SceneConfig(StrictModel):
     group_type: GroupType
     phase: Phase
     trial_data: TrialData
+    seed: int = Field(description="Trial seed from (experiment, group, subject, trial index)")
@@ -1,29 +1,59 @@
 
+import math
+
 import scipy.io
-import numpy as np
-import os
+
+try:
+    from mat_preview_api import open_mat  # optional: mat_preview's Python API
+except ImportError:
+    open_mat = None
 
 file_path = "/home/lyk/code/stim_example/gallery/1_object_as_unit/data/Exp1/Integrated_group/caoyifang.mat"
 
-try:
-    mat = scipy.io.loadmat(file_path)
-    print("Keys:", mat.keys())
-    for key in mat:
-        if not key.startswith('__'):
-            data = mat[key]
-            print(f"Key: {key}, Type: {type(data)}, Shape: {data.shape if hasattr(data, 'shape') else 'N/A'}")
-            if hasattr(data, 'shape') and data.size < 100:
-                 print(data)
-            elif hasattr(data, 'shape') and len(data.shape) == 2:
-                 print(f"First row: {data[0, :]}")
 
-except Exception as e:
-    print(f"Failed with scipy: {e}")
+def inspect_lazily(file_path):
+    # classic and v7.3 files alike, without loading whole variables
+    with open_mat(file_path) as mat:
+        print("Keys:", mat.keys())
+        for node in mat.walk(max_depth=1):
+            print(f"Key: {node.name}, Kind: {node.kind}, Dtype: {node.dtype}, Shape: {node.shape}")
+            if node.kind != "dataset":
+                continue
+            if math.prod(node.shape) < 100:
+                 print(node.read())
+            elif len(node.shape) == 2:
+                 print(f"First row: {node.read((0, slice(None)))}")
+
+
+def inspect_loaded(file_path):
     try:
-        import h5py
-        with h5py.File(file_path, 'r') as f:
-            print("Keys (h5py):", list(f.keys()))
-            for key in f.keys():
-                print(f"Key: {key}, Shape: {f[key].shape}")
-    except Exception as e2:
-        print(f"Failed with h5py: {e2}")
+        mat = scipy.io.loadmat(file_path)
+        print("Keys:", mat.keys())
+        for key in mat:
+            if not key.startswith('__'):
+                data = mat[key]
+                print(f"Key: {key}, Type: {type(data)}, Shape: {data.shape if hasattr(data, 'shape') else 'N/A'}")
+                if hasattr(data, 'shape') and data.size < 100:
+                     print(data)
+                elif hasattr(data, 'shape') and len(data.shape) == 2:
+                     print(f"First row: {data[0, :]}")
+
+    except Exception as e:
+        print(f"Failed with scipy: {e}")
+        try:
+            import h5py
+            with h5py.File(file_path, 'r') as f:
+                print("Keys (h5py):", list(f.keys()))
+                for key in f.keys():
+                    print(f"Key: {key}, Shape: {f[key].shape}")
+        except Exception as e2:
+            print(f"Failed with h5py: {e2}")
+
+
+try:
+    if open_mat is not None:
+        inspect_lazily(file_path)
+    else:
+        inspect_loaded(file_path)
+except Exception as e:
+    print(f"Failed to open {file_path}: {e}")
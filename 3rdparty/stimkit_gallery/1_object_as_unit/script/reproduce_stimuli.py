@@ -5,17 +5,25 @@ This script reads trial data from .mat files and renders experimental stimuli
 for three experiments (Exp1, Exp2, Exp3), each with integrated and separate
 group conditions across multiple phases (Memory, Cue, Search, Probe1, Probe2).
 """
+import abc
 import sys
+import os
+import hashlib
 import tomllib
+import multiprocessing as mp
 import numpy as np
 import random
+import shutil
+import matplotlib
 import matplotlib.transforms as transforms
 import matplotlib.patches as patches
 
+from contextlib import ExitStack, contextmanager
+from multiprocessing.util import Finalize
 from loguru import logger
 from tqdm import tqdm
 from pathlib import Path
-from typing import Literal
+from typing import Iterable, Iterator, Literal, NamedTuple
 
 
 logger.remove()
@@ -144,14 +152,96 @@ def search_array_patches(
     return result
 
 
+class SearchSpec(NamedTuple):
+    """Everything a search array frame depends on, random draws included."""
+    colors: tuple[str, ...]
+    target_index: int
+    singleton_index: int
+    singleton_shape: int | None
+    tilt: float
+
+
+# ==============================================================================
+# Canvas Pool
+# ==============================================================================
+# The same section appears in gallery 6. Each gallery is a standalone uv
+# project whose scripts import only stimkit and their own modules, so there
+# is no shared module to hold it; keep the two copies identical.
+def canvas_key(canvas_cfg: CanvasConfig) -> str:
+    """Key of a canvas configuration, equal for equal field values."""
+    return canvas_cfg.model_dump_json()
+
+
+def canvas_artists(canvas: Canvas) -> set:
+    """Artists currently on the canvas axes and its figure."""
+    return {*canvas.ax.get_children(), *canvas.ax.figure.get_children()}
+
+
+class CanvasPool:
+    """
+    Open canvases kept per CanvasConfig and reused across frames.
+
+    Building the figure and setting up its axes costs more than drawing a
+    simple scene, so a canvas is opened once and, after each frame, only
+    the artists drawn on it are removed. Everything present when it was
+    opened (background, axes, limits) stays as configured. ``close`` must
+    be called once the pool is no longer needed.
+    """
+
+    def __init__(self) -> None:
+        self._stack = ExitStack()
+        self._idle: dict[str, list[tuple[Canvas, set]]] = {}
+
+    @contextmanager
+    def canvas(self, canvas_cfg: CanvasConfig) -> Iterator[Canvas]:
+        """A clean canvas for ``canvas_cfg``, cleared and returned to the pool afterwards."""
+        idle = self._idle.setdefault(canvas_key(canvas_cfg), [])
+        if idle:
+            canvas, baseline = idle.pop()
+        else:
+            canvas = self._stack.enter_context(Canvas(canvas_cfg))
+            baseline = canvas_artists(canvas)
+        try:
+            yield canvas
+        finally:
+            for artist in canvas_artists(canvas) - baseline:
+                artist.remove()
+            idle.append((canvas, baseline))
+
+    def size(self) -> int:
+        """Number of canvases held open."""
+        return sum(len(idle) for idle in self._idle.values())
+
+    def close(self) -> None:
+        """Close every canvas the pool has opened."""
+        self._idle.clear()
+        self._stack.close()
+
+
+class PooledRenderer(Renderer):
+    """Renderer drawing on canvases from a CanvasPool; without a pool, a fresh canvas per frame."""
+
+    def __init__(self, canvas_cfg: CanvasConfig, pool: CanvasPool | None = None) -> None:
+        super().__init__(canvas_cfg)
+        self.pool = pool
+
+    def render(self, scene_cfg: SceneConfig, output_cfg: OutputConfig) -> None:
+        if self.pool is None:
+            super().render(scene_cfg, output_cfg)
+            return
+        with self.pool.canvas(self.canvas_cfg) as canvas:
+            self.draw(canvas, scene_cfg)
+            canvas.save(output_cfg)
+
+
 # ==============================================================================
 # Renderers
 # ==============================================================================
-class BaseStimuliRenderer(Renderer):
+class BaseStimuliRenderer(PooledRenderer, abc.ABC):
     """Base renderer with shared utilities for all experiments."""
 
-    def __init__(self, canvas_cfg: CanvasConfig, app_cfg: StimuliAppConfig) -> None:
-        super().__init__(canvas_cfg)
+    def __init__(self, canvas_cfg: CanvasConfig, app_cfg: StimuliAppConfig, pool: CanvasPool | None = None) -> None:
+        super().__init__(canvas_cfg, pool)
         self.app_cfg = app_cfg
 
     def get_color(self, idx: int) -> str:
@@ -161,13 +251,27 @@ class BaseStimuliRenderer(Renderer):
             raise ValueError(f"Color index {idx} out of range (1..{len(palette)}).")
         return palette[idx - 1]
 
-    def _get_unrelated_color(self, used_indices: list[int]) -> str:
+    @abc.abstractmethod
+    def scene_key(self, cfg: SceneConfig) -> tuple:
+        """
+        Canonical key of the frame ``draw`` produces for ``cfg``: the fields and
+        random draws it depends on, and nothing else. Equal keys, equal frames.
+        """
+
+    def scene_rng(self, cfg: SceneConfig) -> random.Random:
+        """
+        Random stream of one scene, seeded by its trial seed and phase only, so
+        draws do not depend on which process renders it or in what order.
+        """
+        return random.Random(f"{cfg.seed}/{cfg.phase.value}")
+
+    def _get_unrelated_color(self, used_indices: list[int], rng: random.Random) -> str:
         """Pick a random color from palette that is NOT in the used indices."""
         count = self.app_cfg.display.color_count
         candidates = [i for i in range(1, count + 1) if i not in used_indices]
         if not candidates:
             raise ValueError(f"No available colors for unrelated distractor. Used: {used_indices}, Total: {count}")
-        return self.get_color(random.choice(candidates))
+        return self.get_color(rng.choice(candidates))
 
     def _is_probe_match(self, probe_idx: CueValue, probe_cond: ProbeCondition) -> bool:
         """
@@ -193,31 +297,30 @@ class BaseStimuliRenderer(Renderer):
         """Add a semicircle at the given position in canvas units."""
         canvas.add_patch(semicircle((x, y), size / 2, color, canvas.transData, orientation=orientation))
 
-    def add_search_array(self, canvas: Canvas, trial: TrialData, 
-                         singleton_color: str | None,
-                         singleton_shape: int | None = None) -> None:
+    def resolve_search(self, trial: TrialData, 
+                       singleton_color: str | None,
+                       rng: random.Random,
+                       singleton_shape: int | None = None) -> SearchSpec:
         """
-        Add the visual search array to canvas with randomized target and singleton positions.
+        Resolve the visual search array, drawing randomized target and singleton positions.
         
         Parameters
         ----------
-        canvas : Canvas
-            Target canvas.
         trial : TrialData
             Trial data.
         singleton_color : str | None
             Color of the singleton item. If None, assumes no singleton (all gray).
+        rng : random.Random
+            Stream for the target and singleton positions (see ``scene_rng``).
         singleton_shape : int | None
             Shape index of the singleton item. If None or not applicable, defaults to Circle logic
             (handled by search_array_patches).
         """
         scfg = self.app_cfg.search
-        rv = scfg.radius.value_in_unit(canvas)
-        iv = scfg.item_size.value_in_unit(canvas)
         
         # Randomize target and singleton positions (ensure they differ)
-        target_index = random.randint(0, 7)
-        singleton_index = random.choice([i for i in range(8) if i != target_index])
+        target_index = rng.randint(0, 7)
+        singleton_index = rng.choice([i for i in range(8) if i != target_index])
         
         colors = []
         for i in range(8):
@@ -226,17 +329,24 @@ class BaseStimuliRenderer(Renderer):
             else:
                 colors.append(scfg.base_color)
         tilt = scfg.tilt_pos if trial.target_orient == TargetOrientation.RIGHT else scfg.tilt_neg
-        
+        return SearchSpec(tuple(colors), target_index, singleton_index, singleton_shape, tilt)
+
+    def add_search_array(self, canvas: Canvas, spec: SearchSpec) -> None:
+        """Add a resolved visual search array to canvas."""
+        scfg = self.app_cfg.search
+        rv = scfg.radius.value_in_unit(canvas)
+        iv = scfg.item_size.value_in_unit(canvas)
         canvas.add_patches(
             search_array_patches(
-                rv, iv, colors, target_index, tilt, scfg.marker_ratio, scfg.line_width, canvas.transData,
-                singleton_index=singleton_index,
-                singleton_shape_idx=singleton_shape
+                rv, iv, list(spec.colors), spec.target_index, spec.tilt, scfg.marker_ratio, scfg.line_width,
+                canvas.transData,
+                singleton_index=spec.singleton_index,
+                singleton_shape_idx=spec.singleton_shape
             )
         )
 
-    def add_color_probe(self, canvas: Canvas, trial: TrialData, idx: CueValue, size_unit: float) -> None:
-        """Add a color probe stimulus."""
+    def color_probe_index(self, trial: TrialData, idx: CueValue) -> int:
+        """Palette index of a color probe."""
         # Determine reference color
         # If cue_val == idx (both 1 or both 2), we probe col1 (Top/Color).
         # Otherwise, we probe col2 (Bottom/Shape).
@@ -251,18 +361,23 @@ class BaseStimuliRenderer(Renderer):
         else:
             # Deterministic mismatch: next color in cycle
             final_color_idx = (ref_color_idx % self.app_cfg.display.color_count) + 1
-            
+        return final_color_idx
+
+    def add_color_probe(self, canvas: Canvas, trial: TrialData, idx: CueValue, size_unit: float) -> None:
+        """Add a color probe stimulus."""
+        final_color_idx = self.color_probe_index(trial, idx)
         self.add_shape(canvas, ShapeType.CIRCLE, self.get_color(final_color_idx), 0.0, 0.0, size_unit)
 
 
 class Exp1Renderer(BaseStimuliRenderer):
     """Renderer for Experiment 1: Color-Shape binding."""
 
-    def __init__(self, canvas_cfg: CanvasConfig, app_cfg: StimuliAppConfig, exp_cfg: Exp1Config) -> None:
-        super().__init__(canvas_cfg, app_cfg)
+    def __init__(self, canvas_cfg: CanvasConfig, app_cfg: StimuliAppConfig, exp_cfg: Exp1Config,
+                 pool: CanvasPool | None = None) -> None:
+        super().__init__(canvas_cfg, app_cfg, pool)
         self.exp_cfg = exp_cfg
 
-    def _get_singleton_spec(self, t: TrialData) -> tuple[str | None, int | None]:
+    def _get_singleton_spec(self, t: TrialData, rng: random.Random) -> tuple[str | None, int | None]:
         """
         Resolve singleton (color, shape) based on dist_cond for Exp1.
         
@@ -291,7 +406,7 @@ class Exp1Renderer(BaseStimuliRenderer):
                 return self.get_color(t.col1), ShapeType.CIRCLE
             case DistractorCondition.UNRELATED:
                 # Unrelated: Random new color + Standard Circle
-                return self._get_unrelated_color([t.col1]), ShapeType.CIRCLE
+                return self._get_unrelated_color([t.col1], rng), ShapeType.CIRCLE
             case _:
                 return None, None
 
@@ -302,13 +417,31 @@ class Exp1Renderer(BaseStimuliRenderer):
             case Phase.CUE:
                 self._draw_cue(canvas, cfg)
             case Phase.SEARCH:
-                c, s = self._get_singleton_spec(cfg.trial_data)
-                self.add_search_array(canvas, cfg.trial_data, c, singleton_shape=s)
+                self.add_search_array(canvas, self._search_spec(cfg))
             case Phase.PROBE1:
                 self._draw_probe(canvas, cfg, CueValue.FIRST)
             case Phase.PROBE2:
                 self._draw_probe(canvas, cfg, CueValue.SECOND)
 
+    def scene_key(self, cfg: SceneConfig) -> tuple:
+        t = cfg.trial_data
+        match cfg.phase:
+            case Phase.MEMORY:
+                return ("memory", cfg.group_type, t.col1, t.col2)
+            case Phase.CUE:
+                return ("cue", t.cue_val)
+            case Phase.SEARCH:
+                return ("search", self._search_spec(cfg))
+            case Phase.PROBE1:
+                return ("probe", cfg.group_type, self._probe_spec(cfg, CueValue.FIRST))
+            case Phase.PROBE2:
+                return ("probe", cfg.group_type, self._probe_spec(cfg, CueValue.SECOND))
+
+    def _search_spec(self, cfg: SceneConfig) -> SearchSpec:
+        rng = self.scene_rng(cfg)
+        c, s = self._get_singleton_spec(cfg.trial_data, rng)
+        return self.resolve_search(cfg.trial_data, c, rng, singleton_shape=s)
+
     def _draw_memory(self, canvas: Canvas, cfg: SceneConfig) -> None:
         t, c = cfg.trial_data, self.get_color(cfg.trial_data.col1)
         match cfg.group_type:
@@ -333,6 +466,13 @@ class Exp1Renderer(BaseStimuliRenderer):
         canvas.add_text((0, 0), cue, fontsize=self.app_cfg.display.cue_font_size, ha="center", va="center")
 
     def _draw_probe(self, canvas: Canvas, cfg: SceneConfig, idx: CueValue) -> None:
+        size = self.exp_cfg.integrated_item_size if cfg.group_type == GroupType.INTEGRATED else self.exp_cfg.separate_item_size
+        size_u = size.value_in_unit(canvas)
+        shape_idx, color = self._probe_spec(cfg, idx)
+        self.add_shape(canvas, shape_idx, color, 0.0, 0.0, size_u)
+
+    def _probe_spec(self, cfg: SceneConfig, idx: CueValue) -> tuple[int, str]:
+        """(shape index, color) of a probe item."""
         t, disp = cfg.trial_data, self.app_cfg.display
         should_match = self._is_probe_match(idx, t.probe_cond)
         
@@ -343,26 +483,23 @@ class Exp1Renderer(BaseStimuliRenderer):
         #   If Cue == 2 (Shape): Probe 1 is Shape, Probe 2 is Color.
         # This simplifies to: is_color if (Cue=1 and Probe=1) OR (Cue=2 and Probe=2).
         is_color_feature = (t.cue_val == CueValue.FIRST and idx == CueValue.FIRST) or (t.cue_val == CueValue.SECOND and idx == CueValue.SECOND)
-        
-        size = self.exp_cfg.integrated_item_size if cfg.group_type == GroupType.INTEGRATED else self.exp_cfg.separate_item_size
-        size_u = size.value_in_unit(canvas)
 
         if is_color_feature:
             c_idx = t.col1 if should_match else (t.col1 % disp.color_count) + 1
-            self.add_shape(canvas, ShapeType.CIRCLE, self.get_color(c_idx), 0.0, 0.0, size_u)
-        else:
-            s_idx = t.col2 if should_match else (t.col2 % disp.shape_count) + 1
-            self.add_shape(canvas, s_idx, self.exp_cfg.separate_shape_color, 0.0, 0.0, size_u)
+            return ShapeType.CIRCLE, self.get_color(c_idx)
+        s_idx = t.col2 if should_match else (t.col2 % disp.shape_count) + 1
+        return s_idx, self.exp_cfg.separate_shape_color
 
 
 class Exp2Renderer(BaseStimuliRenderer):
     """Renderer for Experiment 2: Semicircle color binding."""
 
-    def __init__(self, canvas_cfg: CanvasConfig, app_cfg: StimuliAppConfig, exp_cfg: Exp2Config) -> None:
-        super().__init__(canvas_cfg, app_cfg)
+    def __init__(self, canvas_cfg: CanvasConfig, app_cfg: StimuliAppConfig, exp_cfg: Exp2Config,
+                 pool: CanvasPool | None = None) -> None:
+        super().__init__(canvas_cfg, app_cfg, pool)
         self.exp_cfg = exp_cfg
 
-    def _get_singleton_color(self, t: TrialData) -> str | None:
+    def _get_singleton_color(self, t: TrialData, rng: random.Random) -> str | None:
         """
         Resolve singleton color for Exp2 based on dist_cond and cue_val.
         
@@ -384,7 +521,7 @@ class Exp2Renderer(BaseStimuliRenderer):
             case DistractorCondition.NO_SINGLETON:
                 return None
             case DistractorCondition.UNRELATED:
-                return self._get_unrelated_color([t.col1, t.col2])
+                return self._get_unrelated_color([t.col1, t.col2], rng)
             case DistractorCondition.RELATED_FIRST:
                 target_idx = t.col1 if t.cue_val == CueValue.FIRST else t.col2
                 return self.get_color(target_idx)
@@ -401,13 +538,30 @@ class Exp2Renderer(BaseStimuliRenderer):
             case Phase.CUE:
                 self._draw_cue(canvas, cfg)
             case Phase.SEARCH:
-                self.add_search_array(canvas, cfg.trial_data, self._get_singleton_color(cfg.trial_data))
+                self.add_search_array(canvas, self._search_spec(cfg))
             case Phase.PROBE1 | Phase.PROBE2:
                 idx = CueValue.FIRST if cfg.phase == Phase.PROBE1 else CueValue.SECOND
                 size = self.exp_cfg.integrated_item_size if cfg.group_type == GroupType.INTEGRATED else self.exp_cfg.separate_item_size
                 size_u = size.value_in_unit(canvas)
                 self.add_color_probe(canvas, cfg.trial_data, idx, size_u)
 
+    def scene_key(self, cfg: SceneConfig) -> tuple:
+        t = cfg.trial_data
+        match cfg.phase:
+            case Phase.MEMORY:
+                return ("memory", cfg.group_type, t.col1, t.col2)
+            case Phase.CUE:
+                return ("cue", t.cue_val)
+            case Phase.SEARCH:
+                return ("search", self._search_spec(cfg))
+            case Phase.PROBE1 | Phase.PROBE2:
+                idx = CueValue.FIRST if cfg.phase == Phase.PROBE1 else CueValue.SECOND
+                return ("probe", cfg.group_type, self.color_probe_index(t, idx))
+
+    def _search_spec(self, cfg: SceneConfig) -> SearchSpec:
+        rng = self.scene_rng(cfg)
+        return self.resolve_search(cfg.trial_data, self._get_singleton_color(cfg.trial_data, rng), rng)
+
     def _draw_memory(self, canvas: Canvas, cfg: SceneConfig) -> None:
         c1, c2 = self.get_color(cfg.trial_data.col1), self.get_color(cfg.trial_data.col2)
         e = self.exp_cfg
@@ -442,11 +596,12 @@ class Exp2Renderer(BaseStimuliRenderer):
 class Exp3Renderer(BaseStimuliRenderer):
     """Renderer for Experiment 3: Notched circles with gestalt closure."""
 
-    def __init__(self, canvas_cfg: CanvasConfig, app_cfg: StimuliAppConfig, exp_cfg: Exp3Config) -> None:
-        super().__init__(canvas_cfg, app_cfg)
+    def __init__(self, canvas_cfg: CanvasConfig, app_cfg: StimuliAppConfig, exp_cfg: Exp3Config,
+                 pool: CanvasPool | None = None) -> None:
+        super().__init__(canvas_cfg, app_cfg, pool)
         self.exp_cfg = exp_cfg
 
-    def _get_singleton_color(self, t: TrialData) -> str | None:
+    def _get_singleton_color(self, t: TrialData, rng: random.Random) -> str | None:
         """
         Resolve singleton color for Exp3 based on dist_cond and cue_val.
         
@@ -468,7 +623,7 @@ class Exp3Renderer(BaseStimuliRenderer):
             case DistractorCondition.NO_SINGLETON:
                 return None
             case DistractorCondition.UNRELATED:
-                return self._get_unrelated_color([t.col1, t.col2])
+                return self._get_unrelated_color([t.col1, t.col2], rng)
             case DistractorCondition.RELATED_FIRST:
                 target_idx = t.col1 if t.cue_val == CueValue.FIRST else t.col2
                 return self.get_color(target_idx)
@@ -485,12 +640,29 @@ class Exp3Renderer(BaseStimuliRenderer):
             case Phase.CUE:
                 self._draw_cue(canvas, cfg)
             case Phase.SEARCH:
-                self.add_search_array(canvas, cfg.trial_data, self._get_singleton_color(cfg.trial_data))
+                self.add_search_array(canvas, self._search_spec(cfg))
             case Phase.PROBE1 | Phase.PROBE2:
                 size_u = self.exp_cfg.probe_item_size.value_in_unit(canvas)
                 idx = CueValue.FIRST if cfg.phase == Phase.PROBE1 else CueValue.SECOND
                 self.add_color_probe(canvas, cfg.trial_data, idx, size_u)
 
+    def scene_key(self, cfg: SceneConfig) -> tuple:
+        t = cfg.trial_data
+        match cfg.phase:
+            case Phase.MEMORY:
+                return ("memory", t.col1, t.col2, self._notch_angles(cfg))
+            case Phase.CUE:
+                return ("cue", t.cue_val)
+            case Phase.SEARCH:
+                return ("search", self._search_spec(cfg))
+            case Phase.PROBE1 | Phase.PROBE2:
+                idx = CueValue.FIRST if cfg.phase == Phase.PROBE1 else CueValue.SECOND
+                return ("probe", self.color_probe_index(t, idx))
+
+    def _search_spec(self, cfg: SceneConfig) -> SearchSpec:
+        rng = self.scene_rng(cfg)
+        return self.resolve_search(cfg.trial_data, self._get_singleton_color(cfg.trial_data, rng), rng)
+
     def _draw_memory(self, canvas: Canvas, cfg: SceneConfig) -> None:
         c1, c2 = self.get_color(cfg.trial_data.col1), self.get_color(cfg.trial_data.col2)
         e = self.exp_cfg
@@ -498,18 +670,25 @@ class Exp3Renderer(BaseStimuliRenderer):
         notch_u = e.notch_side.value_in_unit(canvas)
         y_u = e.vertical_offset.value_in_unit(canvas)
         bg = self.app_cfg.canvas.bg_color
+        top_angle, bot_angle = self._notch_angles(cfg)
+        canvas.add_patches(notched_circle((0, y_u), radius_u, notch_u, c1, bg, top_angle, canvas.transData))
+        canvas.add_patches(notched_circle((0, -y_u), radius_u, notch_u, c2, bg, bot_angle, canvas.transData))
+
+    def _notch_angles(self, cfg: SceneConfig) -> tuple[float, float]:
+        """Notch angles of the (top, bottom) circles of the memory display."""
+        e = self.exp_cfg
         top_angle = e.integrated_top_angle
         bot_angle = e.integrated_bottom_angle
         if cfg.group_type == GroupType.SEPARATE:
             # Randomly rotate ONE component by ±90° from integrated angles to break closure (per paper).
-            rotate_top = random.choice([True, False])
-            delta = random.choice([-90, 90])
+            rng = self.scene_rng(cfg)
+            rotate_top = rng.choice([True, False])
+            delta = rng.choice([-90, 90])
             if rotate_top:
                 top_angle = (top_angle + delta) % 360
             else:
                 bot_angle = (bot_angle + delta) % 360
-        canvas.add_patches(notched_circle((0, y_u), radius_u, notch_u, c1, bg, top_angle, canvas.transData))
-        canvas.add_patches(notched_circle((0, -y_u), radius_u, notch_u, c2, bg, bot_angle, canvas.transData))
+        return top_angle, bot_angle
 
     def _draw_cue(self, canvas: Canvas, cfg: SceneConfig) -> None:
         txt = self.app_cfg.display.cue_text
@@ -621,20 +800,122 @@ def group_type_from_name(app_cfg: StimuliAppConfig, group_name: str) -> GroupTyp
     raise ValueError(f"Unknown group name: {group_name}")
 
 
-def render_experiment(exp_name: str, renderer: BaseStimuliRenderer,
-                      trial_columns: list[str], app_cfg: StimuliAppConfig) -> None:
-    """Render all trials for an experiment across all groups and phases."""
+class TrialJob(NamedTuple):
+    """One trial of a participant file, with the seed its scenes draw from."""
+    exp_name: str
+    group_type: GroupType
+    trial: TrialData
+    trial_index: int
+    seed: int
+    out_dir: Path
+
+
+def make_trial_seed(base_seed: int, exp_name: str, group: str, subject: str, trial_index: int) -> int:
+    """Seed of one trial from its identity alone (not from a shared stream or the process)."""
+    key = f"{base_seed}/{exp_name}/{group}/{subject}/{trial_index}".encode()
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "big")
+
+
+def make_output_reproducible(seed: int) -> None:
+    """
+    Fix what Matplotlib would otherwise vary between runs: the salt of SVG
+    element ids and the creation date embedded in SVG/PDF metadata.
+    """
+    matplotlib.rcParams["svg.hashsalt"] = str(seed)
+    os.environ.setdefault("SOURCE_DATE_EPOCH", "0")
+
+
+def iter_trial_jobs(exp_name: str, trial_columns: list[str], app_cfg: StimuliAppConfig,
+                    output_dir: Path = OUTPUT_DIR) -> Iterator[TrialJob]:
+    """Trials of every participant file of an experiment, in file and trial order."""
+    max_trials = app_cfg.render.max_trials or None  # 0 = no limit
     for group in app_cfg.data.groups:
         group_type = group_type_from_name(app_cfg, group)
-        for file_path in tqdm(sorted((DATA_DIR / exp_name / group).glob("*.mat")), desc=f"{exp_name} {group}"):
+        for file_path in sorted((DATA_DIR / exp_name / group).glob("*.mat")):
             trials = load_trials(file_path, trial_columns)
-            out_dir = OUTPUT_DIR / exp_name / group / file_path.stem
+            out_dir = output_dir / exp_name / group / file_path.stem
             out_dir.mkdir(parents=True, exist_ok=True)
-            for i, trial in enumerate(trials[: app_cfg.render.max_trials]):
-                for idx, phase in enumerate(app_cfg.render.phases):
-                    cfg = SceneConfig(group_type=group_type, phase=phase, trial_data=trial)
-                    output_path = out_dir / f"Trial_{i+1}_{idx+1}_{phase.value}.{app_cfg.render.output_format}"
-                    renderer.render(cfg, OutputConfig(file_path=str(output_path)))
+            for i, trial in enumerate(trials[:max_trials]):
+                seed = make_trial_seed(app_cfg.render.seed, exp_name, group, file_path.stem, i)
+                yield TrialJob(exp_name, group_type, trial, i, seed, out_dir)
+
+
+class SceneJob(NamedTuple):
+    """One frame to render: a phase of a trial and the file it goes to."""
+    exp_name: str
+    cfg: SceneConfig
+    output_path: Path
+
+
+def iter_scene_jobs(jobs: Iterable[TrialJob], app_cfg: StimuliAppConfig) -> Iterator[SceneJob]:
+    """Every phase of every trial, in trial and phase order."""
+    for job in jobs:
+        for idx, phase in enumerate(app_cfg.render.phases):
+            cfg = SceneConfig(group_type=job.group_type, phase=phase, trial_data=job.trial, seed=job.seed)
+            output_path = job.out_dir / f"Trial_{job.trial_index+1}_{idx+1}_{phase.value}.{app_cfg.render.output_format}"
+            yield SceneJob(job.exp_name, cfg, output_path)
+
+
+def dedupe_scenes(scenes: Iterable[SceneJob],
+                  renderers: dict[str, tuple[BaseStimuliRenderer, list[str]]]
+                  ) -> tuple[list[SceneJob], list[tuple[Path, Path]]]:
+    """
+    Split scenes by their renderer's ``scene_key``: the first scene of each
+    key is kept for rendering, every later one becomes a (rendered file,
+    duplicate file) pair. Cue frames, for instance, only depend on the cue.
+    """
+    first: dict[tuple, Path] = {}
+    unique: list[SceneJob] = []
+    duplicates: list[tuple[Path, Path]] = []
+    for scene in scenes:
+        renderer, _ = renderers[scene.exp_name]
+        key = (scene.exp_name, renderer.scene_key(scene.cfg))
+        if key in first:
+            duplicates.append((first[key], scene.output_path))
+        else:
+            first[key] = scene.output_path
+            unique.append(scene)
+    return unique, duplicates
+
+
+def render_scene(renderer: BaseStimuliRenderer, scene: SceneJob) -> None:
+    """Render one frame to its file."""
+    # A file hardlinked by an earlier run would be rewritten in place, changing its twins too
+    if scene.output_path.exists() and scene.output_path.stat().st_nlink > 1:
+        scene.output_path.unlink()
+    renderer.render(scene.cfg, OutputConfig(file_path=str(scene.output_path)))
+
+
+def materialize_duplicates(duplicates: list[tuple[Path, Path]]) -> None:
+    """Hardlink each duplicate to its rendered frame, copying where links are not supported."""
+    for src, dst in duplicates:
+        dst.unlink(missing_ok=True)
+        try:
+            os.link(src, dst)
+        except OSError:
+            shutil.copyfile(src, dst)
+
+
+def plan_scenes(scenes: Iterable[SceneJob],
+                renderers: dict[str, tuple[BaseStimuliRenderer, list[str]]],
+                app_cfg: StimuliAppConfig) -> tuple[list[SceneJob], list[tuple[Path, Path]]]:
+    """Scenes to render and duplicates to link, as ``render.dedupe_scenes`` asks."""
+    scenes = list(scenes)
+    if not app_cfg.render.dedupe_scenes:
+        return scenes, []
+    unique, duplicates = dedupe_scenes(scenes, renderers)
+    logger.info(f"{len(scenes)} scenes: {len(unique)} to render, {len(duplicates)} duplicates to link")
+    return unique, duplicates
+
+
+def render_experiment(exp_name: str, renderer: BaseStimuliRenderer,
+                      trial_columns: list[str], app_cfg: StimuliAppConfig) -> None:
+    """Render all trials for an experiment across all groups and phases, in this process."""
+    jobs = iter_trial_jobs(exp_name, trial_columns, app_cfg)
+    scenes, duplicates = plan_scenes(iter_scene_jobs(jobs, app_cfg), {exp_name: (renderer, trial_columns)}, app_cfg)
+    for scene in tqdm(scenes, desc=exp_name):
+        render_scene(renderer, scene)
+    materialize_duplicates(duplicates)
 
 
 def make_canvas_cfg(app_cfg: StimuliAppConfig) -> CanvasConfig:
@@ -642,6 +923,80 @@ def make_canvas_cfg(app_cfg: StimuliAppConfig) -> CanvasConfig:
     return app_cfg.canvas
 
 
+def make_pool(app_cfg: StimuliAppConfig) -> CanvasPool | None:
+    """A canvas pool if ``render.pool_canvases`` asks for one; the caller closes it."""
+    return CanvasPool() if app_cfg.render.pool_canvases else None
+
+
+def make_renderers(app_cfg: StimuliAppConfig,
+                   pool: CanvasPool | None = None) -> dict[str, tuple[BaseStimuliRenderer, list[str]]]:
+    """
+    Renderer and trial columns of each experiment, keyed by its data folder
+    name. All three share ``pool``, as they share the canvas configuration.
+    """
+    canvas_cfg = make_canvas_cfg(app_cfg)
+    exps = app_cfg.experiments
+    return {
+        "Exp1": (Exp1Renderer(canvas_cfg, app_cfg, exps.exp1, pool), exps.exp1.trial_columns),
+        "Exp2": (Exp2Renderer(canvas_cfg, app_cfg, exps.exp2, pool), exps.exp2.trial_columns),
+        "Exp3": (Exp3Renderer(canvas_cfg, app_cfg, exps.exp3, pool), exps.exp3.trial_columns),
+    }
+
+
+# Per-process state of pool workers, set up once by init_worker.
+_worker_cfg: StimuliAppConfig | None = None
+_worker_renderers: dict[str, tuple[BaseStimuliRenderer, list[str]]] = {}
+
+
+def init_worker(config_dict: dict) -> None:
+    """Pool initializer: rebuild the config and the renderers once per process."""
+    global _worker_cfg, _worker_renderers
+    _worker_cfg = StimuliAppConfig(**config_dict)
+    pool = make_pool(_worker_cfg)
+    if pool is not None:
+        # Run when the worker exits normally, i.e. after Pool.close() and join()
+        Finalize(pool, pool.close, exitpriority=10)
+    _worker_renderers = make_renderers(_worker_cfg, pool)
+    make_output_reproducible(_worker_cfg.render.seed)
+
+
+def render_scene_worker(scene: SceneJob) -> None:
+    """Worker function for multiprocessing"""
+    assert _worker_cfg is not None, "init_worker was not run"
+    renderer, _ = _worker_renderers[scene.exp_name]
+    render_scene(renderer, scene)
+
+
+def render_experiments_parallel(exp_names: list[str], app_cfg: StimuliAppConfig, processes: int) -> None:
+    """
+    Render the trials of all files of ``exp_names`` on one process pool.
+
+    Work units are single frames, so a few long participant files do not
+    leave workers idle. Small chunks keep the pool balanced while still
+    amortizing the per-task overhead. Duplicate frames are linked once the
+    pool is done, as their source may be rendered by any worker.
+    """
+    renderers = make_renderers(app_cfg)  # only for trial columns and scene keys
+    jobs = (
+        job
+        for exp_name in exp_names
+        for job in iter_trial_jobs(exp_name, renderers[exp_name][1], app_cfg)
+    )
+    scenes, duplicates = plan_scenes(iter_scene_jobs(jobs, app_cfg), renderers, app_cfg)
+    if scenes:
+        processes = min(processes, len(scenes))
+        chunksize = max(1, len(scenes) // (processes * 8))
+        logger.info(f"Rendering {len(scenes)} scenes with {processes} processes")
+        with mp.Pool(processes=processes, initializer=init_worker, initargs=(app_cfg.model_dump(),)) as pool:
+            for _ in tqdm(pool.imap_unordered(render_scene_worker, scenes, chunksize=chunksize),
+                          total=len(scenes), desc="Rendering scenes"):
+                pass
+            # Let workers exit on their own so their canvas pools are closed
+            pool.close()
+            pool.join()
+    materialize_duplicates(duplicates)
+
+
 if __name__ == "__main__":
     import argparse
     
@@ -672,6 +1027,12 @@ Examples:
         action="store_true",
         help="Ignore all limits and process all trials"
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker processes (default: [multiprocessing] in the config; 0 = all cores, 1 = serial)"
+    )
     
     args = parser.parse_args()
     
@@ -685,26 +1046,30 @@ Examples:
     else:
         logger.info(f"Running with limit: max_trials={config.render.max_trials}")
     
-    # Set random seeds
-    random.seed(config.render.seed)
-    np.random.seed(config.render.seed)
-    
-    canvas_cfg = make_canvas_cfg(config)
-    exps = config.experiments
-    
+    # Seeds are derived per trial (see make_trial_seed), so there is no global seed to set
+    make_output_reproducible(config.render.seed)
+
+    mp_cfg = config.multiprocessing
+    if args.workers is not None:
+        mp_cfg.enabled = True
+        mp_cfg.processes = args.workers
+    processes = (mp_cfg.processes or mp.cpu_count()) if mp_cfg.enabled else 1
+
     # Determine which experiments to run
-    experiments_to_run = {
-        "E1": ("Exp1", Exp1Renderer(canvas_cfg, config, exps.exp1), exps.exp1.trial_columns),
-        "E2": ("Exp2", Exp2Renderer(canvas_cfg, config, exps.exp2), exps.exp2.trial_columns),
-        "E3": ("Exp3", Exp3Renderer(canvas_cfg, config, exps.exp3), exps.exp3.trial_columns),
-    }
-    
-    if args.exp == "all":
-        selected = experiments_to_run.values()
+    exp_names = {"E1": "Exp1", "E2": "Exp2", "E3": "Exp3"}
+    selected = list(exp_names.values()) if args.exp == "all" else [exp_names[args.exp]]
+
+    if processes > 1:
+        logger.info(f"Processing {', '.join(selected)} with multiprocessing")
+        render_experiments_parallel(selected, config, processes)
     else:
-        selected = [experiments_to_run[args.exp]]
-    
-    # Run selected experiments
-    for exp_name, renderer, trial_cols in selected:
-        logger.info(f"Processing {exp_name}...")
-        render_experiment(exp_name, renderer, trial_cols, config)
+        pool = make_pool(config)
+        try:
+            renderers = make_renderers(config, pool)
+            for exp_name in selected:
+                logger.info(f"Processing {exp_name}...")
+                renderer, trial_cols = renderers[exp_name]
+                render_experiment(exp_name, renderer, trial_cols, config)
+        finally:
+            if pool is not None:
+                pool.close()
@@ -1,23 +1,49 @@
+import math
 import scipy.io
 import sys
 from pathlib import Path
 import numpy as np
 
+try:
+    from mat_preview_api import open_mat  # optional: mat_preview's Python API
+except ImportError:
+    open_mat = None
+
+def inspect_lazily(file_path):
+    # v7.3 files too; compressed data is inflated only as far as printed
+    with open_mat(file_path) as mat:
+        print("Keys:", mat.keys())
+        for node in mat.walk(max_depth=1):
+            print(f"Key: {node.name}, Kind: {node.kind}")
+            if node.kind != "dataset":
+                continue
+            print(f"  Shape: {node.shape}, Dtype: {node.dtype}")
+            if math.prod(node.shape) < 20:
+                print(f"  Data: {node.read()}")
+            else:
+                print(f"  Data (first 5 rows):\n{node.read(slice(0, 5))}")
+
+def inspect_loaded(file_path):
+    mat = scipy.io.loadmat(file_path)
+    print("Keys:", mat.keys())
+    for key in mat:
+        if key.startswith('__'): continue
+        val = mat[key]
+        print(f"Key: {key}, Type: {type(val)}")
+        if isinstance(val, np.ndarray):
+            print(f"  Shape: {val.shape}, Dtype: {val.dtype}")
+            if val.size < 20:
+                print(f"  Data: {val}")
+            else:
+                print(f"  Data (first 5 rows):\n{val[:5]}")
+
 def inspect_mat(file_path):
     print(f"Inspecting: {file_path}")
     try:
-        mat = scipy.io.loadmat(file_path)
-        print("Keys:", mat.keys())
-        for key in mat:
-            if key.startswith('__'): continue
-            val = mat[key]
-            print(f"Key: {key}, Type: {type(val)}")
-            if isinstance(val, np.ndarray):
-                print(f"  Shape: {val.shape}, Dtype: {val.dtype}")
-                if val.size < 20:
-                    print(f"  Data: {val}")
-                else:
-                    print(f"  Data (first 5 rows):\n{val[:5]}")
+        if open_mat is not None:
+            inspect_lazily(file_path)
+        else:
+            inspect_loaded(file_path)
     except Exception as e:
         print(f"Error reading {file_path}: {e}")
 
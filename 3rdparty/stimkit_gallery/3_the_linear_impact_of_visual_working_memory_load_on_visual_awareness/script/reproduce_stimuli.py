@@ -14,7 +14,7 @@ from tqdm import tqdm
 logger.remove()
 logger.add(sys.stderr, level="INFO")
 
-from stimkit import Canvas, CanvasConfig, Renderer
+from stimkit import Canvas, CanvasConfig, OutputConfig, Renderer
 from stimkit.layouts import diamond_positions
 from config import (
     StimuliAppConfig, TrialData, SceneConfig,
@@ -205,10 +205,37 @@ def render_probe_phase(canvas: Canvas, cfg: StimuliAppConfig, scene: SceneConfig
     # Fixation: "central fixation cross"
     draw_fixation_cross(canvas, cfg.display.fixation_color, scene.fixation_size_unit, scene.fixation_stroke_unit)
 
+def scene_units(canvas_config: CanvasConfig, cfg: StimuliAppConfig) -> dict[str, float | tuple | list]:
+    """
+    Canvas units of every size in the config, keyed by SceneConfig field.
+
+    Physical units depend on screen resolution and viewing distance only, so
+    they are computed once per canvas configuration, not per trial.
+    """
+    # We use a dummy canvas context only to trigger unit calculation
+    with Canvas(canvas_config) as canvas:
+        t_ecc_u = cfg.mib.target_eccentricity.value_in_unit(canvas)
+        return dict(
+            fixation_size_unit=cfg.display.fixation_size.value_in_unit(canvas),
+            fixation_stroke_unit=cfg.display.fixation_cross_width.value_in_unit(canvas),
+            fixation_stroke_points=cfg.display.fixation_stroke.value_in_points(canvas),
+            item_size_unit=cfg.memory.item_size.value_in_unit(canvas),
+            diamond_positions_unit=get_memory_positions(cfg.memory.diamond_eccentricity.value_in_unit(canvas)),
+            mask_size_unit=cfg.mib.mask_size.value_in_unit(canvas),
+            cross_size_unit=cfg.mib.cross_size.value_in_unit(canvas),
+            cross_width_unit=cfg.mib.cross_width.value_in_unit(canvas),
+            target_size_unit=cfg.mib.target_size.value_in_unit(canvas),
+            target_eccentricity_unit=t_ecc_u,
+            # Target position in units
+            target_pos_unit=(-t_ecc_u * np.cos(np.deg2rad(45)), t_ecc_u * np.sin(np.deg2rad(45))),
+        )
+
+
 class StimuliRenderer(Renderer):
     def __init__(self, canvas_config: CanvasConfig, app_config: StimuliAppConfig):
         super().__init__(canvas_config)
         self.app_cfg = app_config
+        self.units = scene_units(canvas_config, app_config)
 
     def draw(self, canvas: Canvas, scene: SceneConfig):
         if scene.phase == Phase.MEMORY:
@@ -218,6 +245,7 @@ class StimuliRenderer(Renderer):
         elif scene.phase == Phase.PROBE:
             render_probe_phase(canvas, self.app_cfg, scene)
 
+
 # ==============================================================================
 # Main Loop
 # ==============================================================================
@@ -289,6 +317,9 @@ Examples:
             f"Running with limits: max_trials={cfg.render.max_trials}, max_files_per_exp={cfg.render.max_files_per_exp}"
         )
     
+    # One renderer for the whole run: its unit conversions are computed once
+    renderer = StimuliRenderer(cfg.canvas, cfg)
+
     # Process each experiment
     experiments = [
         ("E1", "Exp1", cfg.data.exp1_path),
@@ -352,32 +383,6 @@ Examples:
                     remaining = [s for s in shape_pool if s not in current_shapes]
                     probe_shape = rng.choice(remaining)
                 
-                # Prepare Canvas and pre-calculate units
-                canvas_cfg = cfg.canvas
-                # We use a dummy canvas context only to trigger unit calculation
-                # (Physical units depend on Screen resolution and Viewing Distance)
-                with Canvas(canvas_cfg) as canvas:
-                    # Pre-calculate common units
-                    fix_size_u = cfg.display.fixation_size.value_in_unit(canvas)
-                    fix_stroke_u = cfg.display.fixation_cross_width.value_in_unit(canvas)
-                    fix_stroke_pt = cfg.display.fixation_stroke.value_in_points(canvas)
-                    item_size_u = cfg.memory.item_size.value_in_unit(canvas)
-                    
-                    # Positions
-                    diamond_ecc_u = cfg.memory.diamond_eccentricity.value_in_unit(canvas)
-                    diamond_u = get_memory_positions(diamond_ecc_u)
-                    
-                    # MIB Units
-                    mask_u = cfg.mib.mask_size.value_in_unit(canvas)
-                    c_size_u = cfg.mib.cross_size.value_in_unit(canvas)
-                    c_width_u = cfg.mib.cross_width.value_in_unit(canvas)
-                    t_size_u = cfg.mib.target_size.value_in_unit(canvas)
-                    t_ecc_u = cfg.mib.target_eccentricity.value_in_unit(canvas)
-                    
-                    # Target position in units
-                    tx = -t_ecc_u * np.cos(np.deg2rad(45))
-                    ty = t_ecc_u * np.sin(np.deg2rad(45))
-
                 # Render Phases
                 for phase in cfg.render.phases:
                     if phase == Phase.PROBE and exp_name == "Exp3":
@@ -392,26 +397,13 @@ Examples:
                         shapes=current_shapes,
                         probe_shape=probe_shape,
                         # Pass units
-                        fixation_size_unit=fix_size_u,
-                        fixation_stroke_unit=fix_stroke_u,
-                        fixation_stroke_points=fix_stroke_pt,
-                        item_size_unit=item_size_u,
-                        diamond_positions_unit=diamond_u,
-                        mask_size_unit=mask_u,
-                        cross_size_unit=c_size_u,
-                        cross_width_unit=c_width_u,
-                        target_size_unit=t_size_u,
-                        target_eccentricity_unit=t_ecc_u,
-                        target_pos_unit=(tx, ty)
+                        **renderer.units,
                     )
 
-                    renderer = StimuliRenderer(cfg.canvas, cfg)
-                    
                     # Output Config
                     out_path = OUTPUT_DIR / exp_name / f"Trial_{trial.trial_idx}" / f"{phase.value}.{cfg.render.output_format}"
                     out_path.parent.mkdir(parents=True, exist_ok=True)
                     
-                    from stimkit import OutputConfig
                     renderer.render(scene, OutputConfig(file_path=str(out_path)))
 
 if __name__ == "__main__":
@@ -11,12 +11,14 @@ import tomllib
 import argparse
 import random
 from pathlib import Path
-from typing import Iterable
+from typing import Iterable, NamedTuple
 import multiprocessing as mp
 import os
+import hashlib
 
 import numpy as np
 import scipy.io as sio
+import matplotlib
 import matplotlib.patches as patches
 import matplotlib.transforms as transforms
 from tqdm import tqdm
@@ -387,7 +389,31 @@ def iter_data_files(app_cfg: StimuliAppConfig, exp_filter: set[str]) -> Iterable
                 break
 
 
-def render_file(renderer: StimuliRenderer, app_cfg: StimuliAppConfig, file_path: Path) -> None:
+class TrialJob(NamedTuple):
+    """A row of one participant's .mat file, with the seed its wheel rotation comes from."""
+    experiment: ExperimentName
+    task_type: TaskType
+    stimulus_type: StimulusType
+    trial: TrialData
+    trial_index: int
+    seed: int
+    out_dir: Path
+
+
+def make_trial_seed(base_seed: int, experiment: ExperimentName, file_name: str, trial_index: int) -> int:
+    """Seed of one trial from its file and position, never from the process rendering it."""
+    key = f"{base_seed}/{experiment.value}/{file_name}/{trial_index}".encode()
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "big")
+
+
+def make_output_reproducible(seed: int) -> None:
+    """Pin the SVG id salt and metadata date, so a rerun writes the same wheel and probe files."""
+    matplotlib.rcParams["svg.hashsalt"] = str(seed)
+    os.environ.setdefault("SOURCE_DATE_EPOCH", "0")
+
+
+def plan_file(app_cfg: StimuliAppConfig, file_path: Path) -> list[TrialJob]:
+    """Load one data file and turn the trials selected by the limits into jobs."""
     file_name = file_path.stem
     task_type = infer_task_type(file_name)
     stimulus_type = infer_stimulus_type(file_name)
@@ -398,7 +424,6 @@ def render_file(renderer: StimuliRenderer, app_cfg: StimuliAppConfig, file_path:
     out_dir.mkdir(parents=True, exist_ok=True)
 
     _, max_trials_per_file, by_task = resolve_limits(app_cfg)
-    phases = app_cfg.render.phases
     
     task_limit = None
     if by_task is not None:
@@ -416,48 +441,99 @@ def render_file(renderer: StimuliRenderer, app_cfg: StimuliAppConfig, file_path:
             f"{experiment.value}/{task_type.value}/{stimulus_type.value} coverage: {len(filtered_keys)}/{len(all_keys)} condition combos"
         )
 
-    for idx, trial in enumerate(trials_to_process):
-        wheel_rotation = random.randint(0, 359)
-        for phase_idx, phase in enumerate(phases):
-            scene_cfg = SceneConfig(
-                phase=phase,
-                stimulus_type=stimulus_type,
-                task_type=task_type,
-                trial=trial,
-                wheel_rotation=wheel_rotation,
-                experiment=experiment,
-            )
-            if not should_render_phase(scene_cfg):
-                logger.debug(f"Skipping phase {phase} for trial {idx + 1} (probe_index={trial.probe_index})")
-                continue
-            output_path = out_dir / f"Trial_{idx + 1}_{phase_idx + 1}_{phase.value}.{app_cfg.render.output_format}"
-            logger.info(f"Rendering {output_path}")
-            renderer.render(scene_cfg, OutputConfig(file_path=str(output_path)))
-            logger.info(f"Completed rendering {output_path}")
-
-
-def render_file_worker(args: tuple[Path, dict]) -> None:
-    """Worker function for multiprocessing"""
-    file_path, config_dict = args
-    # Reconstruct config from dict
-    app_cfg = StimuliAppConfig(**config_dict)
-    
-    # Initialize renderer in this process
-    renderer = StimuliRenderer(app_cfg.canvas, app_cfg)
-    
-    # Set random seed for this process
-    process_id = os.getpid()
-    random.seed(app_cfg.render.seed + process_id)
-    np.random.seed(app_cfg.render.seed + process_id)
-    
-    # Render the file
-    try:
-        logger.info(f"Process {process_id} rendering {file_path}")
-        render_file(renderer, app_cfg, file_path)
-        logger.info(f"Process {process_id} completed {file_path}")
-    except Exception as e:
-        logger.error(f"Process {process_id} failed to render {file_path}: {e}")
-        raise
+    return [
+        TrialJob(
+            experiment=experiment,
+            task_type=task_type,
+            stimulus_type=stimulus_type,
+            trial=trial,
+            trial_index=idx,
+            seed=make_trial_seed(app_cfg.render.seed, experiment, file_name, idx),
+            out_dir=out_dir,
+        )
+        for idx, trial in enumerate(trials_to_process)
+    ]
+
+
+def render_trial(renderer: StimuliRenderer, app_cfg: StimuliAppConfig, job: TrialJob) -> None:
+    # Drawn from the trial's own seed, so it does not depend on the process or on render order
+    wheel_rotation = random.Random(job.seed).randint(0, 359)
+    for phase_idx, phase in enumerate(app_cfg.render.phases):
+        scene_cfg = SceneConfig(
+            phase=phase,
+            stimulus_type=job.stimulus_type,
+            task_type=job.task_type,
+            trial=job.trial,
+            wheel_rotation=wheel_rotation,
+            experiment=job.experiment,
+        )
+        if not should_render_phase(scene_cfg):
+            logger.debug(f"Skipping phase {phase} for trial {job.trial_index + 1} (probe_index={job.trial.probe_index})")
+            continue
+        output_path = job.out_dir / f"Trial_{job.trial_index + 1}_{phase_idx + 1}_{phase.value}.{app_cfg.render.output_format}"
+        logger.info(f"Rendering {output_path}")
+        renderer.render(scene_cfg, OutputConfig(file_path=str(output_path)))
+        logger.info(f"Completed rendering {output_path}")
+
+
+def render_file(renderer: StimuliRenderer, app_cfg: StimuliAppConfig, file_path: Path) -> None:
+    for job in plan_file(app_cfg, file_path):
+        render_trial(renderer, app_cfg, job)
+
+
+def guided_chunks(
+    jobs: list[TrialJob], processes: int, remaining: int | None = None, min_chunk: int = 1
+) -> list[list[TrialJob]]:
+    """
+    Split jobs into chunks that shrink as the queue drains: each chunk takes
+    half of a fair share of what is left. Early chunks amortize the per-task
+    overhead; the small ones at the end let idle workers pick up the tail,
+    so uneven files do not leave cores waiting on one long file.
+
+    ``remaining`` is the work left across all files when these jobs are
+    queued, them included; without it only these jobs are counted.
+    """
+    if remaining is None:
+        remaining = len(jobs)
+    chunks = []
+    start = 0
+    while start < len(jobs):
+        size = max(min_chunk, remaining // (2 * processes))
+        chunks.append(jobs[start:start + size])
+        start += size
+        remaining -= len(chunks[-1])
+    return chunks
+
+
+# Per-process state of pool workers, set up once by init_worker.
+_worker_cfg: StimuliAppConfig | None = None
+_worker_renderer: StimuliRenderer | None = None
+
+
+def init_worker(config_dict: dict) -> None:
+    """Pool initializer: rebuild the config and the renderer once per process."""
+    global _worker_cfg, _worker_renderer
+    _worker_cfg = StimuliAppConfig(**config_dict)
+    _worker_renderer = StimuliRenderer(_worker_cfg.canvas, _worker_cfg)
+    make_output_reproducible(_worker_cfg.render.seed)
+
+
+def plan_file_worker(file_path: Path) -> list[TrialJob]:
+    """Worker function for multiprocessing: load one data file and plan its trials."""
+    assert _worker_cfg is not None, "init_worker was not run"
+    return plan_file(_worker_cfg, file_path)
+
+
+def render_chunk_worker(chunk: list[TrialJob]) -> int:
+    """Worker function for multiprocessing: render a chunk of trials, return how many."""
+    assert _worker_cfg is not None and _worker_renderer is not None, "init_worker was not run"
+    for job in chunk:
+        try:
+            render_trial(_worker_renderer, _worker_cfg, job)
+        except Exception as e:
+            logger.error(f"Process {os.getpid()} failed to render {job.out_dir.name} trial {job.trial_index + 1}: {e}")
+            raise
+    return len(chunk)
 
 
 def should_render_phase(scene_cfg: SceneConfig) -> bool:
@@ -530,34 +606,46 @@ Examples:
     # Get all files first for progress bar
     all_files = list(iter_data_files(config, selected_exps))
     
+    make_output_reproducible(config.render.seed)
+
     # Check if multiprocessing is enabled and we have files to process
-    if config.multiprocessing.enabled and len(all_files) > 1:
+    if config.multiprocessing.enabled and len(all_files) > 0:
         # Determine number of processes to use
         if config.multiprocessing.processes is not None and config.multiprocessing.processes > 0:
-            num_processes = min(config.multiprocessing.processes, len(all_files))
+            num_processes = config.multiprocessing.processes
         else:
-            # Use all available CPU cores, but don't exceed number of files
-            num_processes = min(mp.cpu_count(), len(all_files))
-        
-        logger.info(f"Using multiprocessing with {num_processes} processes")
-        
-        # Prepare arguments for worker processes
+            # Use all available CPU cores
+            num_processes = mp.cpu_count()
+        logger.info(f"Using multiprocessing with {num_processes} processes for {len(all_files)} files")
+
         # Convert config to dict for pickling
         config_dict = config.model_dump()
-        args_list = [(file_path, config_dict) for file_path in all_files]
-        
-        # Create process pool
-        with mp.Pool(processes=num_processes) as pool:
-            # Use tqdm to show progress
-            list(tqdm(pool.imap(render_file_worker, args_list),
-                     total=len(all_files),
-                     desc="Processing files"))
+
+        with mp.Pool(processes=num_processes, initializer=init_worker, initargs=(config_dict,)) as pool:
+            with tqdm(total=0, desc="Processing trials") as progress:
+                # Workers load and plan the files; trials, not files, are then the
+                # unit of work. Each file's trials are queued as soon as it is
+                # planned, so rendering starts while later files still load.
+                # Chunks are sized from the trials left in all files: those of the
+                # files planned so far, the rest estimated at their average.
+                pending = []
+                planned = chunked = 0
+                planned_files = enumerate(pool.imap_unordered(plan_file_worker, all_files), 1)
+                for files_planned, jobs in planned_files:
+                    progress.total += len(jobs)
+                    progress.refresh()
+                    planned += len(jobs)
+                    remaining = planned * len(all_files) // files_planned - chunked
+                    pending.extend(
+                        pool.apply_async(render_chunk_worker, (chunk,), callback=progress.update)
+                        for chunk in guided_chunks(jobs, num_processes, remaining)
+                    )
+                    chunked += len(jobs)
+                for result in pending:
+                    result.get()
     else:
         # Single process execution
         logger.info("Using single process execution")
-        random.seed(config.render.seed)
-        np.random.seed(config.render.seed)
-        
         renderer = StimuliRenderer(config.canvas, config)
         
         for mat_file in tqdm(all_files, desc="Processing files"):
@@ -131,6 +131,7 @@ class RenderConfig(StrictModel):
     output_format: str
     max_trials: int
     phases: list[Phase]
+    pool_canvases: bool = Field(default=True, description="Reuse one open canvas per CanvasConfig, clearing its artists between frames")
 
 
 class DisplayConfig(StrictModel):
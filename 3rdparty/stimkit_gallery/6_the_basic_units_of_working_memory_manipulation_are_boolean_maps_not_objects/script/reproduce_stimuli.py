@@ -12,8 +12,9 @@ from __future__ import annotations
 import argparse
 import random
 from collections import Counter, defaultdict
+from contextlib import ExitStack, contextmanager
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator
 
 from tqdm import tqdm
 
@@ -332,6 +333,64 @@ def move_positions_direction(
 
 
 
+# =============================
+# Canvas Pool
+# =============================
+
+# The same section appears in gallery 1. Each gallery is a standalone uv
+# project whose scripts import only stimkit and their own modules, so there
+# is no shared module to hold it; keep the two copies identical.
+def canvas_key(canvas_cfg: CanvasConfig) -> str:
+    """Key of a canvas configuration, equal for equal field values."""
+    return canvas_cfg.model_dump_json()
+
+
+def canvas_artists(canvas: Canvas) -> set:
+    """Artists currently on the canvas axes and its figure."""
+    return {*canvas.ax.get_children(), *canvas.ax.figure.get_children()}
+
+
+class CanvasPool:
+    """
+    Open canvases kept per CanvasConfig and reused across frames.
+
+    Building the figure and setting up its axes costs more than drawing a
+    simple scene, so a canvas is opened once and, after each frame, only
+    the artists drawn on it are removed. Everything present when it was
+    opened (background, axes, limits) stays as configured. ``close`` must
+    be called once the pool is no longer needed.
+    """
+
+    def __init__(self) -> None:
+        self._stack = ExitStack()
+        self._idle: dict[str, list[tuple[Canvas, set]]] = {}
+
+    @contextmanager
+    def canvas(self, canvas_cfg: CanvasConfig) -> Iterator[Canvas]:
+        """A clean canvas for ``canvas_cfg``, cleared and returned to the pool afterwards."""
+        idle = self._idle.setdefault(canvas_key(canvas_cfg), [])
+        if idle:
+            canvas, baseline = idle.pop()
+        else:
+            canvas = self._stack.enter_context(Canvas(canvas_cfg))
+            baseline = canvas_artists(canvas)
+        try:
+            yield canvas
+        finally:
+            for artist in canvas_artists(canvas) - baseline:
+                artist.remove()
+            idle.append((canvas, baseline))
+
+    def size(self) -> int:
+        """Number of canvases held open."""
+        return sum(len(idle) for idle in self._idle.values())
+
+    def close(self) -> None:
+        """Close every canvas the pool has opened."""
+        self._idle.clear()
+        self._stack.close()
+
+
 # =============================
 # StimuliRenderer Class
 # =============================
@@ -339,9 +398,19 @@ def move_positions_direction(
 class StimuliRenderer(Renderer):
     """Renderer for Boolean map manipulation experiments."""
     
-    def __init__(self, canvas_cfg: CanvasConfig, app_cfg: StimuliAppConfig):
+    def __init__(self, canvas_cfg: CanvasConfig, app_cfg: StimuliAppConfig, pool: CanvasPool | None = None):
         super().__init__(canvas_cfg)
         self.app_cfg = app_cfg
+        self.pool = pool
+
+    def render(self, scene_cfg: SceneConfig, output_cfg: OutputConfig) -> None:
+        """Render on a pooled canvas when a pool is set, else on a fresh one."""
+        if self.pool is None:
+            super().render(scene_cfg, output_cfg)
+            return
+        with self.pool.canvas(self.canvas_cfg) as canvas:
+            self.draw(canvas, scene_cfg)
+            canvas.save(output_cfg)
     
     def draw(self, canvas: Canvas, scene_cfg: SceneConfig) -> None:
         """Main draw method that delegates to experiment-specific renderers."""
@@ -889,6 +958,35 @@ class StimuliRenderer(Renderer):
         return colors_out, angles_out
 
 
+class RendererRegistry:
+    """
+    Renderers keyed by canvas configuration, built on first use and kept for
+    the run. Exp4 only differs from the other experiments in its background
+    colour, so a run holds at most two.
+    """
+
+    def __init__(self, app_cfg: StimuliAppConfig, pool: CanvasPool | None = None):
+        self.app_cfg = app_cfg
+        self.pool = pool
+        self._renderers: dict[str, StimuliRenderer] = {}
+
+    def get(self, canvas_cfg: CanvasConfig) -> StimuliRenderer:
+        key = canvas_key(canvas_cfg)
+        if key not in self._renderers:
+            self._renderers[key] = StimuliRenderer(canvas_cfg, self.app_cfg, self.pool)
+        return self._renderers[key]
+
+
+def exp4_canvas_cfg(cfg: StimuliAppConfig) -> CanvasConfig:
+    """The shared canvas configuration with Exp4's background colour."""
+    return CanvasConfig(
+        bg_color=cfg.exp4.bg_color,
+        screen_distance=cfg.canvas.screen_distance,
+        screen_size=cfg.canvas.screen_size,
+        screen_resolution=cfg.canvas.screen_resolution,
+    )
+
+
 # =============================
 # Experiment 1
 # =============================
@@ -973,15 +1071,6 @@ def render_exp4_trial(
     trial_index: int,
     seed: int,
 ) -> None:
-    # Create custom renderer for exp4 with different background color
-    exp4_canvas_cfg = CanvasConfig(
-        bg_color=cfg.exp4.bg_color,
-        screen_distance=renderer.canvas_cfg.screen_distance,
-        screen_size=renderer.canvas_cfg.screen_size,
-        screen_resolution=renderer.canvas_cfg.screen_resolution,
-    )
-    exp4_renderer = StimuliRenderer(exp4_canvas_cfg, cfg)
-
     phases = cfg.render.phases
     for phase in phases:
         scene_cfg = Exp4SceneInputs(
@@ -991,7 +1080,7 @@ def render_exp4_trial(
             seed=seed,
         )
         output_path = output_dir / f"Trial_{trial_index:04d}_{phase.value}.{cfg.render.output_format}"
-        exp4_renderer.render(scene_cfg, OutputConfig(file_path=str(output_path)))
+        renderer.render(scene_cfg, OutputConfig(file_path=str(output_path)))
 
 
 # =============================
@@ -1032,7 +1121,6 @@ Examples:
     args = parser.parse_args()
 
     cfg = load_config()
-    renderer = StimuliRenderer(cfg.canvas, cfg)
     max_trials = None if args.full else cfg.render.max_trials
     if max_trials == 0:
         max_trials = None
@@ -1060,46 +1148,55 @@ Examples:
     exp4_trials = [Exp4TrialData(**record) for record in exp4]
 
     exp_map = {
-        "E1": (exp1_trials, 1, render_exp1_trial),
-        "E2": (exp2_trials, 2, render_exp2_trial),
-        "E3": (exp3_trials, 3, render_exp3_trial),
-        "E4": (exp4_trials, 4, render_exp4_trial),
+        "E1": (exp1_trials, 1, render_exp1_trial, cfg.canvas),
+        "E2": (exp2_trials, 2, render_exp2_trial, cfg.canvas),
+        "E3": (exp3_trials, 3, render_exp3_trial, cfg.canvas),
+        "E4": (exp4_trials, 4, render_exp4_trial, exp4_canvas_cfg(cfg)),
     }
 
-    for exp_key, (trials, exp_id, render_fn) in exp_map.items():
-        if args.exp not in ("all", exp_key):
-            continue
+    # Exp4's grey background is a second canvas configuration, so it gets
+    # its own renderer and its own pooled canvas
+    pool = CanvasPool() if cfg.render.pool_canvases else None
+    renderers = RendererRegistry(cfg, pool)
+    try:
+        for exp_key, (trials, exp_id, render_fn, canvas_cfg) in exp_map.items():
+            if args.exp not in ("all", exp_key):
+                continue
         
-        logger.info(f"Rendering stimuli for experiment: {exp_key}")
-        trial_counts: dict[int, int] = defaultdict(int)
+            logger.info(f"Rendering stimuli for experiment: {exp_key}")
+            renderer = renderers.get(canvas_cfg)
+            trial_counts: dict[int, int] = defaultdict(int)
         
-        # Filter trials if max_trials is set
-        filtered_trials = []
-        for trial in trials:
-            trial_counts[trial.subject] += 1
-            if max_trials is not None and trial_counts[trial.subject] > max_trials:
-                continue
-            filtered_trials.append((trial, trial.subject, trial_counts[trial.subject]))
-
-        if exp_key == "E1":
-            expected = len(Exp1Condition) * len(Exp1Consistency)
-            counter = Counter((t.conditions, t.consis) for t, _, _ in filtered_trials)
-        elif exp_key == "E2":
-            expected = len(Exp2Condition) * len(Exp2Consistency)
-            counter = Counter((t.conditions, t.consis) for t, _, _ in filtered_trials)
-        elif exp_key == "E3":
-            expected = len(Exp3ColorOrientationType) * len(Exp3ChangeAttribute)
-            counter = Counter((t.color_orientation_type, t.change_attribute) for t, _, _ in filtered_trials)
-        else:
-            expected = len(Exp4Condition) * len(Exp4Consistency)
-            counter = Counter((t.condition, t.consis) for t, _, _ in filtered_trials)
-        logger.info(f"{exp_key} coverage: {len(counter)}/{expected} condition combos")
-
-        for trial, subject, trial_index in tqdm(filtered_trials, desc=f"Experiment {exp_key}"):
-            seed = make_trial_seed(cfg.render.seed, exp_id, subject, trial_index)
-            output_dir = OUTPUT_DIR / exp_key / f"subject_{subject:02d}"
-            ensure_dir(output_dir)
-            render_fn(trial, cfg, renderer, output_dir, trial_index, seed)
+            # Filter trials if max_trials is set
+            filtered_trials = []
+            for trial in trials:
+                trial_counts[trial.subject] += 1
+                if max_trials is not None and trial_counts[trial.subject] > max_trials:
+                    continue
+                filtered_trials.append((trial, trial.subject, trial_counts[trial.subject]))
+
+            if exp_key == "E1":
+                expected = len(Exp1Condition) * len(Exp1Consistency)
+                counter = Counter((t.conditions, t.consis) for t, _, _ in filtered_trials)
+            elif exp_key == "E2":
+                expected = len(Exp2Condition) * len(Exp2Consistency)
+                counter = Counter((t.conditions, t.consis) for t, _, _ in filtered_trials)
+            elif exp_key == "E3":
+                expected = len(Exp3ColorOrientationType) * len(Exp3ChangeAttribute)
+                counter = Counter((t.color_orientation_type, t.change_attribute) for t, _, _ in filtered_trials)
+            else:
+                expected = len(Exp4Condition) * len(Exp4Consistency)
+                counter = Counter((t.condition, t.consis) for t, _, _ in filtered_trials)
+            logger.info(f"{exp_key} coverage: {len(counter)}/{expected} condition combos")
+
+            for trial, subject, trial_index in tqdm(filtered_trials, desc=f"Experiment {exp_key}"):
+                seed = make_trial_seed(cfg.render.seed, exp_id, subject, trial_index)
+                output_dir = OUTPUT_DIR / exp_key / f"subject_{subject:02d}"
+                ensure_dir(output_dir)
+                render_fn(trial, cfg, renderer, output_dir, trial_index, seed)
+    finally:
+        if pool is not None:
+            pool.close()
 
 
 if __name__ == "__main__":